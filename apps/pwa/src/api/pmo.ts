@@ -12,10 +12,40 @@ import type {
   ChangeRequest,
   ChangeRequestInput,
   ChangeRequestUpdateInput,
+  Page,
+  PortfolioSummary,
 } from "../types";
 
-export function listBusinessUnits(): Promise<BusinessUnit[]> {
-  return apiFetch<BusinessUnit[]>("/api/business-units");
+export type Selection = {
+  fields?: string;
+  include?: string;
+};
+
+function fetchPage<T>(
+  path: string,
+  selection: Selection = {},
+  cursor: number | null = null
+): Promise<Page<T>> {
+  const params = new URLSearchParams();
+  if (selection.fields !== undefined) params.set("fields", selection.fields);
+  if (selection.include !== undefined) params.set("include", selection.include);
+  if (cursor !== null) params.set("after_id", String(cursor));
+  const query = params.toString() ? `?${params}` : "";
+  return apiFetch<Page<T>>(`${path}${query}`);
+}
+
+export function listBusinessUnits(
+  selection?: Selection,
+  cursor?: number | null
+): Promise<Page<BusinessUnit>> {
+  return fetchPage<BusinessUnit>("/api/business-units", selection, cursor);
+}
+
+export function listProjects(
+  selection?: Selection,
+  cursor?: number | null
+): Promise<Page<Project>> {
+  return fetchPage<Project>("/api/projects", selection, cursor);
 }
 
 export function createBusinessUnit(payload: BusinessUnitInput): Promise<BusinessUnit> {
@@ -102,3 +132,7 @@ export function deleteChangeRequest(id: number): Promise<void> {
 export function getProject(id: number): Promise<Project> {
   return apiFetch<Project>(`/api/projects/${id}`);
 }
+
+export function getPortfolioSummary(): Promise<PortfolioSummary> {
+  return apiFetch<PortfolioSummary>("/api/portfolio/summary");
+}
@@ -0,0 +1,23 @@
+type LoadMoreProps = {
+  hasNextPage: boolean;
+  isFetchingNextPage: boolean;
+  fetchNextPage: () => unknown;
+};
+
+function LoadMore({ hasNextPage, isFetchingNextPage, fetchNextPage }: LoadMoreProps) {
+  if (!hasNextPage) return null;
+  return (
+    <div className="mt-4 flex justify-center">
+      <button
+        type="button"
+        className="rounded border border-slate-300 px-4 py-2 text-sm text-slate-600 disabled:opacity-60"
+        onClick={() => fetchNextPage()}
+        disabled={isFetchingNextPage}
+      >
+        {isFetchingNextPage ? "Loading…" : "Load more"}
+      </button>
+    </div>
+  );
+}
+
+export default LoadMore;
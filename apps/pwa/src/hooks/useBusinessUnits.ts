@@ -1,13 +1,19 @@
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, type InfiniteData } from "@tanstack/react-query";
 
-import { listBusinessUnits } from "../api/pmo";
+import { listBusinessUnits, type Selection } from "../api/pmo";
+import type { BusinessUnit, Page } from "../types";
 
 export const BUSINESS_UNITS_QUERY_KEY = ["business-units"] as const;
 
-export function useBusinessUnits() {
-  return useQuery({
-    queryKey: BUSINESS_UNITS_QUERY_KEY,
-    queryFn: listBusinessUnits,
+// Loads one page of units; further pages are fetched on demand with
+// fetchNextPage (see LoadMore) instead of walking every cursor up front.
+export function useBusinessUnits(selection?: Selection) {
+  return useInfiniteQuery({
+    queryKey: selection ? [...BUSINESS_UNITS_QUERY_KEY, selection] : BUSINESS_UNITS_QUERY_KEY,
+    queryFn: ({ pageParam }) => listBusinessUnits(selection, pageParam),
+    initialPageParam: null as number | null,
+    getNextPageParam: (lastPage: Page<BusinessUnit>) => lastPage.next_cursor,
+    select: (data: InfiniteData<Page<BusinessUnit>>) => data.pages.flatMap((page) => page.items),
     staleTime: 1000 * 60 * 2,
   });
 }
@@ -0,0 +1,13 @@
+import { useQuery } from "@tanstack/react-query";
+
+import { getPortfolioSummary } from "../api/pmo";
+
+export const PORTFOLIO_SUMMARY_QUERY_KEY = ["portfolio-summary"] as const;
+
+export function usePortfolioSummary() {
+  return useQuery({
+    queryKey: PORTFOLIO_SUMMARY_QUERY_KEY,
+    queryFn: getPortfolioSummary,
+    staleTime: 1000 * 60 * 2,
+  });
+}
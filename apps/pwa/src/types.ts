@@ -60,6 +60,26 @@ export type BusinessUnit = {
   projects: Project[];
 };
 
+export type PortfolioMeasures = {
+  projects: number;
+  budget: number;
+  bid_value: number;
+  open_issues: number;
+  pending_change_requests: number;
+};
+
+export type PortfolioSummary = {
+  totals: PortfolioMeasures;
+  by_business_unit: (PortfolioMeasures & { businessunit_id: number; name: string })[];
+  by_category: (PortfolioMeasures & { category: string })[];
+  by_stage: (PortfolioMeasures & { stage: string | null })[];
+};
+
+export type Page<T> = {
+  items: T[];
+  next_cursor: number | null;
+};
+
 export type BusinessUnitInput = {
   name: string;
   type: string;
@@ -6,7 +6,9 @@ import {
   deleteChangeRequest,
   updateChangeRequest,
 } from "../api/pmo";
+import LoadMore from "../components/LoadMore";
 import { BUSINESS_UNITS_QUERY_KEY, useBusinessUnits } from "../hooks/useBusinessUnits";
+import { PORTFOLIO_SUMMARY_QUERY_KEY, usePortfolioSummary } from "../hooks/usePortfolioSummary";
 import type {
   ChangeRequest,
   ChangeRequestInput,
@@ -16,6 +18,13 @@ import type {
 
 const STATUS_OPTIONS = ["draft", "submitted", "approved", "rejected"] as const;
 
+// The change-request workflow only needs project names and their requests;
+// portfolio totals come from /api/portfolio/summary.
+const CHANGE_REQUEST_SELECTION = {
+  include: "projects.change_requests",
+  fields: "name,projects.name",
+};
+
 type ChangeRequestFormState = {
   project_id: number | "";
   name: string;
@@ -46,7 +55,13 @@ function emptyChangeRequestForm(defaultProjectId?: number): ChangeRequestFormSta
 
 function FinanceManagerDashboard() {
   const queryClient = useQueryClient();
-  const { data: businessUnits, isLoading } = useBusinessUnits();
+  const {
+    data: businessUnits,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useBusinessUnits(CHANGE_REQUEST_SELECTION);
+  const { data: summary, isLoading } = usePortfolioSummary();
 
   const projectRows: ProjectRow[] = useMemo(() => {
     if (!businessUnits) return [];
@@ -82,13 +97,10 @@ function FinanceManagerDashboard() {
   }, [projectRows]);
 
   const portfolioSnapshot = useMemo(() => {
-    if (!projectRows.length) {
-      return { budget: 0, bidValue: 0, variance: 0 };
-    }
-    const budget = projectRows.reduce((sum, project) => sum + project.budget, 0);
-    const bidValue = projectRows.reduce((sum, project) => sum + project.bid_value, 0);
+    const budget = summary?.totals.budget ?? 0;
+    const bidValue = summary?.totals.bid_value ?? 0;
     return { budget, bidValue, variance: bidValue - budget };
-  }, [projectRows]);
+  }, [summary]);
 
   const createMutation = useMutation({
     mutationFn: ({ projectId, data }: { projectId: number; data: ChangeRequestInput }) =>
@@ -144,6 +156,7 @@ function FinanceManagerDashboard() {
         });
       }
       await queryClient.invalidateQueries({ queryKey: BUSINESS_UNITS_QUERY_KEY });
+      await queryClient.invalidateQueries({ queryKey: PORTFOLIO_SUMMARY_QUERY_KEY });
       resetForm();
     } catch (error) {
       setFormError(
@@ -179,6 +192,7 @@ function FinanceManagerDashboard() {
     try {
       await deleteMutation.mutateAsync(id);
       await queryClient.invalidateQueries({ queryKey: BUSINESS_UNITS_QUERY_KEY });
+      await queryClient.invalidateQueries({ queryKey: PORTFOLIO_SUMMARY_QUERY_KEY });
       if (editingId === id) {
         resetForm();
       }
@@ -373,6 +387,11 @@ function FinanceManagerDashboard() {
             </tbody>
           </table>
         </div>
+        <LoadMore
+          hasNextPage={hasNextPage}
+          isFetchingNextPage={isFetchingNextPage}
+          fetchNextPage={fetchNextPage}
+        />
       </article>
     </section>
   );
@@ -6,6 +6,7 @@ import {
   deleteBusinessUnit,
   updateBusinessUnit,
 } from "../api/pmo";
+import LoadMore from "../components/LoadMore";
 import { BUSINESS_UNITS_QUERY_KEY, useBusinessUnits } from "../hooks/useBusinessUnits";
 import type {
   BusinessUnit,
@@ -16,6 +17,12 @@ import type {
 
 const UNIT_TYPES = ["businessunit"] as const;
 
+// The overview only needs unit metadata and project categories.
+const OVERVIEW_SELECTION = {
+  include: "projects",
+  fields: "name,type,parent_id,manager_id,projects.category",
+};
+
 type BusinessUnitFormState = {
   name: string;
   type: string;
@@ -32,7 +39,13 @@ function emptyForm(): BusinessUnitFormState {
 
 function GeneralManagerDashboard() {
   const queryClient = useQueryClient();
-  const { data: businessUnits = [], isLoading } = useBusinessUnits();
+  const {
+    data: businessUnits = [],
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useBusinessUnits(OVERVIEW_SELECTION);
 
   const summary = useMemo(() => {
     if (!businessUnits.length) {
@@ -303,6 +316,11 @@ function GeneralManagerDashboard() {
             </tbody>
           </table>
         </div>
+        <LoadMore
+          hasNextPage={hasNextPage}
+          isFetchingNextPage={isFetchingNextPage}
+          fetchNextPage={fetchNextPage}
+        />
       </article>
     </section>
   );
@@ -9,6 +9,7 @@ import {
   updateIssue,
   updateProject,
 } from "../api/pmo";
+import LoadMore from "../components/LoadMore";
 import { BUSINESS_UNITS_QUERY_KEY, useBusinessUnits } from "../hooks/useBusinessUnits";
 import type {
   Issue,
@@ -80,7 +81,13 @@ function emptyIssueForm(): IssueFormState {
 
 function ProjectManagerDashboard() {
   const queryClient = useQueryClient();
-  const { data: businessUnits, isLoading } = useBusinessUnits();
+  const {
+    data: businessUnits,
+    isLoading,
+    hasNextPage,
+    isFetchingNextPage,
+    fetchNextPage,
+  } = useBusinessUnits();
 
   const [projectForm, setProjectForm] = useState<ProjectFormState>(() => emptyProjectForm());
   const [editingProjectId, setEditingProjectId] = useState<number | null>(null);
@@ -645,6 +652,11 @@ function ProjectManagerDashboard() {
             </tbody>
           </table>
         </div>
+        <LoadMore
+          hasNextPage={hasNextPage}
+          isFetchingNextPage={isFetchingNextPage}
+          fetchNextPage={fetchNextPage}
+        />
       </article>
 
       <article className="rounded-lg bg-white p-4 shadow">
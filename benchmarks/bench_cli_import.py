@@ -0,0 +1,76 @@
+"""Import time of the CLI, as measured by ``python -X importtime``.
+
+Imports ``pmo.cli`` in fresh interpreters and reports the median cumulative
+import time together with the modules that cost the most on their own.
+Exits non-zero when the median exceeds the budget, so it can gate scripts
+that call the CLI in a loop.
+
+    python benchmarks/bench_cli_import.py --runs 10 --budget-ms 1000 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def importtime(module: str) -> list[tuple[str, int, int]]:
+    """Return ``(module, self us, cumulative us)`` for each module ``module`` pulls in."""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, PYTHONPATH=str(SRC)),
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if own.strip().isdigit():
+            rows.append((name.strip(), int(own), int(cumulative)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="pmo.cli")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [importtime(args.module) for _ in range(args.runs)]
+    totals = [
+        next(cumulative for name, _, cumulative in rows if name == args.module) / 1000
+        for rows in runs
+    ]
+    median = statistics.median(totals)
+
+    own: dict[str, list[int]] = {}
+    for rows in runs:
+        for name, self_us, _ in rows:
+            own.setdefault(name, []).append(self_us)
+    slowest = sorted(own.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+
+    print(f"{'self ms':>8}  module")
+    for name, times in slowest[: args.top]:
+        print(f"{statistics.median(times) / 1000:>8.1f}  {name}")
+    print(
+        f"\n{args.module}: median {median:.1f} ms, best {min(totals):.1f} ms "
+        f"over {args.runs} runs (budget {args.budget_ms:g} ms)"
+    )
+    if median > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare eager-loading strategies for the business unit listing.
+
+Seeds an in-memory SQLite database with one business unit holding N projects
+(each with a few status entries, assignments, issues and change requests),
+then loads it with the ``joined`` and ``selectin`` variants of
+``BUSINESS_UNIT_DETAIL`` and reports statements issued, rows fetched from the
+driver and wall time.
+
+    python benchmarks/bench_loading.py --sizes 10 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from pmo.api.loaders import BUSINESS_UNIT_DETAIL
+from pmo.models import (
+    Base,
+    BusinessPlan,
+    BusinessUnit,
+    ChangeRequest,
+    Issue,
+    Position,
+    Project,
+    ProjectLifecycleStage,
+    ProjectStatusHistory,
+    ResourceAssignment,
+)
+
+
+def seed(session: Session, n_projects: int) -> None:
+    today = date.today()
+    bu = BusinessUnit(name="Bench", type="businessunit")
+    positions = [
+        Position(name=f"Position {i}", type="position", businessunit=bu) for i in range(3)
+    ]
+    for i in range(2):
+        BusinessPlan(name=f"Plan {i}", businessunit=bu)
+    for i in range(n_projects):
+        project = Project(
+            name=f"Project {i}",
+            businessunit=bu,
+            description="",
+            tender_no=f"BENCH-{i}",
+            scope_of_work="",
+            bid_issue_date=today,
+            tender_purchase_date=today,
+            bid_due_date=today,
+            bid_validity_d=30,
+            budget=1000.0,
+            bid_value=900.0,
+        )
+        for stage in (ProjectLifecycleStage.prospect, ProjectLifecycleStage.bidding):
+            project.status_history.append(
+                ProjectStatusHistory(name=stage.value, stage=stage, effective_date=today)
+            )
+        for j in range(2):
+            ResourceAssignment(
+                name=f"RA {j}",
+                project=project,
+                position=positions[j],
+                role="engineer",
+                start_date=today,
+            )
+        for j in range(3):
+            Issue(name=f"Issue {j}", project=project, severity="low", opened_on=today)
+        for j in range(2):
+            ChangeRequest(name=f"CR {j}", project=project)
+    session.add(bu)
+    session.commit()
+
+
+def measure(engine, strategy: str) -> dict[str, float]:
+    statements: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    profile = BUSINESS_UNIT_DETAIL.with_strategy(strategy)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as session:
+            started = time.perf_counter()
+            units = session.query(BusinessUnit).options(*profile.options(BusinessUnit)).all()
+            elapsed = time.perf_counter() - started
+            assert units
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    rows = 0
+    raw = engine.raw_connection()
+    try:
+        for statement, parameters in statements:
+            cursor = raw.cursor()
+            cursor.execute(statement, parameters)
+            rows += len(cursor.fetchall())
+            cursor.close()
+    finally:
+        raw.close()
+
+    return {"statements": len(statements), "rows": rows, "seconds": elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'projects':>8} {'strategy':>9} {'stmts':>6} {'rows':>10} {'ms':>9}")
+    for size in args.sizes:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        with Session(engine) as session:
+            seed(session, size)
+        for strategy in ("joined", "selectin"):
+            result = measure(engine, strategy)
+            print(
+                f"{size:>8} {strategy:>9} {result['statements']:>6} "
+                f"{result['rows']:>10} {result['seconds'] * 1000:>9.1f}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
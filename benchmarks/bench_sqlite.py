@@ -0,0 +1,102 @@
+"""Mixed read/write throughput on a SQLite file with and without the profile.
+
+For each configuration a fresh database file is seeded with the sample data,
+then reader threads repeatedly compute the portfolio summary while writer
+threads insert and commit issues through the write session factory (the
+path the API's mutating endpoints take). Reports completed operations per
+second and failed operations (e.g. "database is locked").
+
+    python benchmarks/bench_sqlite.py --readers 8 --writers 4 --seconds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+
+from pmo.db import create_session_factory, create_write_session_factory, dispose_engines
+from pmo.models import Issue
+from pmo.portfolio import portfolio_summary
+from pmo.sample_data import create_sample_data
+
+
+def run(url: str, readers: int, writers: int, seconds: float) -> dict[str, float]:
+    read_factory = create_session_factory(url)
+    write_factory = create_write_session_factory(url)
+    with write_factory() as session:
+        project_id = create_sample_data(session)["project"].id
+
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def count(name: str):
+        with lock:
+            counts[name] += 1
+
+    def read():
+        while time.perf_counter() < deadline:
+            try:
+                with read_factory() as session:
+                    portfolio_summary(session)
+                count("reads")
+            except OperationalError:
+                count("errors")
+
+    def write(worker: int):
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            try:
+                with write_factory() as session:
+                    session.add(
+                        Issue(
+                            name=f"Bench {worker}-{n}",
+                            project_id=project_id,
+                            severity="low",
+                            opened_on=date.today(),
+                        )
+                    )
+                    session.commit()
+                count("writes")
+            except OperationalError:
+                count("errors")
+
+    threads = [threading.Thread(target=read) for _ in range(readers)]
+    threads += [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {name: value / seconds for name, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'reads/s':>9} {'writes/s':>9} {'errors/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in (False, True):
+            os.environ["PMO_DB_SQLITE_PROFILE"] = "1" if profile else "0"
+            url = f"sqlite:///{Path(directory) / f'bench-{int(profile)}.db'}"
+            result = run(url, args.readers, args.writers, args.seconds)
+            print(
+                f"{'on' if profile else 'off':>8} {result['reads']:>9.1f} "
+                f"{result['writes']:>9.1f} {result['errors']:>9.1f}"
+            )
+            dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
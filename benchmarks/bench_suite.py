@@ -0,0 +1,204 @@
+"""Time the hot API endpoints, CLI listings and diagram building at several sizes.
+
+For each size a fresh SQLite file is filled by ``create_synthetic_portfolio``
+(one business unit per 100 projects), then every case is run once to warm
+up and ``--rounds`` more times. The ``api.*`` cases run against an app whose
+response cache stores nothing, so they time building each response; the
+``*.cached`` cases repeat the cacheable reads against a real cache and so
+time serving hits. Results (min, median, mean and standard
+deviation per case) are written as JSON; ``--compare`` reads an earlier file
+and exits non-zero when a case's median got slower by more than
+``--threshold``, so regressions show up between versions.
+
+    python benchmarks/bench_suite.py --sizes 100 1000 5000 --rounds 5
+    python benchmarks/bench_suite.py --compare build/benchmarks/previous.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+
+from fastapi.testclient import TestClient
+
+from pmo.api.app import create_app
+from pmo.api.cache import MemoryBackend, NullBackend
+from pmo.cli import PMOCli
+from pmo.db import create_session_factory, dispose_engines
+from pmo.graph import load_unit_graph, to_digraph
+from pmo.sample_data import create_synthetic_portfolio
+
+ENDPOINTS = {
+    "api.business_units": "/api/business-units?limit=50",
+    "api.projects": "/api/projects?limit=100",
+    "api.portfolio_summary": "/api/portfolio/summary",
+    "api.evm": "/api/evm?level=project&as_of=2025-06-30",
+    "api.overallocations": "/api/resources/overallocations",
+    "api.schedule": "/api/projects/1/schedule",
+}
+# read endpoints served from the response cache when it is enabled
+CACHED_ENDPOINTS = ("api.business_units", "api.projects")
+
+
+def cases(
+    url: str, client: TestClient, cached_client: TestClient
+) -> dict[str, Callable[[], object]]:
+    def get(path: str, client: TestClient = client):
+        def run():
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+
+        return run
+
+    cli = PMOCli(url)
+
+    def listing(method):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                method(output_format="json")
+
+        return run
+
+    session_factory = create_session_factory(url)
+
+    def graph():
+        with session_factory() as session:
+            to_digraph(load_unit_graph(session, 1)).source
+
+    return {
+        **{name: get(path) for name, path in ENDPOINTS.items()},
+        **{
+            f"{name}.cached": get(ENDPOINTS[name], cached_client)
+            for name in CACHED_ENDPOINTS
+        },
+        "cli.list_projects": listing(cli.list_projects),
+        "cli.list_positions": listing(cli.list_positions),
+        "graph.unit": graph,
+    }
+
+
+def measure(run: Callable[[], object], rounds: int) -> dict[str, float]:
+    run()  # warm-up: connections, statement caches
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stddev": statistics.stdev(timings) if rounds > 1 else 0.0,
+    }
+
+
+def run_size(directory: Path, projects: int, args) -> list[dict]:
+    url = f"sqlite:///{directory / f'bench-{projects}.db'}"
+    with create_session_factory(url)() as session:
+        started = time.perf_counter()
+        counts = create_synthetic_portfolio(
+            session,
+            units=max(1, projects // 100),
+            projects=projects,
+            tasks_per_wp=args.tasks_per_wp,
+            seed=args.seed,
+        )
+        seeded = time.perf_counter() - started
+    print(f"{projects} projects: {sum(counts.values())} rows seeded in {seeded:.1f}s")
+
+    results = []
+    # each app keeps the cache it was created with
+    uncached = create_app(url, async_api=False, cache_backend=NullBackend())
+    cached = create_app(url, async_api=False, cache_backend=MemoryBackend())
+    with TestClient(uncached) as client, TestClient(cached) as cached_client:
+        for name, run in cases(url, client, cached_client).items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            result = {"name": name, "projects": projects, **measure(run, args.rounds)}
+            results.append(result)
+            print(f"  {name:<28} median {result['median'] * 1000:>9.1f} ms")
+    dispose_engines()
+    return results
+
+
+def compare(results: list[dict], baseline_path: Path, threshold: float) -> bool:
+    """Print median ratios against a previous run; return True on a regression."""
+
+    baseline = {
+        (entry["name"], entry["projects"]): entry
+        for entry in json.loads(baseline_path.read_text())["results"]
+    }
+    regressed = False
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result["name"], result["projects"]))
+        if previous is None:
+            continue
+        ratio = result["median"] / previous["median"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressed |= bool(flag)
+        print(f"  {result['name']:<28} {result['projects']:>6} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--tasks-per-wp", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", help="Only run cases with these name prefixes")
+    parser.add_argument("--output", type=Path, help="Result file (default: build/benchmarks/)")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="Median ratio counted as a regression"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            result for size in args.sizes for result in run_size(Path(directory), size, args)
+        ]
+
+    stamp = datetime.now(timezone.utc)
+    version = metadata.version("pmo")
+    output = args.output or Path("build/benchmarks") / (
+        f"bench-{version}-{stamp:%Y%m%dT%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "version": version,
+                "timestamp": stamp.isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "parameters": {
+                    "rounds": args.rounds,
+                    "tasks_per_wp": args.tasks_per_wp,
+                    "seed": args.seed,
+                },
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    print(f"\nResults written to {output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,35 +2,99 @@
 
 from __future__ import annotations
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from ..db import create_session_factory, get_engine
+from ..db import (
+    create_async_session_factory,
+    create_session_factory,
+    create_write_session_factory,
+    get_async_engine,
+    get_engine,
+    load_engine_config,
+    pool_metrics,
+)
 from .admin import setup_admin
+from .cache import CacheBackend, response_cache
+from .async_routers import async_router
 from .routers import router
 
 
-def create_app(database_url: str | None = None) -> FastAPI:
+def _replace_routes(router: APIRouter, replacements: APIRouter) -> APIRouter:
+    """``router`` with each endpoint also defined in ``replacements`` swapped for it."""
+
+    replaced = {
+        (route.path, method) for route in replacements.routes for method in route.methods
+    }
+    combined = APIRouter()
+    combined.routes.extend(replacements.routes)
+    combined.routes.extend(
+        route
+        for route in router.routes
+        if not any((route.path, method) in replaced for method in route.methods)
+    )
+    return combined
+
+
+def create_app(
+    database_url: str | None = None,
+    async_api: Optional[bool] = None,
+    cache_backend: Optional[CacheBackend] = None,
+) -> FastAPI:
+    """Build the API; ``async_api`` defaults to the ``async_api`` database setting.
+
+    ``cache_backend`` stores the response cache somewhere other than this
+    process's memory, see :mod:`pmo.api.cache`.
+    """
+
     engine = get_engine(database_url)
     session_factory = create_session_factory(database_url)
+    if async_api is None:
+        async_api = load_engine_config(database_url).async_api
+    async_session_factory = create_async_session_factory(database_url) if async_api else None
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        if async_api:
+            # asyncio connections must be closed on the loop that opened them
+            await get_async_engine(database_url).dispose()
 
-    app = FastAPI(title="PMO Admin API", version="0.1.0")
+    app = FastAPI(title="PMO Admin API", version="0.1.0", lifespan=lifespan)
     app.state.session_factory = session_factory
+    app.state.write_session_factory = create_write_session_factory(database_url)
+    app.state.async_session_factory = async_session_factory
+    app.state.response_cache = response_cache(engine, cache_backend)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
     )
 
-    app.include_router(router)
+    if async_api:
+        app.include_router(_replace_routes(router, async_router))
+    else:
+        app.include_router(router)
     app.state.admin = setup_admin(app, engine)
 
     @app.get("/health", tags=["meta"])
     def healthcheck():
         return {"status": "ok"}
 
+    @app.get("/metrics/pool", tags=["meta"])
+    def database_pool_metrics():
+        return pool_metrics()
+
+    @app.get("/metrics/cache", tags=["meta"])
+    def response_cache_metrics():
+        return app.state.response_cache.stats()
+
     return app
 
 
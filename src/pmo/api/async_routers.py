@@ -0,0 +1,178 @@
+"""Async variants of the read endpoints, served when ``async_api`` is enabled.
+
+Each endpoint here replaces the sync endpoint with the same method and path
+in :mod:`pmo.api.routers` and awaits its queries on an ``AsyncSession``
+instead of occupying a threadpool thread for the whole request. The
+endpoints built on sync query helpers (schedule, portfolio, EVM, resources)
+run them with ``AsyncSession.run_sync``: the Python code is unchanged and
+every database round trip still yields to the event loop. Writes stay on
+the sync routers and the writer engine. Statements, pagination, conditional
+requests and the response cache are shared with the sync endpoints through
+:mod:`pmo.api.reads`.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..evm import earned_value
+from ..models import BusinessUnit, Project
+from ..portfolio import portfolio_summary
+from ..resources import overallocations
+from ..schedule import ScheduleCycleError, schedule_cache
+from ..versions import read_versions
+from .cache import ResponseCache
+from .dependencies import async_session_dependency, response_cache_dependency
+from .fieldsets import page_schema, parse_selection, selection_schema
+from .loaders import BUSINESS_UNIT_DETAIL, PROJECT_DETAIL
+from .reads import (
+    ReadRequest,
+    business_unit_page_statement,
+    page,
+    project_page_statement,
+    project_statement,
+)
+from .routers import DEFAULT_PAGE_SIZE, FIELDS_QUERY, INCLUDE_QUERY, MAX_PAGE_SIZE
+from .schemas import (
+    BusinessUnitPageSchema,
+    BusinessUnitSchema,
+    EarnedValueSchema,
+    OverallocationSchema,
+    PortfolioSummarySchema,
+    ProjectPageSchema,
+    ProjectSchema,
+    ScheduleSchema,
+)
+
+
+async_router = APIRouter(prefix="/api", tags=["pmo"])
+
+
+@async_router.get("/business-units", response_model=BusinessUnitPageSchema)
+async def list_business_units(
+    request: Request,
+    after_id: Optional[int] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: AsyncSession = Depends(async_session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(
+        BusinessUnitSchema, fields, include, BUSINESS_UNIT_DETAIL
+    )
+    read = ReadRequest(request, cache, BusinessUnit, selection)
+    response = read.check(await session.run_sync(read_versions, read.tables))
+    if response is not None:
+        return response
+    units = await session.scalars(business_unit_page_statement(selection, after_id, limit))
+    schema = page_schema(selection_schema(BusinessUnitSchema, selection))
+    return read.respond(schema, page(units.unique().all(), limit))
+
+
+@async_router.get("/projects", response_model=ProjectPageSchema)
+async def list_projects(
+    request: Request,
+    businessunit_id: Optional[int] = None,
+    after_id: Optional[int] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: AsyncSession = Depends(async_session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(ProjectSchema, fields, include, PROJECT_DETAIL)
+    read = ReadRequest(request, cache, Project, selection)
+    response = read.check(await session.run_sync(read_versions, read.tables))
+    if response is not None:
+        return response
+    projects = await session.scalars(
+        project_page_statement(selection, after_id, limit, businessunit_id)
+    )
+    schema = page_schema(selection_schema(ProjectSchema, selection))
+    return read.respond(schema, page(projects.unique().all(), limit))
+
+
+@async_router.get("/projects/{project_id}", response_model=ProjectSchema)
+async def get_project(
+    request: Request,
+    project_id: int,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: AsyncSession = Depends(async_session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(ProjectSchema, fields, include, PROJECT_DETAIL)
+    read = ReadRequest(request, cache, Project, selection, exists=False)
+    response = read.check(await session.run_sync(read_versions, read.tables))
+    if response is not None:
+        return response
+    result = await session.scalars(project_statement(selection, project_id))
+    project = result.unique().one_or_none()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return read.respond(selection_schema(ProjectSchema, selection), project)
+
+
+@async_router.get("/projects/{project_id}/schedule", response_model=ScheduleSchema)
+async def get_project_schedule(
+    project_id: int, session: AsyncSession = Depends(async_session_dependency)
+):
+    if await session.get(Project, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+    def solve(sync_session):
+        return schedule_cache(sync_session.get_bind()).schedule(sync_session, project_id)
+
+    try:
+        return await session.run_sync(solve)
+    except ScheduleCycleError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
+@async_router.get("/portfolio/summary", response_model=PortfolioSummarySchema)
+async def get_portfolio_summary(session: AsyncSession = Depends(async_session_dependency)):
+    return await session.run_sync(portfolio_summary)
+
+
+@async_router.get("/evm", response_model=list[EarnedValueSchema])
+async def get_earned_value(
+    as_of: Optional[date] = Query(None, description="Status date (defaults to today)"),
+    level: Literal["workpackage", "controlaccount", "project", "businessunit"] = "project",
+    project_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+    session: AsyncSession = Depends(async_session_dependency),
+):
+    return await session.run_sync(
+        earned_value,
+        as_of=as_of,
+        level=level,
+        project_id=project_id,
+        businessunit_id=businessunit_id,
+    )
+
+
+@async_router.get("/resources/overallocations", response_model=list[OverallocationSchema])
+async def get_resource_overallocations(
+    threshold: float = Query(100.0, gt=0, description="Allocation percent considered full"),
+    position_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+    start: Optional[date] = Query(None, description="Only report from this date"),
+    end: Optional[date] = Query(None, description="Only report up to this date"),
+    session: AsyncSession = Depends(async_session_dependency),
+):
+    try:
+        return await session.run_sync(
+            overallocations,
+            threshold=threshold,
+            position_id=position_id,
+            businessunit_id=businessunit_id,
+            start=start,
+            end=end,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
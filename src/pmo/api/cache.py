@@ -0,0 +1,232 @@
+"""Serialized JSON of read endpoints, cached per database.
+
+A :class:`ResponseCache` stores response bodies under their ETag (see
+:mod:`pmo.api.conditional`). The ETag already hashes the URL with the
+change versions of every table the response reads, so a hit is exactly the
+bytes the endpoint would build now: the joined object graph is neither
+loaded nor validated and serialized again, and the one version lookup that
+computes the ETag is the only query. Entries are also tagged with those
+tables, and a committed session drops the entries tagged with any table it
+changed (an ``after_commit`` hook, see :func:`pmo.versions.committed_tables`),
+so memory is not held by bodies that can no longer be served.
+
+Storage is pluggable through :class:`CacheBackend`; the default
+:class:`MemoryBackend` is an in-process LRU with a per-entry TTL, and
+:class:`NullBackend` keeps nothing (every read is a miss). Because
+keys carry the versions, a backend shared by several workers stays correct
+when another worker writes; its entries then age out through the TTL.
+Configuration comes from ``PMO_API_CACHE_TTL`` (seconds, default 300; 0
+disables the cache) and ``PMO_API_CACHE_MAX_MB`` (default 64).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Optional, Protocol
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..db import primary_engine
+from ..versions import committed_tables
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_MB = 64
+
+
+class CacheBackend(Protocol):
+    """Storage for :class:`ResponseCache`: bytes by key, tagged with table names."""
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]) -> None: ...
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop the entries tagged with any of ``tags``; return how many were dropped."""
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class MemoryBackend:
+    """Least recently used entries in memory, up to ``max_bytes``, each with a TTL."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # key -> (expires at, body, tags), least recently used first
+        self._entries: OrderedDict[str, tuple[float, bytes, frozenset[str]]] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]) -> None:
+        if len(value) > self.max_bytes:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            self._bytes += len(value)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            keys = set().union(*(self._keys_by_tag.get(tag, ()) for tag in tags))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class NullBackend:
+    """Stores nothing, so every read builds its response; for benchmarks and tests."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]) -> None:
+        pass
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": 0, "bytes": 0, "evictions": 0}
+
+
+class ResponseCache:
+    """Response bodies by ETag with hit, miss and invalidation counters."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = DEFAULT_TTL):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, backend: Optional[CacheBackend] = None) -> "ResponseCache":
+        ttl = float(os.getenv("PMO_API_CACHE_TTL", DEFAULT_TTL))
+        if backend is None:
+            max_mb = float(os.getenv("PMO_API_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            backend = MemoryBackend(int(max_mb * 1024 * 1024))
+        return cls(backend, ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        body = self.backend.get(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def put(self, key: str, body: bytes, tables: Iterable[str]) -> None:
+        if self.enabled:
+            self.backend.set(key, body, self.ttl, tables)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        dropped = self.backend.invalidate(tables)
+        with self._lock:
+            self.invalidations += dropped
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+        return {"ttl": self.ttl, **counters, **self.backend.stats()}
+
+
+# engine -> its response cache
+_caches: "weakref.WeakKeyDictionary[object, ResponseCache]" = weakref.WeakKeyDictionary()
+
+
+def response_cache(bind, backend: Optional[CacheBackend] = None) -> ResponseCache:
+    """Return the :class:`ResponseCache` for an engine, creating it on demand.
+
+    Passing ``backend`` replaces the engine's cache with one storing there.
+    """
+
+    bind = primary_engine(bind)
+    if backend is not None:
+        cache = _caches[bind] = ResponseCache.from_env(backend)
+        return cache
+    cache = _caches.get(bind)
+    if cache is None:
+        cache = _caches.setdefault(bind, ResponseCache.from_env())
+    return cache
+
+
+def _invalidate_committed(session: Session) -> None:
+    tables = committed_tables(session)
+    if tables:
+        cache = _caches.get(primary_engine(session.get_bind()))
+        if cache is not None:
+            cache.invalidate(tables)
+
+
+event.listen(Session, "after_commit", _invalidate_committed)
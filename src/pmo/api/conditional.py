@@ -0,0 +1,90 @@
+"""Conditional GET: ETag and ``Last-Modified`` from table change versions.
+
+A read endpoint looks up the change versions of the tables its response is
+built from (:func:`pmo.versions.read_versions`, one indexed query) before
+running its own queries. The strong ETag hashes those versions with the
+request path and query string, since the same URL over unchanged tables
+serializes to the same bytes; ``Last-Modified`` is the newest change among
+the tables, rounded up to the whole second HTTP dates can express so that a
+later change within the same second is never reported as older. A request
+whose ``If-None-Match`` (or, without it, ``If-Modified-Since``) still
+matches gets ``304 Not Modified`` and the payload is never loaded or
+serialized. ``If-None-Match: *`` matches any current representation, so it
+is only answered once the resource is known to exist.
+
+Responses carry ``Cache-Control: no-cache``, so browsers keep the body but
+revalidate it on every fetch.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+from ..versions import TableVersion
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+    @classmethod
+    def for_request(
+        cls, request: Request, versions: dict[str, TableVersion]
+    ) -> "Validators":
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(request.url.path.encode())
+        digest.update(b"?" + request.url.query.encode())
+        for name in sorted(versions):
+            digest.update(f"|{name}:{versions[name].version}".encode())
+        changes = [entry.changed_at for entry in versions.values() if entry.changed_at]
+        last_modified = None
+        if changes:
+            last_modified = _ceil_second(max(changes).replace(tzinfo=timezone.utc))
+        return cls(f'"{digest.hexdigest()}"', last_modified)
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def fresh(self, request: Request, exists: bool = True) -> bool:
+        """Whether the client's copy, named by its conditional headers, is current.
+
+        Pass ``exists=False`` while the resource may still turn out to be
+        missing; ``If-None-Match: *`` then does not match.
+        """
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            return (exists and "*" in tags) or self.etag in tags or f"W/{self.etag}" in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def not_modified(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers())
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+
+def _ceil_second(moment: datetime) -> datetime:
+    # HTTP dates have whole seconds
+    if moment.microsecond:
+        moment = moment.replace(microsecond=0) + timedelta(seconds=1)
+    return moment
@@ -2,12 +2,19 @@
 
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..db import create_session_factory
+from ..db import (
+    create_async_session_factory,
+    create_session_factory,
+    create_write_session_factory,
+)
+from ..graph import RenderCache, render_cache
+from .cache import ResponseCache, response_cache
 
 
 def _resolve_session_factory(request: Request):
@@ -29,3 +36,74 @@ def get_session(request: Request) -> Generator[Session, None, None]:
 
 def session_dependency(session: Session = Depends(get_session)) -> Session:
     return session
+
+
+def _resolve_write_session_factory(request: Request):
+    write_session_factory = getattr(request.app.state, "write_session_factory", None)
+    if write_session_factory is None:
+        write_session_factory = create_write_session_factory()
+        request.app.state.write_session_factory = write_session_factory
+    return write_session_factory
+
+
+def get_write_session(request: Request) -> Generator[Session, None, None]:
+    session = _resolve_write_session_factory(request)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def write_session_dependency(session: Session = Depends(get_write_session)) -> Session:
+    """Session for endpoints that modify data; see :func:`pmo.db.get_writer_engine`."""
+
+    return session
+
+
+def session_factory_dependency(request: Request):
+    """The session factory itself, for responses that outlive the request scope."""
+
+    return _resolve_session_factory(request)
+
+
+def _resolve_async_session_factory(request: Request):
+    async_session_factory = getattr(request.app.state, "async_session_factory", None)
+    if async_session_factory is None:
+        async_session_factory = create_async_session_factory()
+        request.app.state.async_session_factory = async_session_factory
+    return async_session_factory
+
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    session = _resolve_async_session_factory(request)()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def async_session_dependency(
+    session: AsyncSession = Depends(get_async_session),
+) -> AsyncSession:
+    """Session for the async read endpoints; see :mod:`pmo.api.async_routers`."""
+
+    return session
+
+
+def render_cache_dependency(request: Request) -> RenderCache:
+    """The app's diagram render cache, see :class:`pmo.graph.RenderCache`."""
+
+    cache = getattr(request.app.state, "render_cache", None)
+    if cache is None:
+        cache = request.app.state.render_cache = render_cache()
+    return cache
+
+
+def response_cache_dependency(request: Request) -> ResponseCache:
+    """The app's cache of serialized read responses, see :mod:`pmo.api.cache`."""
+
+    cache = getattr(request.app.state, "response_cache", None)
+    if cache is None:
+        engine = _resolve_session_factory(request).kw["bind"]
+        cache = request.app.state.response_cache = response_cache(engine)
+    return cache
@@ -0,0 +1,203 @@
+"""Sparse fieldsets (``?fields=``) and relationship expansion (``?include=``).
+
+Both parameters take comma-separated, dotted paths relative to the requested
+resource, e.g. ``include=projects&fields=id,name,projects.category``. A
+:class:`Selection` parsed from them drives both sides of a read endpoint: the
+ORM loader options (only included relationships are loaded, only selected
+columns are fetched, everything else raises if touched) and a Pydantic model
+derived from the full response schema that serializes exactly that shape.
+"""
+
+from __future__ import annotations
+
+import typing
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.orm import load_only, raiseload
+
+from .loaders import LOADER_STRATEGIES, LoadProfile
+
+
+class Selection(NamedTuple):
+    """Columns and nested relationships requested for one level of a resource.
+
+    ``fields`` is ``None`` when every scalar field is wanted. ``include`` is a
+    sorted tuple of ``(relationship, Selection)`` pairs so selections are
+    hashable and can key the schema cache.
+    """
+
+    fields: Optional[frozenset[str]]
+    include: tuple[tuple[str, "Selection"], ...]
+
+
+@lru_cache(maxsize=None)
+def _relationships(schema: type[BaseModel]) -> dict[str, type[BaseModel]]:
+    """Map list-of-schema fields on ``schema`` to their item schema."""
+
+    relations = {}
+    for name, field in schema.model_fields.items():
+        if typing.get_origin(field.annotation) is list:
+            (item,) = typing.get_args(field.annotation)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                relations[name] = item
+    return relations
+
+
+def _scalars(schema: type[BaseModel]) -> list[str]:
+    relations = _relationships(schema)
+    return [name for name in schema.model_fields if name not in relations]
+
+
+def _split(value: Optional[str]) -> list[str]:
+    if value is None:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def parse_selection(
+    schema: type[BaseModel],
+    fields: Optional[str],
+    include: Optional[str],
+    default: LoadProfile,
+) -> Selection:
+    """Parse query parameters into a :class:`Selection` rooted at ``schema``.
+
+    Omitting both parameters expands the relationships in ``default``; an
+    empty ``include=`` expands none. A dotted field such as
+    ``projects.category`` implies ``include=projects``, and when ``fields`` is
+    given without ``include`` those are the only relationships expanded.
+    ``id`` is always returned.
+    """
+
+    field_paths = _split(fields)
+    if include is None:
+        include_paths = [] if field_paths else list(default.paths)
+    else:
+        include_paths = _split(include)
+    tree: dict = {}
+
+    def node_for(parts: list[str], path: str) -> dict:
+        node, current = tree, schema
+        for part in parts:
+            relations = _relationships(current)
+            if part not in relations:
+                raise _bad_request(f"Unknown relationship '{part}' in '{path}'")
+            node = node.setdefault("include", {}).setdefault(part, {})
+            current = relations[part]
+        return node
+
+    for path in include_paths:
+        node_for(path.split("."), path)
+
+    for path in field_paths:
+        *parents, name = path.split(".")
+        node = node_for(parents, path)
+        current = schema
+        for part in parents:
+            current = _relationships(current)[part]
+        if name not in _scalars(current):
+            raise _bad_request(f"Unknown field '{name}' in '{path}'")
+        node.setdefault("fields", {"id"}).add(name)
+
+    def freeze(node: dict) -> Selection:
+        selected = node.get("fields")
+        children = node.get("include", {})
+        return Selection(
+            frozenset(selected) if selected is not None else None,
+            tuple(sorted((name, freeze(child)) for name, child in children.items())),
+        )
+
+    return freeze(tree)
+
+
+def _is_full(schema: type[BaseModel], selection: Selection) -> bool:
+    relations = _relationships(schema)
+    included = dict(selection.include)
+    return (
+        selection.fields is None
+        and included.keys() == relations.keys()
+        and all(_is_full(relations[name], child) for name, child in included.items())
+    )
+
+
+@lru_cache(maxsize=256)
+def selection_schema(schema: type[BaseModel], selection: Selection) -> type[BaseModel]:
+    """Return a Pydantic model serializing only the selected part of ``schema``."""
+
+    if _is_full(schema, selection):
+        return schema
+
+    relations = _relationships(schema)
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name not in relations and (selection.fields is None or name in selection.fields)
+    }
+    for name, child in selection.include:
+        definitions[name] = (list[selection_schema(relations[name], child)], ...)
+    return create_model(
+        f"{schema.__name__}Selection",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@lru_cache(maxsize=None)
+def page_schema(item_schema: type[BaseModel]) -> type[BaseModel]:
+    """Return the ``{items, next_cursor}`` envelope for ``item_schema``."""
+
+    return create_model(
+        f"{item_schema.__name__}Page",
+        items=(list[item_schema], ...),
+        next_cursor=(Optional[int], None),
+    )
+
+
+def selection_options(model, selection: Selection, strategy: str = "selectin") -> list:
+    """Build ORM loader options that fetch exactly ``selection`` from ``model``.
+
+    Relationships that were not requested get ``raiseload`` and unselected
+    columns are deferred with ``raiseload=True``, so serializing an object
+    loaded this way can never trigger a lazy load.
+    """
+
+    loader = LOADER_STRATEGIES[strategy]
+
+    def build(entity, node: Selection, parent=None) -> list:
+        options = []
+        if node.fields is not None:
+            cols = [getattr(entity, name) for name in sorted(node.fields)]
+            options.append(
+                load_only(*cols, raiseload=True)
+                if parent is None
+                else parent.load_only(*cols, raiseload=True)
+            )
+        options.append(raiseload("*") if parent is None else parent.raiseload("*"))
+        for name, child in node.include:
+            attribute = getattr(entity, name)
+            chained = (
+                loader(attribute)
+                if parent is None
+                else getattr(parent, loader.__name__)(attribute)
+            )
+            options.append(chained)
+            options.extend(build(attribute.property.mapper.class_, child, chained))
+        return options
+
+    return build(model, selection)
+
+
+def selection_tables(model, selection: Selection) -> frozenset[str]:
+    """Names of the tables read when loading ``selection`` from ``model``."""
+
+    tables = {table.name for table in model.__mapper__.tables}
+    for name, child in selection.include:
+        tables |= selection_tables(getattr(model, name).property.mapper.class_, child)
+    return frozenset(tables)
@@ -0,0 +1,62 @@
+"""Eager-loading profiles used by the API routers.
+
+A profile names the relationship paths an endpoint needs (dotted, relative to
+the queried model) and the loader strategy used to fetch them. ``selectin``
+issues one extra ``SELECT ... WHERE parent_id IN (...)`` per collection, so
+the number of rows fetched grows with the data instead of with the product of
+every nested collection, which is what chained ``joinedload`` produces.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+
+
+LOADER_STRATEGIES = {
+    "selectin": selectinload,
+    "joined": joinedload,
+    "subquery": subqueryload,
+}
+
+
+class LoadProfile(NamedTuple):
+    paths: tuple[str, ...]
+    strategy: str = "selectin"
+
+    def with_strategy(self, strategy: str) -> "LoadProfile":
+        return self._replace(strategy=strategy)
+
+    def options(self, model) -> list:
+        """Build loader options for ``model``, one chained loader per leaf path."""
+
+        loader = LOADER_STRATEGIES[self.strategy]
+        options = []
+        for path in self.paths:
+            current = model
+            option = None
+            for name in path.split("."):
+                attribute = getattr(current, name)
+                if option is None:
+                    option = loader(attribute)
+                else:
+                    option = getattr(option, loader.__name__)(attribute)
+                current = attribute.property.mapper.class_
+            options.append(option)
+        return options
+
+
+PROJECT_COLLECTIONS = (
+    "status_history",
+    "resource_assignments",
+    "issues",
+    "change_requests",
+)
+
+PROJECT_DETAIL = LoadProfile(PROJECT_COLLECTIONS)
+
+BUSINESS_UNIT_DETAIL = LoadProfile(
+    tuple(f"projects.{name}" for name in PROJECT_COLLECTIONS)
+    + ("businessplans", "positions")
+)
@@ -0,0 +1,136 @@
+"""Shared bodies of the business unit and project read endpoints.
+
+The sync endpoints in :mod:`pmo.api.routers` and the async ones in
+:mod:`pmo.api.async_routers` differ only in how they run queries. Everything
+else lives here: the statements (keyset pagination over the selected
+columns and relationships), turning fetched rows into a page, and
+:class:`ReadRequest`, which answers conditional requests and serves or
+stores the serialized body in the response cache.
+
+An endpoint reads as::
+
+    read = ReadRequest(request, cache, Project, selection)
+    response = read.check(read_versions(session, read.tables))
+    if response is not None:
+        return response
+    rows = session.scalars(project_page_statement(...)).unique().all()
+    return read.respond(schema, page(rows, limit))
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Select, select
+
+from ..models import BusinessUnit, Project
+from ..versions import TableVersion
+from .cache import ResponseCache
+from .conditional import Validators
+from .fieldsets import Selection, selection_options, selection_tables
+from .loaders import BUSINESS_UNIT_DETAIL, PROJECT_DETAIL
+
+
+def _json_body(schema, payload) -> bytes:
+    return schema.model_validate(payload, from_attributes=True).model_dump_json().encode()
+
+
+def _json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def _page_statement(model, selection: Selection, strategy: str, after_id, limit: int):
+    statement = select(model).options(*selection_options(model, selection, strategy))
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    # one extra row tells whether another page exists, without a COUNT(*)
+    return statement.order_by(model.id).limit(limit + 1)
+
+
+def business_unit_page_statement(
+    selection: Selection, after_id: Optional[int], limit: int
+) -> Select:
+    """Keyset page of business units after ``after_id``, plus one lookahead row."""
+
+    return _page_statement(
+        BusinessUnit, selection, BUSINESS_UNIT_DETAIL.strategy, after_id, limit
+    )
+
+
+def project_page_statement(
+    selection: Selection,
+    after_id: Optional[int],
+    limit: int,
+    businessunit_id: Optional[int] = None,
+) -> Select:
+    """Keyset page of projects after ``after_id``, plus one lookahead row."""
+
+    strategy = PROJECT_DETAIL.strategy
+    statement = _page_statement(Project, selection, strategy, after_id, limit)
+    if businessunit_id is not None:
+        statement = statement.where(Project.businessunit_id == businessunit_id)
+    return statement
+
+
+def project_statement(selection: Selection, project_id: int) -> Select:
+    return (
+        select(Project)
+        .options(*selection_options(Project, selection, PROJECT_DETAIL.strategy))
+        .where(Project.id == project_id)
+    )
+
+
+def page(rows, limit: int) -> dict:
+    """The ``{items, next_cursor}`` payload of rows fetched by a page statement."""
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return {"items": rows, "next_cursor": rows[-1].id}
+    return {"items": rows, "next_cursor": None}
+
+
+class ReadRequest:
+    """Conditional and cached handling of one read of ``selection`` from ``model``.
+
+    ``exists`` is False for a single resource that may be missing: ``check``
+    then leaves ``If-None-Match: *`` to ``respond``, which is only reached
+    once the resource was found (pages always exist).
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        cache: ResponseCache,
+        model,
+        selection: Selection,
+        exists: bool = True,
+    ):
+        self.request = request
+        self.cache = cache
+        self.tables = selection_tables(model, selection)
+        self.exists = exists
+        self.validators: Optional[Validators] = None
+
+    def check(self, versions: dict[str, TableVersion]) -> Optional[Response]:
+        """Return the response if it needs no queries: a 304 or a cached body."""
+
+        self.validators = Validators.for_request(self.request, versions)
+        if self.validators.fresh(self.request, self.exists):
+            return self.validators.not_modified()
+        body = self.cache.get(self.validators.etag)
+        if body is not None:
+            # only found resources are cached, so this one exists
+            if self.validators.fresh(self.request):
+                return self.validators.not_modified()
+            return self.validators.apply(_json_response(body))
+        return None
+
+    def respond(self, schema, payload) -> Response:
+        """Serialize ``payload`` with ``schema``, cache the body and return it."""
+
+        if not self.exists and self.validators.fresh(self.request):
+            return self.validators.not_modified()
+        body = _json_body(schema, payload)
+        self.cache.put(self.validators.etag, body, self.tables)
+        return self.validators.apply(_json_response(body))
@@ -2,55 +2,100 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy.orm import Session, joinedload
-
+import zipfile
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from graphviz import ExecutableNotFound
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..evm import earned_value
+from ..graph import RenderCache, load_unit_graph, shape_graph, to_digraph
 from ..models import BusinessUnit, ChangeRequest, Issue, Project
+from ..portfolio import portfolio_summary
+from ..resources import overallocations
 from ..sample_data import create_sample_data
-from .dependencies import session_dependency
+from ..schedule import ScheduleCycleError, schedule_cache
+from ..versions import read_versions
+from ..xlsx import WorkbookImportError, import_workbook, stream_workbook
+from .cache import ResponseCache
+from .dependencies import (
+    render_cache_dependency,
+    response_cache_dependency,
+    session_dependency,
+    session_factory_dependency,
+    write_session_dependency,
+)
+from .fieldsets import page_schema, parse_selection, selection_schema
+from .loaders import BUSINESS_UNIT_DETAIL, PROJECT_DETAIL, LoadProfile
+from .reads import (
+    ReadRequest,
+    business_unit_page_statement,
+    page,
+    project_page_statement,
+    project_statement,
+)
 from .schemas import (
+    BatchErrorSchema,
+    BatchResultSchema,
     BusinessUnitCreateSchema,
+    BusinessUnitPageSchema,
     BusinessUnitSchema,
     BusinessUnitUpdateSchema,
+    ChangeRequestBatchSchema,
     ChangeRequestCreateSchema,
     ChangeRequestSchema,
     ChangeRequestUpdateSchema,
+    EarnedValueSchema,
+    IssueBatchSchema,
     IssueCreateSchema,
     IssueSchema,
     IssueUpdateSchema,
+    OverallocationSchema,
+    PortfolioSummarySchema,
     ProjectCreateSchema,
+    ProjectPageSchema,
     ProjectSchema,
     ProjectUpdateSchema,
+    ScheduleSchema,
 )
 
 
 router = APIRouter(prefix="/api", tags=["pmo"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+SVG_MEDIA_TYPE = "image/svg+xml"
 
-def _business_unit_query(session: Session):
-    return (
-        session.query(BusinessUnit)
-        .options(
-            joinedload(BusinessUnit.projects).joinedload(Project.status_history),
-            joinedload(BusinessUnit.projects).joinedload(Project.resource_assignments),
-            joinedload(BusinessUnit.projects).joinedload(Project.issues),
-            joinedload(BusinessUnit.projects).joinedload(Project.change_requests),
-            joinedload(BusinessUnit.businessplans),
-            joinedload(BusinessUnit.positions),
-        )
-    )
 
+def _business_unit_query(session: Session, profile: LoadProfile = BUSINESS_UNIT_DETAIL):
+    return session.query(BusinessUnit).options(*profile.options(BusinessUnit))
 
-def _project_query(session: Session):
-    return (
-        session.query(Project)
-        .options(
-            joinedload(Project.status_history),
-            joinedload(Project.resource_assignments),
-            joinedload(Project.issues),
-            joinedload(Project.change_requests),
-        )
-    )
+
+def _project_query(session: Session, profile: LoadProfile = PROJECT_DETAIL):
+    return session.query(Project).options(*profile.options(Project))
+
+
+def _ensure_exists(session: Session, model, row_id: int, detail: str) -> None:
+    """Raise a 404 unless a ``model`` row with ``row_id`` exists; reads only its key."""
+
+    if session.scalar(select(model.id).where(model.id == row_id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
 
 
 def _get_business_unit_or_404(session: Session, business_unit_id: int) -> BusinessUnit:
@@ -90,16 +135,174 @@ def _get_change_request_or_404(session: Session, change_request_id: int) -> Chan
     return change_request
 
 
-@router.get("/business-units", response_model=list[BusinessUnitSchema])
-def list_business_units(session: Session = Depends(session_dependency)):
-    units = _business_unit_query(session).all()
-    return units
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated fields to return; dotted paths select nested fields",
+)
+INCLUDE_QUERY = Query(
+    None,
+    description="Comma-separated relationships to expand (empty for none)",
+)
+
+
+@router.get("/business-units", response_model=BusinessUnitPageSchema)
+def list_business_units(
+    request: Request,
+    after_id: Optional[int] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: Session = Depends(session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(
+        BusinessUnitSchema, fields, include, BUSINESS_UNIT_DETAIL
+    )
+    read = ReadRequest(request, cache, BusinessUnit, selection)
+    response = read.check(read_versions(session, read.tables))
+    if response is not None:
+        return response
+    units = session.scalars(business_unit_page_statement(selection, after_id, limit))
+    schema = page_schema(selection_schema(BusinessUnitSchema, selection))
+    return read.respond(schema, page(units.unique().all(), limit))
+
+
+@router.get("/business-units/{business_unit_id}/graph.svg", response_class=Response)
+def get_business_unit_graph(
+    business_unit_id: int,
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels below the unit"),
+    types: Optional[str] = Query(None, description="Comma-separated node types to draw"),
+    collapse: Optional[int] = Query(
+        None, ge=2, description="Sibling leaves of one type shown as a count badge"
+    ),
+    project_id: Optional[int] = Query(None, description="Only this project's subtree"),
+    session: Session = Depends(session_dependency),
+    cache: RenderCache = Depends(render_cache_dependency),
+):
+    unit_graph = load_unit_graph(session, business_unit_id)
+    if unit_graph is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Business unit not found"
+        )
+    kinds = {kind.strip() for kind in types.split(",")} if types else None
+    if (max_depth, kinds, collapse, project_id) != (None, None, None, None):
+        try:
+            unit_graph = shape_graph(
+                unit_graph,
+                max_depth=max_depth,
+                kinds=kinds,
+                collapse=collapse,
+                project_id=project_id,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    try:
+        svg = cache.render(to_digraph(unit_graph).source, "svg")
+    except ExecutableNotFound as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Graphviz is not installed on the server",
+        ) from exc
+    return Response(content=svg, media_type=SVG_MEDIA_TYPE)
+
+
+@router.get("/projects", response_model=ProjectPageSchema)
+def list_projects(
+    request: Request,
+    businessunit_id: Optional[int] = None,
+    after_id: Optional[int] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: Session = Depends(session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(ProjectSchema, fields, include, PROJECT_DETAIL)
+    read = ReadRequest(request, cache, Project, selection)
+    response = read.check(read_versions(session, read.tables))
+    if response is not None:
+        return response
+    projects = session.scalars(
+        project_page_statement(selection, after_id, limit, businessunit_id)
+    )
+    schema = page_schema(selection_schema(ProjectSchema, selection))
+    return read.respond(schema, page(projects.unique().all(), limit))
 
 
 @router.get("/projects/{project_id}", response_model=ProjectSchema)
-def get_project(project_id: int, session: Session = Depends(session_dependency)):
-    project = _get_project_or_404(session, project_id)
-    return project
+def get_project(
+    request: Request,
+    project_id: int,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    session: Session = Depends(session_dependency),
+    cache: ResponseCache = Depends(response_cache_dependency),
+):
+    selection = parse_selection(ProjectSchema, fields, include, PROJECT_DETAIL)
+    read = ReadRequest(request, cache, Project, selection, exists=False)
+    response = read.check(read_versions(session, read.tables))
+    if response is not None:
+        return response
+    result = session.scalars(project_statement(selection, project_id))
+    project = result.unique().one_or_none()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return read.respond(selection_schema(ProjectSchema, selection), project)
+
+
+@router.get("/projects/{project_id}/schedule", response_model=ScheduleSchema)
+def get_project_schedule(project_id: int, session: Session = Depends(session_dependency)):
+    if session.get(Project, project_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    try:
+        schedule = schedule_cache(session.get_bind()).schedule(session, project_id)
+    except ScheduleCycleError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    return schedule
+
+
+@router.get("/portfolio/summary", response_model=PortfolioSummarySchema)
+def get_portfolio_summary(session: Session = Depends(session_dependency)):
+    return portfolio_summary(session)
+
+
+@router.get("/evm", response_model=list[EarnedValueSchema])
+def get_earned_value(
+    as_of: Optional[date] = Query(None, description="Status date (defaults to today)"),
+    level: Literal["workpackage", "controlaccount", "project", "businessunit"] = "project",
+    project_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+    session: Session = Depends(session_dependency),
+):
+    return earned_value(
+        session,
+        as_of=as_of,
+        level=level,
+        project_id=project_id,
+        businessunit_id=businessunit_id,
+    )
+
+
+@router.get("/resources/overallocations", response_model=list[OverallocationSchema])
+def get_resource_overallocations(
+    threshold: float = Query(100.0, gt=0, description="Allocation percent considered full"),
+    position_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+    start: Optional[date] = Query(None, description="Only report from this date"),
+    end: Optional[date] = Query(None, description="Only report up to this date"),
+    session: Session = Depends(session_dependency),
+):
+    try:
+        return overallocations(
+            session,
+            threshold=threshold,
+            position_id=position_id,
+            businessunit_id=businessunit_id,
+            start=start,
+            end=end,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
 
 
 @router.post(
@@ -108,30 +311,38 @@ def get_project(project_id: int, session: Session = Depends(session_dependency))
     status_code=status.HTTP_201_CREATED,
 )
 def create_business_unit(
-    payload: BusinessUnitCreateSchema, session: Session = Depends(session_dependency)
+    payload: BusinessUnitCreateSchema, session: Session = Depends(write_session_dependency)
 ):
-    business_unit = BusinessUnit(**payload.model_dump())
+    # a new unit has no children yet: start its collections loaded and empty
+    business_unit = BusinessUnit(
+        **payload.model_dump(), projects=[], businessplans=[], positions=[]
+    )
     session.add(business_unit)
+    session.flush()
+    response = BusinessUnitSchema.model_validate(business_unit)
     session.commit()
-    return _get_business_unit_or_404(session, business_unit.id)
+    return response
 
 
 @router.put("/business-units/{business_unit_id}", response_model=BusinessUnitSchema)
 def update_business_unit(
     business_unit_id: int,
     payload: BusinessUnitUpdateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
     business_unit = _get_business_unit_or_404(session, business_unit_id)
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(business_unit, field, value)
+    session.flush()
+    response = BusinessUnitSchema.model_validate(business_unit)
     session.commit()
-    session.refresh(business_unit)
-    return _get_business_unit_or_404(session, business_unit.id)
+    return response
 
 
 @router.delete("/business-units/{business_unit_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_business_unit(business_unit_id: int, session: Session = Depends(session_dependency)):
+def delete_business_unit(
+    business_unit_id: int, session: Session = Depends(write_session_dependency)
+):
     business_unit = _get_business_unit_or_404(session, business_unit_id)
     session.delete(business_unit)
     session.commit()
@@ -143,33 +354,44 @@ def delete_business_unit(business_unit_id: int, session: Session = Depends(sessi
     response_model=ProjectSchema,
     status_code=status.HTTP_201_CREATED,
 )
-def create_project(payload: ProjectCreateSchema, session: Session = Depends(session_dependency)):
-    _get_business_unit_or_404(session, payload.businessunit_id)
-    project = Project(**payload.model_dump())
+def create_project(
+    payload: ProjectCreateSchema, session: Session = Depends(write_session_dependency)
+):
+    _ensure_exists(session, BusinessUnit, payload.businessunit_id, "Business unit not found")
+    project = Project(
+        **payload.model_dump(),
+        status_history=[],
+        resource_assignments=[],
+        issues=[],
+        change_requests=[],
+    )
     session.add(project)
+    session.flush()
+    response = ProjectSchema.model_validate(project)
     session.commit()
-    return _get_project_or_404(session, project.id)
+    return response
 
 
 @router.put("/projects/{project_id}", response_model=ProjectSchema)
 def update_project(
     project_id: int,
     payload: ProjectUpdateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
     project = _get_project_or_404(session, project_id)
     data = payload.model_dump(exclude_unset=True)
     if "businessunit_id" in data:
-        _get_business_unit_or_404(session, data["businessunit_id"])
+        _ensure_exists(session, BusinessUnit, data["businessunit_id"], "Business unit not found")
     for field, value in data.items():
         setattr(project, field, value)
+    session.flush()
+    response = ProjectSchema.model_validate(project)
     session.commit()
-    session.refresh(project)
-    return _get_project_or_404(session, project.id)
+    return response
 
 
 @router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(project_id: int, session: Session = Depends(session_dependency)):
+def delete_project(project_id: int, session: Session = Depends(write_session_dependency)):
     project = _get_project_or_404(session, project_id)
     session.delete(project)
     session.commit()
@@ -184,37 +406,39 @@ def delete_project(project_id: int, session: Session = Depends(session_dependenc
 def create_issue(
     project_id: int,
     payload: IssueCreateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
-    _get_project_or_404(session, project_id)
+    _ensure_exists(session, Project, project_id, "Project not found")
     data = payload.model_dump(exclude_unset=True)
     data["project_id"] = project_id
     issue = Issue(**data)
     session.add(issue)
+    session.flush()
+    response = IssueSchema.model_validate(issue)
     session.commit()
-    session.refresh(issue)
-    return issue
+    return response
 
 
 @router.put("/issues/{issue_id}", response_model=IssueSchema)
 def update_issue(
     issue_id: int,
     payload: IssueUpdateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
     issue = _get_issue_or_404(session, issue_id)
     data = payload.model_dump(exclude_unset=True)
     if "project_id" in data and data["project_id"] is not None:
-        _get_project_or_404(session, data["project_id"])
+        _ensure_exists(session, Project, data["project_id"], "Project not found")
     for field, value in data.items():
         setattr(issue, field, value)
+    session.flush()
+    response = IssueSchema.model_validate(issue)
     session.commit()
-    session.refresh(issue)
-    return issue
+    return response
 
 
 @router.delete("/issues/{issue_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_issue(issue_id: int, session: Session = Depends(session_dependency)):
+def delete_issue(issue_id: int, session: Session = Depends(write_session_dependency)):
     issue = _get_issue_or_404(session, issue_id)
     session.delete(issue)
     session.commit()
@@ -229,16 +453,17 @@ def delete_issue(issue_id: int, session: Session = Depends(session_dependency)):
 def create_change_request(
     project_id: int,
     payload: ChangeRequestCreateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
-    _get_project_or_404(session, project_id)
+    _ensure_exists(session, Project, project_id, "Project not found")
     data = payload.model_dump(exclude_unset=True)
     data["project_id"] = project_id
     change_request = ChangeRequest(**data)
     session.add(change_request)
+    session.flush()
+    response = ChangeRequestSchema.model_validate(change_request)
     session.commit()
-    session.refresh(change_request)
-    return change_request
+    return response
 
 
 @router.put(
@@ -248,24 +473,25 @@ def create_change_request(
 def update_change_request(
     change_request_id: int,
     payload: ChangeRequestUpdateSchema,
-    session: Session = Depends(session_dependency),
+    session: Session = Depends(write_session_dependency),
 ):
     change_request = _get_change_request_or_404(session, change_request_id)
     data = payload.model_dump(exclude_unset=True)
     if "project_id" in data and data["project_id"] is not None:
-        _get_project_or_404(session, data["project_id"])
+        _ensure_exists(session, Project, data["project_id"], "Project not found")
     for field, value in data.items():
         setattr(change_request, field, value)
+    session.flush()
+    response = ChangeRequestSchema.model_validate(change_request)
     session.commit()
-    session.refresh(change_request)
-    return change_request
+    return response
 
 
 @router.delete(
     "/change-requests/{change_request_id}", status_code=status.HTTP_204_NO_CONTENT
 )
 def delete_change_request(
-    change_request_id: int, session: Session = Depends(session_dependency)
+    change_request_id: int, session: Session = Depends(write_session_dependency)
 ):
     change_request = _get_change_request_or_404(session, change_request_id)
     session.delete(change_request)
@@ -273,8 +499,124 @@ def delete_change_request(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+def _apply_batch(session: Session, model, payload, label: str) -> BatchResultSchema:
+    """Validate a create/update/delete batch as a whole, then write it in one transaction.
+
+    Referenced projects and the rows to update or delete are each looked up
+    with a single query. If any item is invalid nothing is written and every
+    failing item is reported in a ``422`` response. Creates are one
+    ``INSERT ... RETURNING`` executemany (SQLite runs it row by row to keep
+    the ids in request order), updates one executemany by primary key and
+    deletes one ``DELETE ... WHERE id IN``.
+    """
+
+    creates = [item.model_dump() for item in payload.create]
+    updates = [item.model_dump(exclude_unset=True) for item in payload.update]
+    targets = [row["id"] for row in updates] + payload.delete
+    project_ids = {row["project_id"] for row in creates + updates if row.get("project_id")}
+    known_projects = set(
+        session.scalars(select(Project.id).where(Project.id.in_(project_ids)))
+    )
+    known_rows = set(session.scalars(select(model.id).where(model.id.in_(targets))))
+
+    errors: list[BatchErrorSchema] = []
+
+    def check_project(op, index, row):
+        if "project_id" not in row:
+            return
+        project_id = row["project_id"]
+        if project_id is None:
+            detail = "project_id is required" if op == "create" else "project_id cannot be null"
+        elif project_id not in known_projects:
+            detail = f"Project {project_id} not found"
+        else:
+            return
+        errors.append(BatchErrorSchema(op=op, index=index, id=row.get("id"), detail=detail))
+
+    seen: set[int] = set()
+
+    def check_target(op, index, row_id):
+        if row_id not in known_rows:
+            detail = f"{label} {row_id} not found"
+        elif row_id in seen:
+            detail = f"{label} {row_id} is listed more than once"
+        else:
+            seen.add(row_id)
+            return
+        errors.append(BatchErrorSchema(op=op, index=index, id=row_id, detail=detail))
+
+    for index, row in enumerate(creates):
+        check_project("create", index, row)
+    for index, row in enumerate(updates):
+        check_target("update", index, row["id"])
+        check_project("update", index, row)
+    for index, row_id in enumerate(payload.delete):
+        check_target("delete", index, row_id)
+    if errors:
+        raise HTTPException(
+            status_code=422,  # the status FastAPI uses for request validation errors
+            detail=[error.model_dump() for error in errors],
+        )
+
+    try:
+        created = []
+        if creates:
+            created = session.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True), creates
+            ).all()
+        if updates:
+            session.execute(update(model), updates)
+        if payload.delete:
+            session.execute(delete(model).where(model.id.in_(payload.delete)))
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Rejected by the database: {exc.orig}"
+        ) from exc
+    return BatchResultSchema(
+        created=list(created), updated=[row["id"] for row in updates], deleted=payload.delete
+    )
+
+
+@router.post("/issues:batch", response_model=BatchResultSchema)
+def batch_issues(payload: IssueBatchSchema, session: Session = Depends(write_session_dependency)):
+    return _apply_batch(session, Issue, payload, "Issue")
+
+
+@router.post("/change-requests:batch", response_model=BatchResultSchema)
+def batch_change_requests(
+    payload: ChangeRequestBatchSchema, session: Session = Depends(write_session_dependency)
+):
+    return _apply_batch(session, ChangeRequest, payload, "Change request")
+
+
+@router.post("/import.xlsx")
+def import_xlsx(
+    workbook: UploadFile = File(..., description="Workbook with project and WBS sheets"),
+    session: Session = Depends(write_session_dependency),
+):
+    try:
+        return import_workbook(session, workbook.file)
+    except (WorkbookImportError, zipfile.BadZipFile) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except IntegrityError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Rejected by the database: {exc.orig}"
+        ) from exc
+
+
+@router.get("/export.xlsx", response_class=StreamingResponse)
+def export_xlsx(session_factory=Depends(session_factory_dependency)):
+    return StreamingResponse(
+        stream_workbook(session_factory),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="pmo-export.xlsx"'},
+    )
+
+
 @router.post("/sample-data", status_code=status.HTTP_201_CREATED)
-def seed_sample_data(session: Session = Depends(session_dependency)):
+def seed_sample_data(session: Session = Depends(write_session_dependency)):
     data = create_sample_data(session)
     return {
         "business_unit_id": data["business_unit"].id,
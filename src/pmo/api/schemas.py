@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from ..models import ChangeRequestStatus, IssueStatus, ProjectLifecycleStage, ProjectType
 
 
+# items accepted by one batch request, across create, update and delete
+MAX_BATCH_ITEMS = 10_000
+
+
 class BaseSchema(BaseModel):
     id: int
     name: str
@@ -115,6 +119,120 @@ class BusinessUnitSchema(BaseSchema):
     positions: list[PositionSchema]
 
 
+class ProjectPageSchema(BaseModel):
+    items: list[ProjectSchema]
+    next_cursor: Optional[int] = Field(
+        default=None, description="Pass as `after_id` to fetch the next page"
+    )
+
+
+class BusinessUnitPageSchema(BaseModel):
+    items: list[BusinessUnitSchema]
+    next_cursor: Optional[int] = Field(
+        default=None, description="Pass as `after_id` to fetch the next page"
+    )
+
+
+class PortfolioMeasuresSchema(BaseModel):
+    projects: int
+    budget: float
+    bid_value: float
+    open_issues: int
+    pending_change_requests: int
+
+
+class BusinessUnitSummarySchema(PortfolioMeasuresSchema):
+    businessunit_id: int
+    name: str
+
+
+class CategorySummarySchema(PortfolioMeasuresSchema):
+    category: ProjectType
+
+
+class StageSummarySchema(PortfolioMeasuresSchema):
+    stage: Optional[ProjectLifecycleStage]
+
+
+class PortfolioSummarySchema(BaseModel):
+    totals: PortfolioMeasuresSchema
+    by_business_unit: list[BusinessUnitSummarySchema]
+    by_category: list[CategorySummarySchema]
+    by_stage: list[StageSummarySchema]
+
+
+class EarnedValueSchema(BaseModel):
+    id: int
+    name: str
+    project_id: Optional[int]
+    businessunit_id: Optional[int]
+    bac: float
+    undistributed: float = Field(
+        description="Control account budget not yet spread over work packages"
+    )
+    pv: float
+    ev: float
+    ac: float
+    cv: float
+    sv: float
+    cpi: Optional[float]
+    spi: Optional[float]
+    eac: float
+    etc: float
+    vac: float
+
+
+class ScheduledTaskSchema(BaseModel):
+    task_id: int
+    name: str
+    duration: int
+    early_start: date
+    early_finish: date
+    late_start: date
+    late_finish: date
+    total_float: int
+    critical: bool
+
+    class Config:
+        from_attributes = True
+
+
+class ScheduleSchema(BaseModel):
+    project_id: int
+    start: Optional[date]
+    finish: Optional[date]
+    tasks: list[ScheduledTaskSchema]
+    critical_path: list[int]
+
+    class Config:
+        from_attributes = True
+
+
+class AllocationSchema(BaseModel):
+    id: int
+    position_id: int
+    project_id: int
+    role: str
+    allocation_percent: float
+    start_date: date
+    end_date: Optional[date]
+
+    class Config:
+        from_attributes = True
+
+
+class OverallocationSchema(BaseModel):
+    position_id: int
+    position_name: str
+    start: date
+    end: Optional[date] = Field(description="Last over-allocated day; null if open-ended")
+    peak_percent: float
+    assignments: list[AllocationSchema]
+
+    class Config:
+        from_attributes = True
+
+
 class BusinessUnitCreateSchema(BaseModel):
     name: str
     type: str = "businessunit"
@@ -219,3 +337,51 @@ class ChangeRequestUpdateSchema(BaseModel):
     approved_on: Optional[date] = None
     description: Optional[str] = None
     impact_summary: Optional[str] = None
+
+
+class IssueBatchUpdateSchema(IssueUpdateSchema):
+    id: int
+
+
+class _BatchSchema(BaseModel):
+    @model_validator(mode="after")
+    def _check_size(self):
+        items = len(self.create) + len(self.update) + len(self.delete)
+        if items > MAX_BATCH_ITEMS:
+            raise ValueError(f"a batch takes at most {MAX_BATCH_ITEMS} items, got {items}")
+        return self
+
+
+class IssueBatchSchema(_BatchSchema):
+    create: list[IssueCreateSchema] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+    update: list[IssueBatchUpdateSchema] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    delete: list[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+
+class ChangeRequestBatchUpdateSchema(ChangeRequestUpdateSchema):
+    id: int
+
+
+class ChangeRequestBatchSchema(_BatchSchema):
+    create: list[ChangeRequestCreateSchema] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    update: list[ChangeRequestBatchUpdateSchema] = Field(
+        default_factory=list, max_length=MAX_BATCH_ITEMS
+    )
+    delete: list[int] = Field(default_factory=list, max_length=MAX_BATCH_ITEMS)
+
+
+class BatchErrorSchema(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int = Field(description="Position of the item in its list")
+    id: Optional[int] = None
+    detail: str
+
+
+class BatchResultSchema(BaseModel):
+    created: list[int] = Field(description="Ids of the created rows, in request order")
+    updated: list[int]
+    deleted: list[int]
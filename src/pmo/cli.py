@@ -6,18 +6,22 @@ Provides CRUD operations for business units, positions, projects, and business p
 """
 
 import argparse
+import csv
+import enum
+import json
 import os
 import sys
+from collections.abc import Callable, Iterable, Sequence
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
-import uvicorn
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 
 from .models import (
-    Base,
     BusinessUnit,
     Position,
     Project,
@@ -30,21 +34,86 @@ from .models import (
     Risk,
     ProjectType,
 )
-from .db import create_session_factory
-from .sample_data import create_sample_data
+from .db import create_session_factory, get_engine
+from .evm import LEVELS as EVM_LEVELS, earned_value
+from .migrations import (
+    HEAD as SCHEMA_HEAD,
+    SchemaVersionError,
+    current_version,
+    ensure_schema,
+    upgrade,
+)
+from .resources import overallocations
+from .sample_data import create_sample_data, create_synthetic_portfolio
+from .schedule import ScheduleCycleError, compute_schedule
+from .xlsx import DEFAULT_BATCH_SIZE, WorkbookImportError, export_workbook, import_workbook
+
+
+LIST_FORMATS = ("text", "json", "csv")
+# rows fetched per round trip by the listing commands
+LIST_BATCH_SIZE = 1000
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def write_rows(rows: Iterable[Row], fields: Sequence[str], output_format: str, out=None):
+    """Stream ``rows`` to ``out`` as a JSON array of objects or as CSV with a header."""
+
+    out = out or sys.stdout
+    records = ({field: _plain(value) for field, value in zip(fields, row)} for row in rows)
+    if output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=list(fields), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+        return
+    separator = "[\n  "
+    for record in records:
+        out.write(separator)
+        json.dump(record, out)
+        separator = ",\n  "
+    out.write("[]\n" if separator.startswith("[") else "\n]\n")
+
+
+def print_rows(rows: Iterable[Row], title: str, empty: str, line: Callable[[Row], str]):
+    """Print ``title`` and one ``line(row)`` per row, or ``empty`` when there are none."""
+
+    found = False
+    for row in rows:
+        if not found:
+            print(title)
+            found = True
+        print(line(row))
+    if not found:
+        print(empty)
 
 
 class PMOCli:
     """Main CLI class for PMO operations"""
 
-    def __init__(self, db_url: str = "sqlite:///pmo.db"):
-        self.engine = create_engine(db_url)
-        Base.metadata.create_all(self.engine)
+    def __init__(self, db_url: Optional[str] = None, check_schema: bool = True):
+        self.engine = get_engine(db_url)
+        if check_schema:
+            ensure_schema(self.engine)
 
     def get_session(self):
         """Get database session"""
         return Session(self.engine)
 
+    def _list(self, statement, output_format: str, title: str, empty: str, line):
+        """Run a listing query in batches and write it as text, JSON or CSV"""
+        with self.get_session() as session:
+            result = session.execute(statement.execution_options(yield_per=LIST_BATCH_SIZE))
+            if output_format == "text":
+                print_rows(result, title, empty, line)
+            else:
+                write_rows(result, list(result.keys()), output_format)
+
     # BusinessUnit CRUD operations
     def create_business_unit(self, name: str, unit_type: str = "businessunit", parent_id: Optional[int] = None):
         """Create a new business unit"""
@@ -55,19 +124,28 @@ class PMOCli:
             print(f"Created BusinessUnit: {bu}")
             return bu.id
 
-    def list_business_units(self):
+    def list_business_units(self, output_format: str = "text"):
         """List all business units"""
-        with self.get_session() as session:
-            units = session.query(BusinessUnit).all()
-            if not units:
-                print("No business units found.")
-                return
-            
-            print("Business Units:")
-            for unit in units:
-                parent_info = f" (parent: {unit.parent.name})" if unit.parent else ""
-                manager_info = f" (managed by: {unit.managed_by.name})" if unit.managed_by else ""
-                print(f"  {unit.id}: {unit.name} [{unit.type}]{parent_info}{manager_info}")
+        parent = aliased(BusinessUnit)
+        statement = (
+            select(
+                BusinessUnit.id,
+                BusinessUnit.name,
+                BusinessUnit.type,
+                parent.name.label("parent"),
+                Position.name.label("manager"),
+            )
+            .outerjoin(parent, BusinessUnit.parent_id == parent.id)
+            .outerjoin(Position, BusinessUnit.manager_id == Position.id)
+            .order_by(BusinessUnit.id)
+        )
+
+        def line(unit):
+            parent_info = f" (parent: {unit.parent})" if unit.parent else ""
+            manager_info = f" (managed by: {unit.manager})" if unit.manager else ""
+            return f"  {unit.id}: {unit.name} [{unit.type}]{parent_info}{manager_info}"
+
+        self._list(statement, output_format, "Business Units:", "No business units found.", line)
 
     def get_business_unit(self, unit_id: int):
         """Get business unit by ID"""
@@ -127,23 +205,38 @@ class PMOCli:
             print(f"Created Position: {pos}")
             return pos.id
 
-    def list_positions(self, businessunit_id: Optional[int] = None):
+    def list_positions(self, businessunit_id: Optional[int] = None, output_format: str = "text"):
         """List positions, optionally filtered by business unit"""
-        with self.get_session() as session:
-            query = session.query(Position)
-            if businessunit_id:
-                query = query.filter(Position.businessunit_id == businessunit_id)
-            
-            positions = query.all()
-            if not positions:
-                print("No positions found.")
-                return
-            
-            print("Positions:")
-            for pos in positions:
-                parent_info = f" (reports to: {pos.parent.name})" if pos.parent else ""
-                manages_info = f" (manages: {pos.manages.name})" if pos.manages else ""
-                print(f"  {pos.id}: {pos.name} [{pos.businessunit.name}]{parent_info}{manages_info}")
+        parent = aliased(Position)
+        # a position may manage several units; report one per position
+        managed = (
+            select(BusinessUnit.manager_id, func.min(BusinessUnit.name).label("name"))
+            .where(BusinessUnit.manager_id.is_not(None))
+            .group_by(BusinessUnit.manager_id)
+            .subquery()
+        )
+        statement = (
+            select(
+                Position.id,
+                Position.name,
+                BusinessUnit.name.label("businessunit"),
+                parent.name.label("parent"),
+                managed.c.name.label("manages"),
+            )
+            .outerjoin(BusinessUnit, Position.businessunit_id == BusinessUnit.id)
+            .outerjoin(parent, Position.parent_id == parent.id)
+            .outerjoin(managed, managed.c.manager_id == Position.id)
+            .order_by(Position.id)
+        )
+        if businessunit_id:
+            statement = statement.where(Position.businessunit_id == businessunit_id)
+
+        def line(pos):
+            parent_info = f" (reports to: {pos.parent})" if pos.parent else ""
+            manages_info = f" (manages: {pos.manages})" if pos.manages else ""
+            return f"  {pos.id}: {pos.name} [{pos.businessunit}]{parent_info}{manages_info}"
+
+        self._list(statement, output_format, "Positions:", "No positions found.", line)
 
     # Project CRUD operations
     def create_project(self, name: str, businessunit_id: int, description: str, tender_no: str, 
@@ -182,22 +275,31 @@ class PMOCli:
             print(f"Created Project: {project}")
             return project.id
 
-    def list_projects(self, businessunit_id: Optional[int] = None):
+    def list_projects(self, businessunit_id: Optional[int] = None, output_format: str = "text"):
         """List projects, optionally filtered by business unit"""
-        with self.get_session() as session:
-            query = session.query(Project)
-            if businessunit_id:
-                query = query.filter(Project.businessunit_id == businessunit_id)
-            
-            projects = query.all()
-            if not projects:
-                print("No projects found.")
-                return
-            
-            print("Projects:")
-            for project in projects:
-                print(f"  {project.id}: {project.name} [{project.businessunit.name}]")
-                print(f"    Tender: {project.tender_no} | Budget: {project.budget} | Category: {project.category.name}")
+        statement = (
+            select(
+                Project.id,
+                Project.name,
+                BusinessUnit.name.label("businessunit"),
+                Project.tender_no,
+                Project.budget,
+                Project.category,
+            )
+            .outerjoin(BusinessUnit, Project.businessunit_id == BusinessUnit.id)
+            .order_by(Project.id)
+        )
+        if businessunit_id:
+            statement = statement.where(Project.businessunit_id == businessunit_id)
+
+        def line(project):
+            return (
+                f"  {project.id}: {project.name} [{project.businessunit}]\n"
+                f"    Tender: {project.tender_no} | Budget: {project.budget} | "
+                f"Category: {project.category.name}"
+            )
+
+        self._list(statement, output_format, "Projects:", "No projects found.", line)
 
     # BusinessPlan CRUD operations
     def create_business_plan(self, name: str, businessunit_id: int):
@@ -214,22 +316,31 @@ class PMOCli:
             print(f"Created BusinessPlan: {bp}")
             return bp.id
 
-    def list_business_plans(self, businessunit_id: Optional[int] = None):
+    def list_business_plans(self, businessunit_id: Optional[int] = None, output_format: str = "text"):
         """List business plans, optionally filtered by business unit"""
-        with self.get_session() as session:
-            query = session.query(BusinessPlan)
-            if businessunit_id:
-                query = query.filter(BusinessPlan.businessunit_id == businessunit_id)
-            
-            plans = query.all()
-            if not plans:
-                print("No business plans found.")
-                return
-            
-            print("Business Plans:")
-            for plan in plans:
-                obj_count = len(plan.objectives)
-                print(f"  {plan.id}: {plan.name} [{plan.businessunit.name}] ({obj_count} objectives)")
+        objectives = (
+            select(Objective.businessplan_id, func.count().label("count"))
+            .group_by(Objective.businessplan_id)
+            .subquery()
+        )
+        statement = (
+            select(
+                BusinessPlan.id,
+                BusinessPlan.name,
+                BusinessUnit.name.label("businessunit"),
+                func.coalesce(objectives.c.count, 0).label("objectives"),
+            )
+            .outerjoin(BusinessUnit, BusinessPlan.businessunit_id == BusinessUnit.id)
+            .outerjoin(objectives, objectives.c.businessplan_id == BusinessPlan.id)
+            .order_by(BusinessPlan.id)
+        )
+        if businessunit_id:
+            statement = statement.where(BusinessPlan.businessunit_id == businessunit_id)
+
+        def line(plan):
+            return f"  {plan.id}: {plan.name} [{plan.businessunit}] ({plan.objectives} objectives)"
+
+        self._list(statement, output_format, "Business Plans:", "No business plans found.", line)
 
     # Objective CRUD operations
     def create_objective(self, name: str, businessplan_id: int):
@@ -246,6 +357,149 @@ class PMOCli:
             print(f"Created Objective: {obj}")
             return obj.id
 
+    # Earned value
+    def earned_value_report(self, level: str = "project", as_of: Optional[date] = None,
+                            project_id: Optional[int] = None, businessunit_id: Optional[int] = None):
+        """Print earned value figures for one level of the portfolio"""
+        as_of = as_of or date.today()
+        with self.get_session() as session:
+            rows = earned_value(session, as_of=as_of, level=level, project_id=project_id,
+                                businessunit_id=businessunit_id)
+            if not rows:
+                print("No earned value data found.")
+                return
+
+            def ratio(value):
+                return f"{value:.2f}" if value is not None else "n/a"
+
+            print(f"Earned value by {level} as of {as_of.isoformat()}:")
+            for row in rows:
+                print(f"  {row['id']}: {row['name']}")
+                print(f"    BAC: {row['bac']:.2f} | PV: {row['pv']:.2f} | EV: {row['ev']:.2f} | "
+                      f"AC: {row['ac']:.2f}")
+                if row["undistributed"]:
+                    print(f"    Undistributed budget: {row['undistributed']:.2f}")
+                print(f"    CPI: {ratio(row['cpi'])} | SPI: {ratio(row['spi'])} | "
+                      f"EAC: {row['eac']:.2f} | VAC: {row['vac']:.2f}")
+
+    # Scheduling
+    def schedule_report(self, project_id: int, critical_only: bool = False):
+        """Print the critical path schedule of a project"""
+        with self.get_session() as session:
+            if not session.get(Project, project_id):
+                print(f"Project {project_id} not found.")
+                return
+            try:
+                schedule = compute_schedule(session, project_id)
+            except ScheduleCycleError as e:
+                print(f"Cannot schedule project {project_id}: {e}")
+                return
+            if not schedule.tasks:
+                print("No tasks found.")
+                return
+
+            print(f"Schedule for project {project_id}: {schedule.start} -> {schedule.finish}")
+            print(f"Critical path: {' -> '.join(str(task_id) for task_id in schedule.critical_path)}")
+            for task in schedule.tasks:
+                if critical_only and not task.critical:
+                    continue
+                marker = "*" if task.critical else " "
+                print(f" {marker}{task.task_id}: {task.name} | ES: {task.early_start} | EF: {task.early_finish} | "
+                      f"LS: {task.late_start} | LF: {task.late_finish} | Float: {task.total_float}d")
+
+    # Resources
+    def overallocation_report(self, threshold: float = 100.0, position_id: Optional[int] = None,
+                              businessunit_id: Optional[int] = None, start: Optional[date] = None,
+                              end: Optional[date] = None):
+        """Print windows in which positions are booked above the threshold"""
+        with self.get_session() as session:
+            windows = overallocations(session, threshold=threshold, position_id=position_id,
+                                      businessunit_id=businessunit_id, start=start, end=end)
+            if not windows:
+                print(f"No positions allocated above {threshold:g}%.")
+                return
+
+            print(f"Positions allocated above {threshold:g}%:")
+            for window in windows:
+                until = window.end.isoformat() if window.end else "open-ended"
+                print(f"  {window.position_id}: {window.position_name} | {window.start} -> {until} | "
+                      f"Peak: {window.peak_percent:g}%")
+                for assignment in window.assignments:
+                    until = assignment.end_date or "open-ended"
+                    print(f"    - assignment {assignment.id} (project {assignment.project_id}, "
+                          f"{assignment.role}): {assignment.allocation_percent:g}% "
+                          f"{assignment.start_date} -> {until}")
+
+    # Spreadsheets
+    def import_xlsx(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Import projects and their work breakdown from an Excel workbook"""
+        with self.get_session() as session:
+            try:
+                counts = import_workbook(session, path, batch_size=batch_size)
+            except (OSError, WorkbookImportError) as e:
+                print(f"Import failed: {e}")
+                return
+            except IntegrityError as e:
+                print(f"Import failed: rejected by the database: {e.orig}")
+                return
+            if not counts:
+                print("No importable sheets found.")
+                return
+            for sheet, count in counts.items():
+                print(f"Imported {count} rows from {sheet}")
+
+    def export_xlsx(self, path: str):
+        """Export projects, WBS, budgets, expenses and issues to an Excel workbook"""
+        with self.get_session() as session:
+            counts = export_workbook(session, path)
+        for sheet, count in counts.items():
+            print(f"Exported {count} rows to {sheet}")
+        print(f"Workbook written to {path}")
+
+    # Synthetic data
+    def seed_portfolio(self, units: int, projects: int, control_accounts: int,
+                       workpackages: int, tasks_per_wp: int, seed: int):
+        """Bulk-insert a deterministic synthetic portfolio"""
+        started = datetime.now()
+        with self.get_session() as session:
+            try:
+                counts = create_synthetic_portfolio(
+                    session, units=units, projects=projects, control_accounts=control_accounts,
+                    workpackages=workpackages, tasks_per_wp=tasks_per_wp, seed=seed,
+                )
+            except (ValueError, IntegrityError) as e:
+                print(f"Seeding failed: {e}")
+                return
+        elapsed = (datetime.now() - started).total_seconds()
+        print(f"Seeded {sum(counts.values())} rows in {elapsed:.1f}s (seed {seed}):")
+        for table, count in counts.items():
+            print(f"  {table}: {count}")
+
+    # Database schema
+    def db_upgrade(self, target: Optional[int] = None):
+        """Apply pending schema migrations"""
+        try:
+            before, after = upgrade(self.engine, target)
+        except (SchemaVersionError, ValueError) as e:
+            print(f"Upgrade failed: {e}")
+            return
+        if before == 0:
+            print(f"Created schema at version {after}.")
+        elif before is None:
+            print(f"Upgraded unversioned schema to version {after}.")
+        elif before == after:
+            print(f"Schema already at version {after}.")
+        else:
+            print(f"Upgraded schema from version {before} to {after}.")
+
+    def db_version(self):
+        """Print the schema version of the database"""
+        with self.engine.connect() as connection:
+            version = current_version(connection)
+        found = {None: "unversioned (pre-migration schema)", 0: "empty"}.get(version, version)
+        print(f"Database schema: {found}")
+        print(f"Latest version: {SCHEMA_HEAD}")
+
     # Graph generation
     def generate_graph(
         self,
@@ -254,6 +508,10 @@ class PMOCli:
         render: bool = True,
         view: bool = False,
         directory: str = "build",
+        max_depth: Optional[int] = None,
+        kinds: Optional[set[str]] = None,
+        collapse: Optional[int] = None,
+        per_project: bool = False,
     ):
         """Generate organizational graph for a business unit"""
         with self.get_session() as session:
@@ -262,12 +520,31 @@ class PMOCli:
                 print(f"Business unit {businessunit_id} not found.")
                 return
 
+            options = {"max_depth": max_depth, "kinds": kinds, "collapse": collapse}
             try:
-                unit.mk_graph(directory=directory, render=render, view=view)
+                if per_project:
+                    project_ids = session.scalars(
+                        select(Project.id)
+                        .where(Project.businessunit_id == businessunit_id)
+                        .order_by(Project.id)
+                    ).all()
+                    for project_id in project_ids:
+                        unit.mk_graph(
+                            directory=directory,
+                            filename=f"project-{project_id}.gv",
+                            render=render,
+                            view=view,
+                            project_id=project_id,
+                            **options,
+                        )
+                    what = f"{len(project_ids)} project graphs"
+                else:
+                    unit.mk_graph(directory=directory, render=render, view=view, **options)
+                    what = "Graph"
                 if render:
-                    print(f"Graph generated for {unit.name} in {directory}/")
+                    print(f"{what} generated for {unit.name} in {directory}/")
                 else:
-                    print(f"Graph created in-memory for {unit.name}; rendering skipped")
+                    print(f"{what} created in-memory for {unit.name}; rendering skipped")
             except Exception as e:
                 print(f"Error generating graph: {e}")
 
@@ -275,7 +552,7 @@ class PMOCli:
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(description="PMO CLI - Project Management Office tool")
-    parser.add_argument("--db", default="sqlite:///pmo.db", help="Database URL (default: sqlite:///pmo.db)")
+    parser.add_argument("--db", help="Database URL (default: $PMO_DATABASE_URL, else PMO_CONFIG, else sqlite:///pmo.db)")
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -288,7 +565,8 @@ def main():
     bu_create.add_argument("--type", default="businessunit", help="Unit type")
     bu_create.add_argument("--parent-id", type=int, help="Parent business unit ID")
     
-    bu_subparsers.add_parser("list", help="List business units")
+    bu_list = bu_subparsers.add_parser("list", help="List business units")
+    bu_list.add_argument("--format", default="text", choices=LIST_FORMATS, help="Output format")
     
     bu_get = bu_subparsers.add_parser("get", help="Get business unit")
     bu_get.add_argument("id", type=int, help="Business unit ID")
@@ -313,6 +591,7 @@ def main():
     
     pos_list = pos_subparsers.add_parser("list", help="List positions")
     pos_list.add_argument("--bu-id", type=int, help="Filter by business unit ID")
+    pos_list.add_argument("--format", default="text", choices=LIST_FORMATS, help="Output format")
     
     # Project commands
     proj_parser = subparsers.add_parser("proj", help="Project operations")
@@ -331,6 +610,7 @@ def main():
     
     proj_list = proj_subparsers.add_parser("list", help="List projects")
     proj_list.add_argument("--bu-id", type=int, help="Filter by business unit ID")
+    proj_list.add_argument("--format", default="text", choices=LIST_FORMATS, help="Output format")
     
     # BusinessPlan commands
     bp_parser = subparsers.add_parser("bp", help="Business plan operations")
@@ -342,6 +622,7 @@ def main():
     
     bp_list = bp_subparsers.add_parser("list", help="List business plans")
     bp_list.add_argument("--bu-id", type=int, help="Filter by business unit ID")
+    bp_list.add_argument("--format", default="text", choices=LIST_FORMATS, help="Output format")
     
     # Objective commands
     obj_parser = subparsers.add_parser("obj", help="Objective operations")
@@ -351,6 +632,63 @@ def main():
     obj_create.add_argument("name", help="Objective name")
     obj_create.add_argument("businessplan_id", type=int, help="Business plan ID")
     
+    # Earned value command
+    evm_parser = subparsers.add_parser("evm", help="Earned value report")
+    evm_parser.add_argument("--level", default="project", choices=EVM_LEVELS, help="Roll-up level")
+    evm_parser.add_argument("--as-of", type=date.fromisoformat, help="Status date (YYYY-MM-DD, default: today)")
+    evm_parser.add_argument("--project-id", type=int, help="Filter by project ID")
+    evm_parser.add_argument("--bu-id", type=int, help="Filter by business unit ID")
+    
+    # Schedule command
+    schedule_parser = subparsers.add_parser("schedule", help="Critical path schedule of a project")
+    schedule_parser.add_argument("project_id", type=int, help="Project ID")
+    schedule_parser.add_argument("--critical-only", action="store_true", help="Only list critical tasks")
+    
+    # Resource over-allocation command
+    overalloc_parser = subparsers.add_parser("overallocations", help="Positions booked above 100%%")
+    overalloc_parser.add_argument("--threshold", type=float, default=100.0,
+                                  help="Allocation percent considered full (default: 100)")
+    overalloc_parser.add_argument("--position-id", type=int, help="Filter by position ID")
+    overalloc_parser.add_argument("--bu-id", type=int, help="Filter by the position's business unit ID")
+    overalloc_parser.add_argument("--start", type=date.fromisoformat, help="Report from date (YYYY-MM-DD)")
+    overalloc_parser.add_argument("--end", type=date.fromisoformat, help="Report up to date (YYYY-MM-DD)")
+    
+    # Import command
+    import_parser = subparsers.add_parser("import", help="Import data")
+    import_subparsers = import_parser.add_subparsers(dest="import_format")
+    
+    import_xlsx = import_subparsers.add_parser("xlsx", help="Import projects and WBS from an Excel workbook")
+    import_xlsx.add_argument("path", help="Workbook file")
+    import_xlsx.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                             help=f"Rows per INSERT batch (default: {DEFAULT_BATCH_SIZE})")
+    
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Export data")
+    export_subparsers = export_parser.add_subparsers(dest="export_format")
+    
+    export_xlsx = export_subparsers.add_parser("xlsx", help="Export the portfolio to an Excel workbook")
+    export_xlsx.add_argument("path", help="Workbook file to write")
+    
+    # Database schema commands
+    db_parser = subparsers.add_parser("db", help="Database schema operations")
+    db_subparsers = db_parser.add_subparsers(dest="db_action")
+    
+    db_upgrade = db_subparsers.add_parser("upgrade", help="Apply pending schema migrations")
+    db_upgrade.add_argument("--to", type=int, help="Target schema version (default: latest)")
+    db_subparsers.add_parser("version", help="Show the schema version")
+    
+    # Synthetic data command
+    seed_parser = subparsers.add_parser("seed", help="Bulk-insert a synthetic portfolio for benchmarking")
+    seed_parser.add_argument("--units", type=int, default=5, help="Business units (default: 5)")
+    seed_parser.add_argument("--projects", type=int, default=100, help="Projects (default: 100)")
+    seed_parser.add_argument("--control-accounts", type=int, default=3,
+                             help="Control accounts per project (default: 3)")
+    seed_parser.add_argument("--workpackages", type=int, default=3,
+                             help="Work packages per control account (default: 3)")
+    seed_parser.add_argument("--tasks-per-wp", type=int, default=10,
+                             help="Tasks per work package (default: 10)")
+    seed_parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+
     # Graph command
     graph_parser = subparsers.add_parser("graph", help="Generate organizational graph")
     graph_parser.add_argument("businessunit_id", type=int, help="Business unit ID")
@@ -369,6 +707,26 @@ def main():
         default="build",
         help="Target directory for rendered graph files",
     )
+    graph_parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="Only draw nodes up to this many levels below the business unit",
+    )
+    graph_parser.add_argument(
+        "--types",
+        help="Comma-separated node types to draw, e.g. project,controlaccount,workpackage",
+    )
+    graph_parser.add_argument(
+        "--collapse",
+        type=int,
+        metavar="N",
+        help="Replace N or more sibling leaves of one type with a count badge",
+    )
+    graph_parser.add_argument(
+        "--per-project",
+        action="store_true",
+        help="Write one graph per project (project-<id>.gv) instead of one for the unit",
+    )
 
     serve_parser = subparsers.add_parser("serve", help="Launch the FastAPI admin server")
     serve_parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
@@ -390,14 +748,27 @@ def main():
         parser.print_help()
         return
     
-    cli = PMOCli(args.db)
+    try:
+        cli = PMOCli(args.db, check_schema=args.command != "db")
+    except SchemaVersionError as e:
+        print(e)
+        sys.exit(1)
+    
+    # Handle database schema commands
+    if args.command == "db":
+        if args.db_action == "upgrade":
+            cli.db_upgrade(args.to)
+        elif args.db_action == "version":
+            cli.db_version()
+        else:
+            db_parser.print_help()
     
     # Handle BusinessUnit commands
-    if args.command == "bu":
+    elif args.command == "bu":
         if args.bu_action == "create":
             cli.create_business_unit(args.name, args.type, args.parent_id)
         elif args.bu_action == "list":
-            cli.list_business_units()
+            cli.list_business_units(args.format)
         elif args.bu_action == "get":
             cli.get_business_unit(args.id)
         elif args.bu_action == "update":
@@ -412,7 +783,7 @@ def main():
         if args.pos_action == "create":
             cli.create_position(args.name, args.businessunit_id, args.type, args.parent_id)
         elif args.pos_action == "list":
-            cli.list_positions(args.bu_id)
+            cli.list_positions(args.bu_id, args.format)
         else:
             pos_parser.print_help()
     
@@ -423,7 +794,7 @@ def main():
                              args.tender_no, args.scope_of_work, args.category, 
                              args.budget, args.bid_value)
         elif args.proj_action == "list":
-            cli.list_projects(args.bu_id)
+            cli.list_projects(args.bu_id, args.format)
         else:
             proj_parser.print_help()
     
@@ -432,7 +803,7 @@ def main():
         if args.bp_action == "create":
             cli.create_business_plan(args.name, args.businessunit_id)
         elif args.bp_action == "list":
-            cli.list_business_plans(args.bu_id)
+            cli.list_business_plans(args.bu_id, args.format)
         else:
             bp_parser.print_help()
     
@@ -443,14 +814,44 @@ def main():
         else:
             obj_parser.print_help()
     
+    elif args.command == "evm":
+        cli.earned_value_report(args.level, args.as_of, args.project_id, args.bu_id)
+    
+    elif args.command == "schedule":
+        cli.schedule_report(args.project_id, args.critical_only)
+    
+    elif args.command == "overallocations":
+        if args.start and args.end and args.start > args.end:
+            overalloc_parser.error("--start must not be after --end")
+        cli.overallocation_report(args.threshold, args.position_id, args.bu_id, args.start, args.end)
+    
+    elif args.command == "import":
+        if args.import_format == "xlsx":
+            cli.import_xlsx(args.path, args.batch_size)
+        else:
+            import_parser.print_help()
+    
+    elif args.command == "export":
+        if args.export_format == "xlsx":
+            cli.export_xlsx(args.path)
+        else:
+            export_parser.print_help()
+    
+    elif args.command == "seed":
+        cli.seed_portfolio(args.units, args.projects, args.control_accounts, args.workpackages,
+                           args.tasks_per_wp, args.seed)
+
     elif args.command == "serve":
+        import uvicorn
+
         db_url = args.db
         if args.seed:
             session_factory = create_session_factory(db_url)
             with session_factory() as session:
                 create_sample_data(session)
 
-        os.environ.setdefault("PMO_DATABASE_URL", db_url)
+        if db_url:
+            os.environ.setdefault("PMO_DATABASE_URL", db_url)
 
         if args.reload:
             uvicorn.run(
@@ -473,6 +874,10 @@ def main():
             render=not args.no_render,
             view=args.view,
             directory=args.directory,
+            max_depth=args.max_depth,
+            kinds={kind.strip() for kind in args.types.split(",")} if args.types else None,
+            collapse=args.collapse,
+            per_project=args.per_project,
         )
 
 
@@ -1,31 +1,450 @@
-"""Shared SQLAlchemy session/engine utilities for the PMO project."""
+"""Shared SQLAlchemy session/engine utilities for the PMO project.
+
+Engines are configured from, in increasing order of precedence: the
+:class:`EngineConfig` defaults, the ``[database]`` table of the TOML file
+named by ``PMO_CONFIG``, and environment variables. The URL is the one
+passed by the caller, else ``PMO_DATABASE_URL``, else the config file's
+``url``. Each other setting ``name`` is read from ``PMO_DB_<NAME>``:
+
+- ``pool_size`` / ``max_overflow``: connections kept open / extra under load
+- ``pool_timeout``: seconds to wait for a free connection
+- ``pool_pre_ping``: test connections on checkout
+- ``pool_recycle``: reconnect connections older than this many seconds
+- ``statement_timeout``: per-statement limit in milliseconds (PostgreSQL
+  ``statement_timeout``, MySQL ``max_execution_time``; not enforced on SQLite)
+- ``echo``: log SQL
+- ``sqlite_profile``: opt into the SQLite performance profile below
+- ``async_api``: serve the API's read endpoints from the async engine below
+
+One engine is kept per URL in a registry, and every pool records checkout
+counts and wait times, see :func:`pool_metrics`.
+
+SQLite profile
+--------------
+With ``sqlite_profile`` enabled on a file database every connection gets
+``SQLITE_PRAGMAS`` (WAL journal, ``synchronous=NORMAL``, memory-mapped I/O,
+a larger page cache and a busy timeout), so readers no longer block on a
+writer. Writes are meant to go through :func:`get_writer_engine`: a second
+engine on the same file whose pool holds exactly one connection and starts
+transactions with ``BEGIN IMMEDIATE``, so concurrent writers queue in the
+pool instead of failing with "database is locked" on lock upgrade. For any
+other database the writer engine is simply the regular engine.
+
+Async engines
+-------------
+:func:`get_async_engine` returns an ``AsyncEngine`` for the same database,
+using the asyncio driver in ``ASYNC_DRIVERS`` unless the URL already names
+one (``sqlite`` becomes ``sqlite+aiosqlite``, ``postgresql`` becomes
+``postgresql+asyncpg``). It shares the configuration, registry and pool
+metrics of the sync engines. An in-memory SQLite database is private to
+each engine, so the async engine needs a file or server database.
+"""
 
 from __future__ import annotations
 
 import os
-from functools import lru_cache
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import URL, Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .migrations import ensure_schema
 
-from .models import Base
+if TYPE_CHECKING:  # asyncio support is imported only when an async engine is built
+    from sqlalchemy.ext.asyncio import AsyncEngine
 
 
 DEFAULT_DATABASE_URL = "sqlite:///pmo.db"
+CONFIG_ENV = "PMO_CONFIG"
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # KiB when negative: 64 MiB
+    "busy_timeout": 5000,
+}
+
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+}
+
+
+class EngineConfig(NamedTuple):
+    url: str = DEFAULT_DATABASE_URL
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    statement_timeout: Optional[int] = None
+    echo: bool = False
+    sqlite_profile: bool = False
+    async_api: bool = False
+
+
+_SETTING_TYPES = {
+    "url": str,
+    "pool_size": int,
+    "max_overflow": int,
+    "pool_timeout": float,
+    "pool_pre_ping": bool,
+    "pool_recycle": int,
+    "statement_timeout": int,
+    "echo": bool,
+    "sqlite_profile": bool,
+    "async_api": bool,
+}
+
+
+def _coerce(name: str, value):
+    kind = _SETTING_TYPES[name]
+    if isinstance(value, str) and kind is not str:
+        value = value.strip()
+        if kind is bool:
+            return value.lower() in ("1", "true", "yes", "on")
+        if name == "statement_timeout" and value.lower() in ("", "none"):
+            return None
+    if name == "statement_timeout" and not value:
+        return None
+    return kind(value)
+
+
+def _read_config_file(path: str) -> dict:
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+
+    with open(path, "rb") as fh:
+        return tomllib.load(fh).get("database", {})
+
+
+def load_engine_config(
+    database_url: str | None = None, config_file: str | None = None
+) -> EngineConfig:
+    """Resolve the engine configuration for ``database_url``."""
+
+    settings: dict = {}
+    config_file = config_file or os.getenv(CONFIG_ENV)
+    if config_file:
+        for name, value in _read_config_file(config_file).items():
+            if name not in EngineConfig._fields:
+                raise ValueError(f"Unknown database setting {name!r} in {config_file}")
+            settings[name] = value
+    for name in EngineConfig._fields:
+        variable = f"PMO_DB_{name.upper()}"
+        if name != "url" and variable in os.environ:
+            settings[name] = os.environ[variable]
+    url = database_url or os.getenv("PMO_DATABASE_URL") or settings.get("url")
+    if url:
+        settings["url"] = url
+    return EngineConfig(**{name: _coerce(name, value) for name, value in settings.items()})
+
+
+class PoolMetrics:
+    """Counters updated from pool events; read them with :meth:`snapshot`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.disconnects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_wait_max_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkout_wait_seconds += seconds
+            if seconds > self.checkout_wait_max_seconds:
+                self.checkout_wait_max_seconds = seconds
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> dict[str, object]:
+        with self._lock:
+            figures = {
+                "connects": self.connects,
+                "disconnects": self.disconnects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_seconds": self.checkout_wait_seconds,
+                "checkout_wait_max_seconds": self.checkout_wait_max_seconds,
+            }
+        figures["pool"] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            figures.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return figures
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` that records how long each checkout waited."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """:class:`TimedQueuePool` for asyncio engines."""
+
+
+_engines: dict[str, Engine] = {}
+_writers: dict[str, Engine] = {}
+_async_engines: dict[str, AsyncEngine] = {}
+_metrics: dict[Engine, PoolMetrics] = {}
+_primary: "weakref.WeakKeyDictionary[Engine, Engine]" = weakref.WeakKeyDictionary()
+_registry_lock = threading.Lock()
+
+
+def _registry_key(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=False)
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _uses_sqlite_profile(config: EngineConfig) -> bool:
+    url = make_url(config.url)
+    return (
+        config.sqlite_profile
+        and url.get_backend_name() == "sqlite"
+        and not _is_memory_sqlite(url)
+    )
 
 
-@lru_cache(maxsize=1)
-def get_engine(database_url: str | None = None):
-    """Return a memoized SQLAlchemy engine for the provided URL."""
+def _apply_sqlite_profile(engine: Engine):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
 
-    url = database_url or os.getenv("PMO_DATABASE_URL", DEFAULT_DATABASE_URL)
-    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
-    return create_engine(url, future=True, connect_args=connect_args)
+
+def _begin_immediate(engine: Engine):
+    # pysqlite would otherwise BEGIN lazily and deferred; take the write lock
+    # up front so a transaction never fails half-way on lock upgrade
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def async_url(url) -> URL:
+    """Return ``url`` with the asyncio driver for its backend."""
+
+    url = make_url(url)
+    if url.get_dialect().is_async:
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def build_engine(config: EngineConfig, asynchronous: bool = False):
+    """Create an engine for ``config`` with pool metrics attached.
+
+    Returns ``(engine, metrics)``; the engine is an ``AsyncEngine`` when
+    ``asynchronous`` is set.
+    """
+
+    url = async_url(config.url) if asynchronous else make_url(config.url)
+    backend = url.get_backend_name()
+    kwargs: dict = {"echo": config.echo, "pool_pre_ping": config.pool_pre_ping}
+    connect_args: dict = {}
+    if backend == "sqlite":
+        connect_args["check_same_thread"] = False
+    if config.statement_timeout and backend == "postgresql":
+        if url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = {
+                "statement_timeout": str(config.statement_timeout)
+            }
+        else:
+            connect_args["options"] = f"-c statement_timeout={config.statement_timeout}"
+    if not _is_memory_sqlite(url):
+        # in-memory SQLite keeps one connection per thread; nothing to size
+        kwargs.update(
+            poolclass=TimedAsyncQueuePool if asynchronous else TimedQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+        )
+    if asynchronous:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        async_engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+        engine = async_engine.sync_engine
+    else:
+        engine = create_engine(url, connect_args=connect_args, **kwargs)
+
+    metrics = PoolMetrics()
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics = metrics
+    event.listen(engine, "connect", lambda *args: metrics.increment("connects"))
+    event.listen(engine, "close", lambda *args: metrics.increment("disconnects"))
+    event.listen(engine, "checkout", lambda *args: metrics.increment("checkouts"))
+    event.listen(engine, "checkin", lambda *args: metrics.increment("checkins"))
+
+    if config.statement_timeout and backend in ("mysql", "mariadb"):
+        timeout = int(config.statement_timeout)
+
+        @event.listens_for(engine, "connect")
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET SESSION max_execution_time = {timeout}")
+            cursor.close()
+
+    if _uses_sqlite_profile(config):
+        _apply_sqlite_profile(engine)
+
+    return (async_engine if asynchronous else engine), metrics
+
+
+def get_engine(database_url: str | None = None) -> Engine:
+    """Return the registered engine for a URL, creating it on first use."""
+
+    config = load_engine_config(database_url)
+    key = _registry_key(config.url)
+    with _registry_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine, _metrics[engine] = build_engine(config)
+            _engines[key] = engine
+        return engine
+
+
+def get_writer_engine(database_url: str | None = None) -> Engine:
+    """Return the engine writes should use; see the SQLite profile above."""
+
+    config = load_engine_config(database_url)
+    engine = get_engine(config.url)
+    if not _uses_sqlite_profile(config):
+        return engine
+    key = _registry_key(config.url)
+    with _registry_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer, metrics = build_engine(config._replace(pool_size=1, max_overflow=0))
+            _begin_immediate(writer)
+            _metrics[writer] = metrics
+            _primary[writer] = engine
+            _writers[key] = writer
+        return writer
+
+
+def get_async_engine(database_url: str | None = None) -> AsyncEngine:
+    """Return the registered ``AsyncEngine`` for a URL; see Async engines above."""
+
+    config = load_engine_config(database_url)
+    engine = get_engine(config.url)
+    key = _registry_key(config.url)
+    with _registry_lock:
+        async_engine = _async_engines.get(key)
+        if async_engine is None:
+            async_engine, metrics = build_engine(config, asynchronous=True)
+            _metrics[async_engine.sync_engine] = metrics
+            _primary[async_engine.sync_engine] = engine
+            _async_engines[key] = async_engine
+        return async_engine
+
+
+def primary_engine(bind: Engine) -> Engine:
+    """Map a writer or async engine back to the engine of the same database."""
+
+    return _primary.get(bind, bind)
+
+
+def dispose_engines():
+    """Close every registered engine's pool and empty the registry."""
+
+    with _registry_lock:
+        for engine in (*_engines.values(), *_writers.values()):
+            engine.dispose()
+        for async_engine in _async_engines.values():
+            # closing asyncio connections needs the event loop; let them go
+            async_engine.sync_engine.dispose(close=False)
+        _engines.clear()
+        _writers.clear()
+        _async_engines.clear()
+        _metrics.clear()
+
+
+def pool_metrics() -> dict[str, dict[str, object]]:
+    """Pool counters and occupancy for every registered engine, by masked URL."""
+
+    with _registry_lock:
+        items = [(engine, "") for engine in _engines.values()]
+        items += [(engine, " (writer)") for engine in _writers.values()]
+        items += [(engine.sync_engine, " (async)") for engine in _async_engines.values()]
+        items = [(engine, label, _metrics[engine]) for engine, label in items]
+    return {
+        engine.url.render_as_string(hide_password=True) + label: metrics.snapshot(engine.pool)
+        for engine, label, metrics in items
+    }
 
 
 def create_session_factory(database_url: str | None = None):
-    """Create a session factory bound to the project metadata."""
+    """Create a session factory, creating or version-checking the schema first."""
 
     engine = get_engine(database_url)
-    Base.metadata.create_all(engine)
+    ensure_schema(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+def create_write_session_factory(database_url: str | None = None):
+    """Create a session factory for API writes, bound to :func:`get_writer_engine`."""
+
+    engine = get_writer_engine(database_url)
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+
+def create_async_session_factory(database_url: str | None = None):
+    """Create an ``AsyncSession`` factory, creating or version-checking the schema first."""
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    ensure_schema(get_engine(database_url))
+    engine = get_async_engine(database_url)
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,308 @@
+"""Earned Value Management (EVM) computed with set-based SQL aggregation.
+
+For every work package, as of a given date:
+
+- BAC (budget at completion) is the sum of ``Budget.planned`` over the
+  budget lines booked against the work package, or ``WorkPackage.budget``
+  when it has none.
+- PV (planned value) spreads BAC linearly between ``start_date`` and
+  ``end_date``.
+- EV (earned value) is BAC times the share of the work package's tasks that
+  are complete; work packages without tasks have earned nothing yet.
+- AC (actual cost) is the sum of ``Expense.amount`` dated on or before the
+  as-of date.
+
+A control account's BAC is ``ControlAccount.budget`` when one is set, and the
+sum of its work packages' BAC otherwise. The part not yet spread over work
+packages is reported as ``undistributed``; it has no schedule, so it adds to
+BAC (and so to EAC and VAC) but never to PV or EV. Project and business unit
+BAC are the sums of their control accounts' BAC.
+
+``Budget.actual`` is not used: it carries no date, so it cannot be placed
+before or after the as-of date, and it would count the same spending as
+the expenses a second time. Budget lines without a work package are not
+used either, as the control account budgets already cover the project.
+
+Figures roll up WorkPackage -> ControlAccount -> Project -> BusinessUnit with
+``GROUP BY`` over per-work-package and per-control-account facts subqueries,
+so each level is one statement regardless of how many expenses or tasks
+exist. Project and business unit AC also include expenses not booked against
+a work package. The derived indices (CPI, SPI, EAC, ...) are computed from
+the aggregated sums.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Float, case, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    Budget,
+    BusinessUnit,
+    ControlAccount,
+    Expense,
+    Project,
+    Task,
+    WorkPackage,
+)
+
+
+LEVELS = ("workpackage", "controlaccount", "project", "businessunit")
+
+
+def _days_between(dialect_name: str, start, end):
+    """Return a SQL expression for the number of days from ``start`` to ``end``."""
+
+    if dialect_name == "sqlite":
+        return func.julianday(end) - func.julianday(start)
+    if dialect_name in ("mysql", "mariadb"):
+        return func.datediff(end, start)
+    return end - start
+
+
+def _workpackage_facts(session: Session, as_of: date):
+    """Per-work-package BAC, PV, EV and AC as of ``as_of``."""
+
+    dialect_name = session.get_bind().dialect.name
+    as_of_value = literal(as_of, WorkPackage.start_date.type)
+
+    tasks = (
+        select(
+            Task.workpackage_id,
+            func.count().label("total"),
+            func.sum(case((Task.is_complete, 1), else_=0)).label("done"),
+        )
+        .group_by(Task.workpackage_id)
+        .subquery()
+    )
+    costs = (
+        select(Expense.workpackage_id, func.sum(Expense.amount).label("ac"))
+        .where(Expense.workpackage_id.is_not(None), Expense.date <= as_of)
+        .group_by(Expense.workpackage_id)
+        .subquery()
+    )
+
+    budgets = (
+        select(Budget.workpackage_id, func.sum(Budget.planned).label("planned"))
+        .where(Budget.workpackage_id.is_not(None))
+        .group_by(Budget.workpackage_id)
+        .subquery()
+    )
+
+    bac = cast(func.coalesce(budgets.c.planned, WorkPackage.budget), Float)
+    duration = _days_between(dialect_name, WorkPackage.start_date, WorkPackage.end_date)
+    elapsed = _days_between(dialect_name, WorkPackage.start_date, as_of_value)
+    pv = case(
+        (WorkPackage.start_date > as_of, 0.0),
+        (WorkPackage.end_date <= as_of, bac),
+        else_=bac * cast(elapsed, Float) / cast(duration, Float),
+    )
+    ev = bac * func.coalesce(cast(tasks.c.done, Float) / func.nullif(tasks.c.total, 0), 0.0)
+
+    return (
+        select(
+            WorkPackage.id.label("workpackage_id"),
+            WorkPackage.controlaccount_id,
+            ControlAccount.project_id,
+            Project.businessunit_id,
+            bac.label("bac"),
+            pv.label("pv"),
+            ev.label("ev"),
+            func.coalesce(costs.c.ac, 0.0).label("ac"),
+        )
+        .join(ControlAccount, ControlAccount.id == WorkPackage.controlaccount_id)
+        .join(Project, Project.id == ControlAccount.project_id)
+        .outerjoin(tasks, tasks.c.workpackage_id == WorkPackage.id)
+        .outerjoin(costs, costs.c.workpackage_id == WorkPackage.id)
+        .outerjoin(budgets, budgets.c.workpackage_id == WorkPackage.id)
+        .subquery()
+    )
+
+
+def _control_account_facts(facts):
+    """Per-control-account BAC, undistributed budget, PV, EV and AC."""
+
+    distributed = func.coalesce(func.sum(facts.c.bac), 0.0)
+    bac = case(
+        (ControlAccount.budget > 0, cast(ControlAccount.budget, Float)), else_=distributed
+    )
+    return (
+        select(
+            ControlAccount.id.label("controlaccount_id"),
+            ControlAccount.project_id,
+            Project.businessunit_id,
+            bac.label("bac"),
+            (bac - distributed).label("undistributed"),
+            func.coalesce(func.sum(facts.c.pv), 0.0).label("pv"),
+            func.coalesce(func.sum(facts.c.ev), 0.0).label("ev"),
+            func.coalesce(func.sum(facts.c.ac), 0.0).label("ac"),
+        )
+        .join(Project, Project.id == ControlAccount.project_id)
+        .outerjoin(facts, facts.c.controlaccount_id == ControlAccount.id)
+        .group_by(
+            ControlAccount.id,
+            ControlAccount.budget,
+            ControlAccount.project_id,
+            Project.businessunit_id,
+        )
+        .subquery()
+    )
+
+
+def _sums(accounts):
+    return (
+        func.coalesce(func.sum(accounts.c.bac), 0.0).label("bac"),
+        func.coalesce(func.sum(accounts.c.undistributed), 0.0).label("undistributed"),
+        func.coalesce(func.sum(accounts.c.pv), 0.0).label("pv"),
+        func.coalesce(func.sum(accounts.c.ev), 0.0).label("ev"),
+    )
+
+
+def _level_statement(session: Session, level: str, as_of: date):
+    facts = _workpackage_facts(session, as_of)
+
+    if level == "workpackage":
+        return select(
+            facts.c.workpackage_id.label("id"),
+            WorkPackage.name,
+            facts.c.project_id,
+            facts.c.businessunit_id,
+            facts.c.bac,
+            literal(0.0).label("undistributed"),
+            facts.c.pv,
+            facts.c.ev,
+            facts.c.ac,
+        ).join(WorkPackage, WorkPackage.id == facts.c.workpackage_id)
+
+    accounts = _control_account_facts(facts)
+
+    if level == "controlaccount":
+        return select(
+            accounts.c.controlaccount_id.label("id"),
+            ControlAccount.name,
+            accounts.c.project_id,
+            accounts.c.businessunit_id,
+            accounts.c.bac,
+            accounts.c.undistributed,
+            accounts.c.pv,
+            accounts.c.ev,
+            accounts.c.ac,
+        ).join(ControlAccount, ControlAccount.id == accounts.c.controlaccount_id)
+
+    # Project and business unit AC includes expenses without a work package.
+    if level == "project":
+        planned = (
+            select(accounts.c.project_id, *_sums(accounts))
+            .group_by(accounts.c.project_id)
+            .subquery()
+        )
+        costs = (
+            select(Expense.project_id, func.sum(Expense.amount).label("ac"))
+            .where(Expense.date <= as_of)
+            .group_by(Expense.project_id)
+            .subquery()
+        )
+        return (
+            select(
+                Project.id,
+                Project.name,
+                Project.id.label("project_id"),
+                Project.businessunit_id,
+                func.coalesce(planned.c.bac, 0.0).label("bac"),
+                func.coalesce(planned.c.undistributed, 0.0).label("undistributed"),
+                func.coalesce(planned.c.pv, 0.0).label("pv"),
+                func.coalesce(planned.c.ev, 0.0).label("ev"),
+                func.coalesce(costs.c.ac, 0.0).label("ac"),
+            )
+            .outerjoin(planned, planned.c.project_id == Project.id)
+            .outerjoin(costs, costs.c.project_id == Project.id)
+        )
+
+    if level == "businessunit":
+        planned = (
+            select(accounts.c.businessunit_id, *_sums(accounts))
+            .group_by(accounts.c.businessunit_id)
+            .subquery()
+        )
+        costs = (
+            select(Project.businessunit_id, func.sum(Expense.amount).label("ac"))
+            .join(Project, Project.id == Expense.project_id)
+            .where(Expense.date <= as_of)
+            .group_by(Project.businessunit_id)
+            .subquery()
+        )
+        return (
+            select(
+                BusinessUnit.id,
+                BusinessUnit.name,
+                literal(None).label("project_id"),
+                BusinessUnit.id.label("businessunit_id"),
+                func.coalesce(planned.c.bac, 0.0).label("bac"),
+                func.coalesce(planned.c.undistributed, 0.0).label("undistributed"),
+                func.coalesce(planned.c.pv, 0.0).label("pv"),
+                func.coalesce(planned.c.ev, 0.0).label("ev"),
+                func.coalesce(costs.c.ac, 0.0).label("ac"),
+            )
+            .outerjoin(planned, planned.c.businessunit_id == BusinessUnit.id)
+            .outerjoin(costs, costs.c.businessunit_id == BusinessUnit.id)
+        )
+
+    raise ValueError(f"Unknown EVM level {level!r}; expected one of {LEVELS}")
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def _indices(row) -> dict[str, object]:
+    bac, pv, ev, ac = row.bac, row.pv, row.ev, row.ac
+    cpi = _ratio(ev, ac)
+    spi = _ratio(ev, pv)
+    # With no cost history assume the remaining work is performed at budget.
+    eac = bac / cpi if cpi else ac + (bac - ev)
+    return {
+        "id": row.id,
+        "name": row.name,
+        "project_id": row.project_id,
+        "businessunit_id": row.businessunit_id,
+        "bac": bac,
+        "undistributed": row.undistributed,
+        "pv": pv,
+        "ev": ev,
+        "ac": ac,
+        "cv": ev - ac,
+        "sv": ev - pv,
+        "cpi": cpi,
+        "spi": spi,
+        "eac": eac,
+        "etc": eac - ac,
+        "vac": bac - eac,
+    }
+
+
+def earned_value(
+    session: Session,
+    *,
+    as_of: Optional[date] = None,
+    level: str = "project",
+    project_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+) -> list[dict[str, object]]:
+    """Return EVM figures for every entity at ``level`` as of ``as_of``.
+
+    ``project_id`` and ``businessunit_id`` narrow the result to one project or
+    business unit; ``as_of`` defaults to today.
+    """
+
+    as_of = as_of or date.today()
+    statement = _level_statement(session, level, as_of).subquery()
+    query = select(statement)
+    if project_id is not None:
+        query = query.where(statement.c.project_id == project_id)
+    if businessunit_id is not None:
+        query = query.where(statement.c.businessunit_id == businessunit_id)
+    rows = session.execute(query.order_by(statement.c.id)).all()
+    return [_indices(row) for row in rows]
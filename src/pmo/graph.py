@@ -0,0 +1,620 @@
+"""Set-based loading of business unit diagrams.
+
+:func:`load_unit_graph` reads everything a business unit diagram shows with
+one query per table, selecting only the ids, names and parent keys of the
+rows in the unit's subtree, so the number of queries does not depend on how
+many projects, issues or plans the unit has. The rows become
+:class:`GraphNode` entries grouped into :class:`GraphSection` blocks (the
+top level and the ``orgchart``, ``projects`` and ``businessplans``
+clusters), and :func:`to_digraph` writes them out as a ``graphviz.Digraph``
+without touching the ORM again.
+
+Node ids match :attr:`pmo.models.CommonMixin.idx` and each edge points from
+a node to its parent, as in :meth:`pmo.models.CommonMixin.register`.
+
+Render cache
+------------
+Graphviz layout dominates diagram cost. :class:`RenderCache` keeps rendered
+output on disk under the SHA-256 of the DOT source, format and layout
+engine, so an unchanged unit is never laid out twice. The cache directory
+is capped in bytes and the least recently used files are evicted first (a
+hit refreshes the file's modification time). The default cache lives in
+``PMO_GRAPH_CACHE_DIR`` (``build/graph-cache``) and holds up to
+``PMO_GRAPH_CACHE_MAX_MB`` megabytes (64).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    BusinessPlan,
+    BusinessUnit,
+    ChangeRequest,
+    ControlAccount,
+    Initiative,
+    Issue,
+    KeyResult,
+    Objective,
+    Position,
+    Project,
+    ProjectStatusHistory,
+    ResourceAssignment,
+    Risk,
+    Task,
+    WorkPackage,
+)
+
+if TYPE_CHECKING:
+    import graphviz
+
+
+class GraphNode(NamedTuple):
+    """A diagram node and the edge to its parent.
+
+    ``kind`` is the lower-case model name, ``depth`` the number of edges to
+    the business unit (orgchart roots count as children of the unit) and
+    ``project_id`` the project whose subtree the node belongs to, if any.
+    """
+
+    id: str
+    label: str
+    attrs: dict[str, str]
+    parent: Optional[str] = None
+    kind: str = ""
+    depth: int = 0
+    project_id: Optional[int] = None
+
+
+class GraphSection(NamedTuple):
+    """Nodes emitted together; ``name`` is None for the top level of the graph."""
+
+    name: Optional[str]
+    label: Optional[str]
+    nodes: list[GraphNode]
+
+
+class UnitGraph(NamedTuple):
+    businessunit_id: int
+    name: str
+    sections: list[GraphSection]
+
+
+def node_id(model, id: int) -> str:
+    return model.__name__.lower() + str(id)
+
+
+def _node(model, row, parent: Optional[str], depth: int, project_id=None) -> GraphNode:
+    return GraphNode(
+        node_id(model, row.id),
+        row.name,
+        model.__node_attr__,
+        parent,
+        model.__name__.lower(),
+        depth,
+        project_id,
+    )
+
+
+def _by(rows, key: str) -> dict[int, list]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[getattr(row, key)].append(row)
+    return grouped
+
+
+def load_unit_graph(session: Session, businessunit_id: int) -> Optional[UnitGraph]:
+    """Load the diagram of a business unit, or None if there is no such unit."""
+
+    unit = session.execute(
+        select(BusinessUnit.id, BusinessUnit.name, BusinessUnit.manager_id).where(
+            BusinessUnit.id == businessunit_id
+        )
+    ).one_or_none()
+    if unit is None:
+        return None
+
+    def rows(*columns, where, order_by):
+        return session.execute(select(*columns).where(where).order_by(order_by)).all()
+
+    project_ids = select(Project.id).where(Project.businessunit_id == businessunit_id)
+    account_ids = select(ControlAccount.id).where(ControlAccount.project_id.in_(project_ids))
+    plan_ids = select(BusinessPlan.id).where(BusinessPlan.businessunit_id == businessunit_id)
+    objective_ids = select(Objective.id).where(Objective.businessplan_id.in_(plan_ids))
+    keyresult_ids = select(KeyResult.id).where(KeyResult.objective_id.in_(objective_ids))
+
+    positions = rows(
+        Position.id,
+        Position.name,
+        Position.parent_id,
+        Position.businessunit_id,
+        where=or_(Position.businessunit_id == businessunit_id, Position.id == unit.manager_id),
+        order_by=Position.id,
+    )
+    projects = rows(
+        Project.id,
+        Project.name,
+        where=Project.businessunit_id == businessunit_id,
+        order_by=Project.id,
+    )
+    accounts = rows(
+        ControlAccount.id,
+        ControlAccount.name,
+        ControlAccount.project_id,
+        where=ControlAccount.project_id.in_(project_ids),
+        order_by=ControlAccount.id,
+    )
+    workpackages = rows(
+        WorkPackage.id,
+        WorkPackage.name,
+        WorkPackage.controlaccount_id,
+        where=WorkPackage.controlaccount_id.in_(account_ids),
+        order_by=WorkPackage.id,
+    )
+    risks = rows(
+        Risk.id,
+        Risk.name,
+        Risk.project_id,
+        where=Risk.project_id.in_(project_ids),
+        order_by=Risk.id,
+    )
+    statuses = rows(
+        ProjectStatusHistory.id,
+        ProjectStatusHistory.name,
+        ProjectStatusHistory.project_id,
+        where=ProjectStatusHistory.project_id.in_(project_ids),
+        order_by=ProjectStatusHistory.id,
+    )
+    assignments = rows(
+        ResourceAssignment.id,
+        ResourceAssignment.name,
+        ResourceAssignment.project_id,
+        ResourceAssignment.workpackage_id,
+        ResourceAssignment.task_id,
+        where=ResourceAssignment.project_id.in_(project_ids),
+        order_by=ResourceAssignment.id,
+    )
+    issues = rows(
+        Issue.id,
+        Issue.name,
+        Issue.project_id,
+        Issue.workpackage_id,
+        Issue.task_id,
+        where=Issue.project_id.in_(project_ids),
+        order_by=Issue.id,
+    )
+    changes = rows(
+        ChangeRequest.id,
+        ChangeRequest.name,
+        ChangeRequest.project_id,
+        ChangeRequest.workpackage_id,
+        where=ChangeRequest.project_id.in_(project_ids),
+        order_by=ChangeRequest.id,
+    )
+    plans = rows(
+        BusinessPlan.id,
+        BusinessPlan.name,
+        where=BusinessPlan.businessunit_id == businessunit_id,
+        order_by=BusinessPlan.id,
+    )
+    objectives = rows(
+        Objective.id,
+        Objective.name,
+        Objective.businessplan_id,
+        where=Objective.businessplan_id.in_(plan_ids),
+        order_by=Objective.id,
+    )
+    keyresults = rows(
+        KeyResult.id,
+        KeyResult.name,
+        KeyResult.objective_id,
+        where=KeyResult.objective_id.in_(objective_ids),
+        order_by=KeyResult.id,
+    )
+    initiatives = rows(
+        Initiative.id,
+        Initiative.name,
+        Initiative.keyresult_id,
+        where=Initiative.keyresult_id.in_(keyresult_ids),
+        order_by=Initiative.id,
+    )
+
+    unit_id = node_id(BusinessUnit, unit.id)
+    top = [_node(BusinessUnit, unit, None, 0)]
+    for position in positions:
+        if position.id == unit.manager_id:
+            top.append(_node(Position, position, unit_id, 1))
+
+    parents = {position.id: position.parent_id for position in positions}
+
+    def position_depth(position_id, seen=()) -> int:
+        parent_id = parents.get(position_id)
+        if parent_id not in parents or parent_id in seen:
+            return 1
+        return position_depth(parent_id, (*seen, position_id)) + 1
+
+    orgchart = [
+        _node(
+            Position,
+            position,
+            position.parent_id and node_id(Position, position.parent_id),
+            position_depth(position.id),
+        )
+        for position in positions
+        if position.businessunit_id == businessunit_id
+    ]
+
+    def attached(model, row) -> GraphNode:
+        """Node for an assignment, issue or change request, under its task,
+        work package or project (depths 5, 4 and 2)."""
+
+        task_id = getattr(row, "task_id", None)
+        if task_id is not None:
+            parent, depth = node_id(Task, task_id), 5
+        elif row.workpackage_id is not None:
+            parent, depth = node_id(WorkPackage, row.workpackage_id), 4
+        else:
+            parent, depth = node_id(Project, row.project_id), 2
+        return _node(model, row, parent, depth, row.project_id)
+
+    accounts_by_project = _by(accounts, "project_id")
+    workpackages_by_account = _by(workpackages, "controlaccount_id")
+    risks_by_project = _by(risks, "project_id")
+    statuses_by_project = _by(statuses, "project_id")
+    assignments_by_project = _by(assignments, "project_id")
+    issues_by_project = _by(issues, "project_id")
+    changes_by_project = _by(changes, "project_id")
+    project_nodes = []
+    for project in projects:
+        pid = project.id
+        project_id = node_id(Project, pid)
+        for account in accounts_by_project[pid]:
+            account_id = node_id(ControlAccount, account.id)
+            project_nodes.append(_node(ControlAccount, account, project_id, 2, pid))
+            for workpackage in workpackages_by_account[account.id]:
+                project_nodes.append(_node(WorkPackage, workpackage, account_id, 3, pid))
+        project_nodes += [_node(Risk, row, project_id, 2, pid) for row in risks_by_project[pid]]
+        project_nodes += [
+            _node(ProjectStatusHistory, row, project_id, 2, pid)
+            for row in statuses_by_project[pid]
+        ]
+        project_nodes += [attached(ResourceAssignment, row) for row in assignments_by_project[pid]]
+        project_nodes += [attached(Issue, row) for row in issues_by_project[pid]]
+        project_nodes += [attached(ChangeRequest, row) for row in changes_by_project[pid]]
+
+    objectives_by_plan = _by(objectives, "businessplan_id")
+    keyresults_by_objective = _by(keyresults, "objective_id")
+    initiatives_by_keyresult = _by(initiatives, "keyresult_id")
+    plan_nodes = []
+    for plan in plans:
+        for objective in objectives_by_plan[plan.id]:
+            objective_id = node_id(Objective, objective.id)
+            plan_nodes.append(_node(Objective, objective, node_id(BusinessPlan, plan.id), 2))
+            for keyresult in keyresults_by_objective[objective.id]:
+                keyresult_id = node_id(KeyResult, keyresult.id)
+                plan_nodes.append(_node(KeyResult, keyresult, objective_id, 3))
+                plan_nodes += [
+                    _node(Initiative, row, keyresult_id, 4)
+                    for row in initiatives_by_keyresult[keyresult.id]
+                ]
+
+    sections = [
+        GraphSection(None, None, top),
+        GraphSection("cluster_1", "orgchart", orgchart),
+        GraphSection(None, None, [_node(Project, row, unit_id, 1, row.id) for row in projects]),
+        GraphSection("cluster_2", "projects", project_nodes),
+        GraphSection(None, None, [_node(BusinessPlan, row, unit_id, 1) for row in plans]),
+        GraphSection("cluster_3", "businessplans", plan_nodes),
+    ]
+    return UnitGraph(unit.id, unit.name, sections)
+
+
+NODE_KINDS = {
+    model.__name__.lower(): model
+    for model in (
+        BusinessUnit,
+        Position,
+        Project,
+        ControlAccount,
+        WorkPackage,
+        Risk,
+        ProjectStatusHistory,
+        ResourceAssignment,
+        Issue,
+        ChangeRequest,
+        BusinessPlan,
+        Objective,
+        KeyResult,
+        Initiative,
+    )
+}
+
+
+def shape_graph(
+    unit_graph: UnitGraph,
+    *,
+    max_depth: Optional[int] = None,
+    kinds: Optional[set[str]] = None,
+    collapse: Optional[int] = None,
+    project_id: Optional[int] = None,
+) -> UnitGraph:
+    """Cut a loaded diagram down to a size Graphviz lays out quickly.
+
+    - ``project_id`` keeps only that project's subtree under the unit.
+    - ``kinds`` keeps only nodes of those ``NODE_KINDS`` (the unit is always
+      kept); a node whose parent was dropped is attached to its nearest kept
+      ancestor. Edges to tasks, which the diagram references but does not
+      draw, are left alone.
+    - ``max_depth`` drops nodes more than that many edges below the unit.
+    - ``collapse`` replaces every group of at least that many leaves of one
+      kind under the same parent with a single count badge.
+
+    Sections left empty are dropped.
+    """
+
+    if kinds is not None:
+        unknown = set(kinds) - set(NODE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown node types: {', '.join(sorted(unknown))}")
+    everything = {node.id: node for section in unit_graph.sections for node in section.nodes}
+
+    def keep(node: GraphNode) -> bool:
+        if node.depth == 0:
+            return True
+        if project_id is not None and node.project_id != project_id:
+            return False
+        if kinds is not None and node.kind not in kinds:
+            return False
+        return max_depth is None or node.depth <= max_depth
+
+    kept = {node_id for node_id, node in everything.items() if keep(node)}
+
+    def ancestor(parent: Optional[str]) -> Optional[str]:
+        seen = set()
+        while parent is not None and parent in everything and parent not in kept:
+            if parent in seen:
+                return None
+            seen.add(parent)
+            parent = everything[parent].parent
+        return parent
+
+    sections = []
+    for section in unit_graph.sections:
+        nodes = [
+            node._replace(parent=ancestor(node.parent))
+            for node in section.nodes
+            if node.id in kept
+        ]
+        sections.append(section._replace(nodes=nodes))
+
+    if collapse is not None:
+        sections = _collapse(sections, collapse)
+    sections = [section for section in sections if section.nodes]
+    return unit_graph._replace(sections=sections)
+
+
+def _collapse(sections: list[GraphSection], threshold: int) -> list[GraphSection]:
+    parents = {node.parent for section in sections for node in section.nodes}
+    groups = defaultdict(list)
+    for index, section in enumerate(sections):
+        for node in section.nodes:
+            if node.parent is not None and node.id not in parents:
+                groups[index, node.parent, node.kind].append(node)
+
+    badges = {}
+    for (index, parent, kind), leaves in groups.items():
+        if len(leaves) < threshold:
+            continue
+        first = leaves[0]
+        badge = first._replace(
+            id=f"{parent}_{kind}s",
+            label=f"{len(leaves)} × {NODE_KINDS[kind].__name__}",
+            attrs={**first.attrs, "shape": "box", "style": "rounded,filled"},
+        )
+        badges[first.id] = badge
+        for leaf in leaves[1:]:
+            badges[leaf.id] = None
+
+    result = []
+    for section in sections:
+        nodes = []
+        for node in section.nodes:
+            node = badges.get(node.id, node)
+            if node is not None:
+                nodes.append(node)
+        result.append(section._replace(nodes=nodes))
+    return result
+
+
+def _emit(graph: "graphviz.Digraph", nodes: list[GraphNode]):
+    for node in nodes:
+        graph.node(node.id, node.label, **node.attrs)
+        if node.parent:
+            graph.edge(node.id, node.parent)
+
+
+def to_digraph(unit_graph: UnitGraph) -> "graphviz.Digraph":
+    """Build the ``graphviz.Digraph`` for a loaded :class:`UnitGraph`."""
+
+    import graphviz
+
+    g = graphviz.Digraph("pmo", comment="dag")
+    for section in unit_graph.sections:
+        if section.name is None:
+            _emit(g, section.nodes)
+            continue
+        # see: https://github.com/microsoft/pylance-release/issues/4688
+        subgraph = g.subgraph(name=section.name)
+        assert subgraph is not None
+        with subgraph as c:
+            c.attr(color="blue")
+            c.node_attr["style"] = "filled"
+            c.attr(label=section.label)
+            _emit(c, section.nodes)
+    return g
+
+
+# -----------------------------------------------------------------------------
+# Render cache
+
+
+DEFAULT_CACHE_DIR = "build/graph-cache"
+DEFAULT_CACHE_MAX_MB = 64
+
+
+def _graphviz_pipe(source: str, format: str, engine: str) -> bytes:
+    import graphviz
+
+    return graphviz.Source(source, engine=engine).pipe(format=format)
+
+
+class RenderCache:
+    """Rendered diagrams on disk, keyed by the hash of their DOT source.
+
+    The size of the directory is kept as a running total: it is scanned once,
+    on the first store, and again only when the total goes over ``max_bytes``.
+    That rescan also picks up files written by other processes sharing the
+    directory, which the total does not see.
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+        renderer: Callable[[str, str, str], bytes] = _graphviz_pipe,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.renderer = renderer
+        self.hits = 0
+        self.misses = 0
+        self._bytes: Optional[int] = None  # unknown until the directory is scanned
+        self._lock = threading.Lock()
+    @classmethod
+    def from_env(cls) -> "RenderCache":
+        directory = os.getenv("PMO_GRAPH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        max_mb = float(os.getenv("PMO_GRAPH_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+        return cls(directory, int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def key(source: str, format: str = "svg", engine: str = "dot") -> str:
+        return hashlib.sha256(f"{engine}\0{format}\0{source}".encode()).hexdigest()
+
+    def path(self, key: str, format: str) -> Path:
+        return self.directory / f"{key}.{format}"
+
+    def render(self, source: str, format: str = "svg", engine: str = "dot") -> bytes:
+        """Return ``source`` rendered to ``format``, running Graphviz only on a miss."""
+
+        path = self.path(self.key(source, format, engine), format)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            try:
+                os.utime(path)
+            except FileNotFoundError:  # evicted meanwhile; the bytes are still good
+                pass
+            return data
+
+        self.misses += 1
+        data = self.renderer(source, format, engine)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(temporary, path)
+        self._stored(len(data))
+        return data
+
+    def _stored(self, size: int):
+        with self._lock:
+            if self._bytes is None:
+                # the scan already includes the file just stored
+                self._bytes = sum(size for _, size, _ in self._entries())
+            else:
+                # a concurrent store of the same key is counted twice, which
+                # at worst brings the next rescan forward
+                self._bytes += size
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> list[tuple[int, int, Path]]:
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used files until the cache fits ``max_bytes``."""
+
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+            self._bytes = total
+
+    def size(self) -> int:
+        if not self.directory.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.directory.iterdir())
+
+
+_default_cache: Optional[RenderCache] = None
+
+
+def render_cache() -> RenderCache:
+    """The process-wide :class:`RenderCache` configured from the environment."""
+
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache.from_env()
+    return _default_cache
+
+
+def render_to_files(
+    g: "graphviz.Digraph",
+    directory: str = "build",
+    filename: Optional[str] = None,
+    *,
+    view: bool = False,
+    cache: Optional[RenderCache] = None,
+) -> str:
+    """Write the DOT source and its cached rendering like ``Digraph.render``.
+
+    Returns the path of the rendered file (``<directory>/<filename>.<format>``).
+    """
+
+    cache = cache or render_cache()
+    source_path = Path(directory) / (filename or g.filename)
+    source_path.parent.mkdir(parents=True, exist_ok=True)
+    source_path.write_text(g.source, encoding=g.encoding)
+    output = Path(f"{source_path}.{g.format}")
+    output.write_bytes(cache.render(g.source, g.format, g.engine))
+    if view:
+        import graphviz
+
+        graphviz.view(output)
+    return str(output)
@@ -0,0 +1,113 @@
+"""Versioned schema migrations.
+
+The schema version lives in a one-row ``pmo_schema_version`` table.
+Migrations are modules listed in ``MIGRATIONS``; migration ``n`` (1-based)
+moves a database from version ``n - 1`` to ``n`` through its
+``upgrade(connection)`` function, and all pending ones run in a single
+transaction.
+
+Version 1 is the schema ``Base.metadata.create_all`` produced before
+migrations existed, so a database without the version table but with the
+PMO tables is treated as version 1. A brand-new database is created from
+the current models and stamped with the latest version directly.
+
+:func:`ensure_schema` is what session factories call at startup: one
+lookup of the version row, no reflection of the schema. Engines it has
+verified get their writes recorded in the change version table (see
+:mod:`pmo.versions`).
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from ..models import Base
+from ..versions import create_change_versions, track_changes
+from . import m0001_baseline, m0002_indexes, m0003_change_versions
+
+
+MIGRATIONS = (m0001_baseline, m0002_indexes, m0003_change_versions)
+HEAD = len(MIGRATIONS)
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "pmo_schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+# engine -> schema version it was verified at
+_checked: "weakref.WeakKeyDictionary[Engine, int]" = weakref.WeakKeyDictionary()
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema does not match this release."""
+
+
+def current_version(connection: Connection):
+    """Return the stored schema version, 0 for an empty database or None if unversioned."""
+
+    inspector = inspect(connection)
+    if inspector.has_table(schema_version.name):
+        version = connection.execute(select(schema_version.c.version)).scalar()
+        if version is not None:
+            return version
+    tables = set(inspector.get_table_names())
+    return None if tables & set(Base.metadata.tables) else 0
+
+
+def _stamp(connection: Connection, version: int):
+    if connection.execute(schema_version.update().values(version=version)).rowcount == 0:
+        connection.execute(schema_version.insert().values(version=version))
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> tuple[Optional[int], int]:
+    """Bring the database to ``target``; return ``(from_version, to_version)``.
+
+    ``from_version`` is 0 for a new database and None for an unversioned one.
+    """
+
+    target = len(MIGRATIONS) if target is None else target
+    if not 1 <= target <= len(MIGRATIONS):
+        raise ValueError(f"Unknown schema version {target}; latest is {len(MIGRATIONS)}")
+    with engine.begin() as connection:
+        version = current_version(connection)
+        _version_metadata.create_all(connection)
+        if version == 0:
+            Base.metadata.create_all(connection)
+            create_change_versions(connection, Base.metadata.tables)
+            _stamp(connection, len(MIGRATIONS))
+            return 0, len(MIGRATIONS)
+        start = 1 if version is None else version
+        if start > target:
+            raise SchemaVersionError(
+                f"Database is at schema version {start}, newer than {target}"
+            )
+        for migration in MIGRATIONS[start:target]:
+            migration.upgrade(connection)
+        _stamp(connection, target)
+    _checked.pop(engine, None)
+    return version, target
+
+
+def ensure_schema(engine: Engine):
+    """Create a fresh database, or check an existing one is at the latest version."""
+
+    if _checked.get(engine) == len(MIGRATIONS):
+        return
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version == 0:
+        upgrade(engine)
+    elif version != len(MIGRATIONS):
+        found = "unversioned" if version is None else f"at version {version}"
+        raise SchemaVersionError(
+            f"Database schema is {found} but this release needs version "
+            f"{len(MIGRATIONS)}; run `pmo db upgrade`"
+        )
+    _checked[engine] = len(MIGRATIONS)
+    track_changes(engine)
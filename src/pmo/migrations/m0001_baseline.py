@@ -0,0 +1,7 @@
+"""Baseline: the schema created by ``Base.metadata.create_all`` before migrations."""
+
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection):
+    pass
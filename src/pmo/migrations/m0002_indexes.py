@@ -0,0 +1,77 @@
+"""Index every foreign key and the composite keys the hot queries filter on.
+
+Composites lead with the foreign key, so they also serve plain lookups by
+it: issues and change requests by ``(project_id, status)``, expenses by
+``(project_id, date)`` and ``(workpackage_id, date)``, stage history by
+``(project_id, effective_date)``, assignments by ``(position_id,
+start_date)`` and dependencies by ``(successor_id, predecessor_id)``.
+"""
+
+from sqlalchemy import Column, Index, MetaData, Table
+from sqlalchemy.engine import Connection
+
+
+# table -> {index name: columns}, as declared on the models at this version
+INDEXES = {
+    "businessunit": {
+        "ix_businessunit_parent_id": ("parent_id",),
+        "ix_businessunit_manager_id": ("manager_id",),
+    },
+    "position": {
+        "ix_position_parent_id": ("parent_id",),
+        "ix_position_businessunit_id": ("businessunit_id",),
+    },
+    "businessplan": {"ix_businessplan_businessunit_id": ("businessunit_id",)},
+    "objective": {"ix_objective_businessplan_id": ("businessplan_id",)},
+    "keyresult": {"ix_keyresult_objective_id": ("objective_id",)},
+    "initiative": {"ix_initiative_keyresult_id": ("keyresult_id",)},
+    "project": {"ix_project_businessunit_id": ("businessunit_id",)},
+    "controlaccount": {"ix_controlaccount_project_id": ("project_id",)},
+    "workpackage": {"ix_workpackage_controlaccount_id": ("controlaccount_id",)},
+    "risk": {"ix_risk_project_id": ("project_id",)},
+    "contract": {"ix_contract_project_id": ("project_id",)},
+    "budget": {
+        "ix_budget_project_id": ("project_id",),
+        "ix_budget_workpackage_id": ("workpackage_id",),
+    },
+    "expense": {
+        "ix_expense_project_id_date": ("project_id", "date"),
+        "ix_expense_workpackage_id_date": ("workpackage_id", "date"),
+    },
+    "task": {"ix_task_workpackage_id": ("workpackage_id",)},
+    "milestone": {"ix_milestone_project_id": ("project_id",)},
+    "dependency": {
+        "ix_dependency_predecessor_id": ("predecessor_id",),
+        "ix_dependency_successor_id_predecessor_id": ("successor_id", "predecessor_id"),
+    },
+    "projectstatushistory": {
+        "ix_projectstatushistory_project_id_effective_date": ("project_id", "effective_date"),
+    },
+    "resourceassignment": {
+        "ix_resourceassignment_project_id": ("project_id",),
+        "ix_resourceassignment_position_id_start_date": ("position_id", "start_date"),
+        "ix_resourceassignment_workpackage_id": ("workpackage_id",),
+        "ix_resourceassignment_task_id": ("task_id",),
+    },
+    "issue": {
+        "ix_issue_project_id_status": ("project_id", "status"),
+        "ix_issue_workpackage_id": ("workpackage_id",),
+        "ix_issue_task_id": ("task_id",),
+        "ix_issue_owner_id": ("owner_id",),
+    },
+    "changerequest": {
+        "ix_changerequest_project_id_status": ("project_id", "status"),
+        "ix_changerequest_workpackage_id": ("workpackage_id",),
+        "ix_changerequest_requested_by_id": ("requested_by_id",),
+    },
+}
+
+
+def upgrade(connection: Connection):
+    metadata = MetaData()
+    for table_name, indexes in INDEXES.items():
+        columns = {name for names in indexes.values() for name in names}
+        table = Table(table_name, metadata, *(Column(name) for name in sorted(columns)))
+        for index_name, names in indexes.items():
+            index = Index(index_name, *(table.c[name] for name in names))
+            index.create(connection, checkfirst=True)
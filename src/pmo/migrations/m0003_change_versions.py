@@ -0,0 +1,52 @@
+"""Per-table change versions, read by the API for ETags and ``Last-Modified``.
+
+Adds ``pmo_change_version`` with a row for every table at this version; see
+:mod:`pmo.versions`.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+
+# the model tables at this version
+TABLES = (
+    "businessunit",
+    "position",
+    "businessplan",
+    "objective",
+    "keyresult",
+    "initiative",
+    "project",
+    "controlaccount",
+    "workpackage",
+    "workbreakdownstructure",
+    "risk",
+    "contract",
+    "budget",
+    "expense",
+    "task",
+    "milestone",
+    "dependency",
+    "projectstatushistory",
+    "resourceassignment",
+    "issue",
+    "changerequest",
+)
+
+
+def upgrade(connection: Connection):
+    table = Table(
+        "pmo_change_version",
+        MetaData(),
+        Column("table_name", String(64), primary_key=True),
+        Column("version", Integer, nullable=False),
+        Column("changed_at", DateTime, nullable=False),
+    )
+    table.create(connection, checkfirst=True)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    connection.execute(
+        table.insert(),
+        [{"table_name": name, "version": 1, "changed_at": now} for name in TABLES],
+    )
@@ -22,11 +22,12 @@ if TYPE_CHECKING:
     import graphviz
 
 
-from sqlalchemy import ForeignKey, Enum
+from sqlalchemy import ForeignKey, Enum, Index
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
     mapped_column,
+    object_session,
     relationship,
 )
 from sqlalchemy.orm import declared_attr
@@ -115,8 +116,10 @@ class BusinessUnit(CommonMixin, Base):
     }
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    parent_id = mapped_column(ForeignKey("businessunit.id"))
-    manager_id: Mapped[Optional[int]] = mapped_column(ForeignKey("position.id"))
+    parent_id = mapped_column(ForeignKey("businessunit.id"), index=True)
+    manager_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("position.id"), index=True
+    )
     type: Mapped[str]
     name: Mapped[str]
 
@@ -149,76 +152,37 @@ class BusinessUnit(CommonMixin, Base):
         *,
         render: bool = True,
         view: bool = False,
+        max_depth: Optional[int] = None,
+        kinds: Optional[set[str]] = None,
+        collapse: Optional[int] = None,
+        project_id: Optional[int] = None,
     ):
-        import graphviz
-
-        g = graphviz.Digraph(
-            "pmo",
-            comment="dag",
-        )
-        # graph_attr=dict(rankdir="LR")
-
-        self.register(g)
-        if self.managed_by:
-            self.managed_by.register(g, edge=self)
-
-        # see: https://github.com/microsoft/pylance-release/issues/4688
-        subgraph = g.subgraph(name="cluster_1")
-        assert subgraph is not None
-        with subgraph as c:
-            c.attr(color="blue")
-            c.node_attr["style"] = "filled"
-            c.attr(label="orgchart")
-            for pos in self.positions:
-                pos.register(c, edge=pos.parent)
-
-        for p in self.projects:
-            p.register(g, edge=self)
-
-        subgraph = g.subgraph(name="cluster_2")
-        assert subgraph is not None
-        with subgraph as c:
-            c.attr(color="blue")
-            c.node_attr["style"] = "filled"
-            c.attr(label="projects")
-            for p in self.projects:
-                # p.register(c, edge=self)
-                for ca in p.controlaccounts:
-                    ca.register(c, edge=p)
-                    for w in ca.workpackages:
-                        w.register(c, edge=ca)
-                for r in p.risks:
-                    r.register(c, edge=p)
-                for status in p.status_history:
-                    status.register(c, edge=p)
-                for assignment in p.resource_assignments:
-                    parent = assignment.task or assignment.workpackage or p
-                    assignment.register(c, edge=parent)
-                for issue in p.issues:
-                    parent = issue.task or issue.workpackage or p
-                    issue.register(c, edge=parent)
-                for change in p.change_requests:
-                    parent = change.workpackage or p
-                    change.register(c, edge=parent)
-
-        for bp in self.businessplans:
-            bp.register(g, edge=self)
-
-        subgraph = g.subgraph(name="cluster_3")
-        assert subgraph is not None
-        with subgraph as c:
-            c.attr(color="blue")
-            c.node_attr["style"] = "filled"
-            c.attr(label="businessplans")
-            for bp in self.businessplans:
-                for obj in bp.objectives:
-                    obj.register(c, edge=bp)
-                    for k in obj.keyresults:
-                        k.register(c, edge=obj)
-                        for ini in k.initiatives:
-                            ini.register(c, edge=k)
+        """Build (and optionally render) the unit's diagram from the database.
+
+        The subtree is read with a fixed number of set-based queries, see
+        :mod:`pmo.graph`, so the unit must be persistent in a session.
+        ``max_depth``, ``kinds``, ``collapse`` and ``project_id`` shrink the
+        diagram as described in :func:`pmo.graph.shape_graph`. Rendering
+        goes through the Graphviz render cache.
+        """
+
+        from .graph import load_unit_graph, render_to_files, shape_graph, to_digraph
+
+        session = object_session(self)
+        if session is None:
+            raise ValueError(f"{self!r} is not attached to a session")
+        unit_graph = load_unit_graph(session, self.id)
+        if (max_depth, kinds, collapse, project_id) != (None, None, None, None):
+            unit_graph = shape_graph(
+                unit_graph,
+                max_depth=max_depth,
+                kinds=kinds,
+                collapse=collapse,
+                project_id=project_id,
+            )
+        g = to_digraph(unit_graph)
         if render:
-            g.render(filename=filename, directory=directory, view=view)
+            render_to_files(g, directory, filename, view=view)
         return g
 
 
@@ -245,14 +209,14 @@ class Position(CommonMixin, Base):
     }
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    parent_id = mapped_column(ForeignKey("position.id"))
+    parent_id = mapped_column(ForeignKey("position.id"), index=True)
     type: Mapped[str]
     name: Mapped[str]
 
     parent = relationship("Position", back_populates="children", remote_side=[id])
     children = relationship("Position")
 
-    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"))
+    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"), index=True)
     businessunit: Mapped["BusinessUnit"] = relationship(
         back_populates="positions",
         foreign_keys=[businessunit_id],
@@ -287,7 +251,7 @@ class Position(CommonMixin, Base):
 class BusinessPlan(CommonMixin, Base):
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lightyellow"}
 
-    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"))
+    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"), index=True)
     businessunit: Mapped["BusinessUnit"] = relationship(back_populates="businessplans")
 
     objectives: Mapped[List["Objective"]] = relationship(
@@ -303,7 +267,7 @@ class Objective(CommonMixin, Base):
 
     __node_attr__ = {"style": "rounded,filled", "shape": "box", "fillcolor": "aqua"}
 
-    businessplan_id: Mapped[int] = mapped_column(ForeignKey("businessplan.id"))
+    businessplan_id: Mapped[int] = mapped_column(ForeignKey("businessplan.id"), index=True)
     businessplan: Mapped["BusinessPlan"] = relationship(back_populates="objectives")
     keyresults: Mapped[List["KeyResult"]] = relationship(
         back_populates="objective", cascade="all, delete-orphan"
@@ -319,7 +283,7 @@ class KeyResult(CommonMixin, Base):
         "fillcolor": "gainsboro",
     }
 
-    objective_id: Mapped[int] = mapped_column(ForeignKey("objective.id"))
+    objective_id: Mapped[int] = mapped_column(ForeignKey("objective.id"), index=True)
     objective: Mapped["Objective"] = relationship(back_populates="keyresults")
     initiatives: Mapped[List["Initiative"]] = relationship(
         back_populates="keyresult", cascade="all, delete-orphan"
@@ -335,7 +299,7 @@ class Initiative(CommonMixin, Base):
         "fillcolor": "aliceblue",
     }
 
-    keyresult_id: Mapped[int] = mapped_column(ForeignKey("keyresult.id"))
+    keyresult_id: Mapped[int] = mapped_column(ForeignKey("keyresult.id"), index=True)
     keyresult: Mapped["KeyResult"] = relationship(back_populates="initiatives")
 
 
@@ -346,7 +310,7 @@ class Initiative(CommonMixin, Base):
 class Project(CommonMixin, Base):
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lightgreen"}
 
-    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"))
+    businessunit_id: Mapped[int] = mapped_column(ForeignKey("businessunit.id"), index=True)
     businessunit: Mapped["BusinessUnit"] = relationship(back_populates="projects")
     controlaccounts: Mapped[List["ControlAccount"]] = relationship(
         back_populates="project", cascade="all, delete-orphan"
@@ -422,7 +386,7 @@ class ControlAccount(CommonMixin, Base):
 
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lightpink"}
 
-    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"), index=True)
     project: Mapped["Project"] = relationship(back_populates="controlaccounts")
     workpackages: Mapped[List["WorkPackage"]] = relationship(
         back_populates="controlaccount", cascade="all, delete-orphan"
@@ -440,7 +404,9 @@ class WorkPackage(CommonMixin, Base):
 
     __node_attr__ = {"shape": "note", "style": "filled", "fillcolor": "darkseagreen1"}
 
-    controlaccount_id: Mapped[int] = mapped_column(ForeignKey("controlaccount.id"))
+    controlaccount_id: Mapped[int] = mapped_column(
+        ForeignKey("controlaccount.id"), index=True
+    )
     controlaccount: Mapped["ControlAccount"] = relationship(
         back_populates="workpackages"
     )
@@ -484,7 +450,7 @@ class Risk(CommonMixin, Base):
         "fillcolor": "cornflowerblue",
     }
 
-    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"), index=True)
     project: Mapped["Project"] = relationship(back_populates="risks")
 
 
@@ -495,7 +461,7 @@ class Risk(CommonMixin, Base):
 class Contract(CommonMixin, Base):
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lightgoldenrodyellow"}
 
-    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"), index=True)
     project: Mapped["Project"] = relationship(back_populates="contracts")
     value: Mapped[float] = mapped_column(default=0.0)
     status: Mapped[str]
@@ -504,9 +470,9 @@ class Contract(CommonMixin, Base):
 class Budget(CommonMixin, Base):
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lightcyan"}
 
-    project_id: Mapped[Optional[int]] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[Optional[int]] = mapped_column(ForeignKey("project.id"), index=True)
     workpackage_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("workpackage.id", ondelete="SET NULL")
+        ForeignKey("workpackage.id", ondelete="SET NULL"), index=True
     )
     planned: Mapped[float] = mapped_column(default=0.0)
     actual: Mapped[float] = mapped_column(default=0.0)
@@ -514,6 +480,10 @@ class Budget(CommonMixin, Base):
 
 class Expense(CommonMixin, Base):
     __node_attr__ = {"shape": "box", "style": "filled", "fillcolor": "lavender"}
+    __table_args__ = (
+        Index("ix_expense_project_id_date", "project_id", "date"),
+        Index("ix_expense_workpackage_id_date", "workpackage_id", "date"),
+    )
 
     project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
     workpackage_id: Mapped[Optional[int]] = mapped_column(
@@ -531,7 +501,7 @@ class Expense(CommonMixin, Base):
 class Task(CommonMixin, Base):
     __node_attr__ = {"shape": "ellipse", "style": "filled", "fillcolor": "seashell"}
 
-    workpackage_id: Mapped[int] = mapped_column(ForeignKey("workpackage.id"))
+    workpackage_id: Mapped[int] = mapped_column(ForeignKey("workpackage.id"), index=True)
     workpackage: Mapped["WorkPackage"] = relationship(back_populates="tasks")
     start_date: Mapped[date]
     end_date: Mapped[date]
@@ -551,7 +521,7 @@ class Task(CommonMixin, Base):
 class Milestone(CommonMixin, Base):
     __node_attr__ = {"shape": "diamond", "style": "filled", "fillcolor": "khaki"}
 
-    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"), index=True)
     project: Mapped["Project"] = relationship(back_populates="milestones")
     due_date: Mapped[date]
     is_complete: Mapped[bool] = mapped_column(default=False)
@@ -559,8 +529,13 @@ class Milestone(CommonMixin, Base):
 
 class Dependency(Base):
     __tablename__ = "dependency"
+    __table_args__ = (
+        Index(
+            "ix_dependency_successor_id_predecessor_id", "successor_id", "predecessor_id"
+        ),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
-    predecessor_id: Mapped[int] = mapped_column(ForeignKey("task.id"))
+    predecessor_id: Mapped[int] = mapped_column(ForeignKey("task.id"), index=True)
     successor_id: Mapped[int] = mapped_column(ForeignKey("task.id"))
 
     predecessor: Mapped["Task"] = relationship(foreign_keys=[predecessor_id])
@@ -573,6 +548,13 @@ class ProjectStatusHistory(CommonMixin, Base):
         "style": "filled",
         "fillcolor": "lightsteelblue",
     }
+    __table_args__ = (
+        Index(
+            "ix_projectstatushistory_project_id_effective_date",
+            "project_id",
+            "effective_date",
+        ),
+    )
 
     project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
     project: Mapped["Project"] = relationship(
@@ -590,8 +572,11 @@ class ResourceAssignment(CommonMixin, Base):
         "style": "filled",
         "fillcolor": "mintcream",
     }
+    __table_args__ = (
+        Index("ix_resourceassignment_position_id_start_date", "position_id", "start_date"),
+    )
 
-    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("project.id"), index=True)
     project: Mapped["Project"] = relationship(
         back_populates="resource_assignments",
         foreign_keys=[project_id],
@@ -602,14 +587,14 @@ class ResourceAssignment(CommonMixin, Base):
         foreign_keys=[position_id],
     )
     workpackage_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("workpackage.id", ondelete="SET NULL")
+        ForeignKey("workpackage.id", ondelete="SET NULL"), index=True
     )
     workpackage: Mapped[Optional["WorkPackage"]] = relationship(
         back_populates="resource_assignments",
         foreign_keys=[workpackage_id],
     )
     task_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("task.id", ondelete="SET NULL")
+        ForeignKey("task.id", ondelete="SET NULL"), index=True
     )
     task: Mapped[Optional["Task"]] = relationship(
         back_populates="resource_assignments",
@@ -627,6 +612,7 @@ class Issue(CommonMixin, Base):
         "style": "filled",
         "fillcolor": "salmon",
     }
+    __table_args__ = (Index("ix_issue_project_id_status", "project_id", "status"),)
 
     project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
     project: Mapped["Project"] = relationship(
@@ -634,21 +620,21 @@ class Issue(CommonMixin, Base):
         foreign_keys=[project_id],
     )
     workpackage_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("workpackage.id", ondelete="SET NULL")
+        ForeignKey("workpackage.id", ondelete="SET NULL"), index=True
     )
     workpackage: Mapped[Optional["WorkPackage"]] = relationship(
         back_populates="issues",
         foreign_keys=[workpackage_id],
     )
     task_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("task.id", ondelete="SET NULL")
+        ForeignKey("task.id", ondelete="SET NULL"), index=True
     )
     task: Mapped[Optional["Task"]] = relationship(
         back_populates="issues",
         foreign_keys=[task_id],
     )
     owner_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("position.id", ondelete="SET NULL")
+        ForeignKey("position.id", ondelete="SET NULL"), index=True
     )
     owner: Mapped[Optional["Position"]] = relationship(
         back_populates="owned_issues",
@@ -669,6 +655,7 @@ class ChangeRequest(CommonMixin, Base):
         "style": "filled",
         "fillcolor": "lightcoral",
     }
+    __table_args__ = (Index("ix_changerequest_project_id_status", "project_id", "status"),)
 
     project_id: Mapped[int] = mapped_column(ForeignKey("project.id"))
     project: Mapped["Project"] = relationship(
@@ -676,13 +663,13 @@ class ChangeRequest(CommonMixin, Base):
         foreign_keys=[project_id],
     )
     workpackage_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("workpackage.id", ondelete="SET NULL")
+        ForeignKey("workpackage.id", ondelete="SET NULL"), index=True
     )
     workpackage: Mapped[Optional["WorkPackage"]] = relationship(
         back_populates="change_requests"
     )
     requested_by_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("position.id", ondelete="SET NULL")
+        ForeignKey("position.id", ondelete="SET NULL"), index=True
     )
     requested_by: Mapped[Optional["Position"]] = relationship(
         back_populates="requested_changes",
@@ -0,0 +1,135 @@
+"""Set-based portfolio aggregates computed in SQL.
+
+Every figure is produced by ``GROUP BY`` queries over one per-project facts
+subquery, so the cost is a handful of statements whatever the portfolio size
+and no ORM objects are materialised.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    BusinessUnit,
+    ChangeRequest,
+    ChangeRequestStatus,
+    Issue,
+    IssueStatus,
+    Project,
+    ProjectStatusHistory,
+)
+
+
+OPEN_ISSUE_STATUSES = (IssueStatus.open, IssueStatus.in_progress)
+PENDING_CHANGE_REQUEST_STATUSES = (ChangeRequestStatus.draft, ChangeRequestStatus.submitted)
+
+_MEASURES = ("projects", "budget", "bid_value", "open_issues", "pending_change_requests")
+
+
+def _project_facts():
+    """One row per project with its current stage and open/pending counts."""
+
+    open_issues = (
+        select(Issue.project_id, func.count().label("n"))
+        .where(Issue.status.in_(OPEN_ISSUE_STATUSES))
+        .group_by(Issue.project_id)
+        .subquery()
+    )
+    pending_changes = (
+        select(ChangeRequest.project_id, func.count().label("n"))
+        .where(ChangeRequest.status.in_(PENDING_CHANGE_REQUEST_STATUSES))
+        .group_by(ChangeRequest.project_id)
+        .subquery()
+    )
+    ranked_stages = select(
+        ProjectStatusHistory.project_id,
+        ProjectStatusHistory.stage,
+        func.row_number()
+        .over(
+            partition_by=ProjectStatusHistory.project_id,
+            order_by=(
+                ProjectStatusHistory.effective_date.desc(),
+                ProjectStatusHistory.id.desc(),
+            ),
+        )
+        .label("rank"),
+    ).subquery()
+    current_stage = (
+        select(ranked_stages.c.project_id, ranked_stages.c.stage)
+        .where(ranked_stages.c.rank == 1)
+        .subquery()
+    )
+
+    return (
+        select(
+            Project.id,
+            Project.businessunit_id,
+            Project.category,
+            Project.budget,
+            Project.bid_value,
+            current_stage.c.stage,
+            func.coalesce(open_issues.c.n, 0).label("open_issues"),
+            func.coalesce(pending_changes.c.n, 0).label("pending_change_requests"),
+        )
+        .outerjoin(open_issues, open_issues.c.project_id == Project.id)
+        .outerjoin(pending_changes, pending_changes.c.project_id == Project.id)
+        .outerjoin(current_stage, current_stage.c.project_id == Project.id)
+        .subquery()
+    )
+
+
+def _aggregates(facts):
+    return (
+        func.count(facts.c.id).label("projects"),
+        func.coalesce(func.sum(facts.c.budget), 0.0).label("budget"),
+        func.coalesce(func.sum(facts.c.bid_value), 0.0).label("bid_value"),
+        func.coalesce(func.sum(facts.c.open_issues), 0).label("open_issues"),
+        func.coalesce(func.sum(facts.c.pending_change_requests), 0).label(
+            "pending_change_requests"
+        ),
+    )
+
+
+def portfolio_summary(session: Session) -> dict[str, object]:
+    """Return portfolio totals broken down by business unit, category and stage.
+
+    The lifecycle stage of a project is its latest ``ProjectStatusHistory``
+    entry; projects without history are grouped under a ``None`` stage.
+    """
+
+    facts = _project_facts()
+
+    by_business_unit = session.execute(
+        select(BusinessUnit.id, BusinessUnit.name, *_aggregates(facts))
+        .outerjoin(facts, facts.c.businessunit_id == BusinessUnit.id)
+        .group_by(BusinessUnit.id, BusinessUnit.name)
+        .order_by(BusinessUnit.id)
+    ).all()
+    by_category = session.execute(
+        select(facts.c.category, *_aggregates(facts))
+        .group_by(facts.c.category)
+        .order_by(facts.c.category)
+    ).all()
+    by_stage = session.execute(
+        select(facts.c.stage, *_aggregates(facts))
+        .group_by(facts.c.stage)
+        .order_by(facts.c.stage)
+    ).all()
+
+    totals = {
+        measure: sum(getattr(row, measure) for row in by_category) for measure in _MEASURES
+    }
+    return {
+        "totals": totals,
+        "by_business_unit": [
+            {"businessunit_id": row.id, "name": row.name, **_measures(row)}
+            for row in by_business_unit
+        ],
+        "by_category": [{"category": row.category, **_measures(row)} for row in by_category],
+        "by_stage": [{"stage": row.stage, **_measures(row)} for row in by_stage],
+    }
+
+
+def _measures(row) -> dict[str, object]:
+    return {measure: getattr(row, measure) for measure in _MEASURES}
@@ -0,0 +1,170 @@
+"""Resource over-allocation detection with an interval sweep.
+
+Every ``ResourceAssignment`` books ``allocation_percent`` of a ``Position``
+from ``start_date`` through ``end_date`` (inclusive; open-ended when
+``end_date`` is NULL). For each position the assignment intervals are turned
+into start/stop events, sorted, and swept once while keeping the running
+load, so the cost is O(n log n) in the number of assignments and does not
+depend on how many days they span.
+
+A window is a maximal run of days on which the load of a position exceeds
+the threshold (100% by default). It reports the peak load and every
+assignment that was active at some point inside it.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from itertools import groupby
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import Position, ResourceAssignment
+
+
+# Summed percentages such as 3 x 33.3 must not flag a position as booked over.
+_TOLERANCE = 1e-9
+
+
+class Allocation(NamedTuple):
+    id: int
+    position_id: int
+    project_id: int
+    role: str
+    allocation_percent: float
+    start_date: date
+    end_date: Optional[date]
+
+
+class Overallocation(NamedTuple):
+    """A maximal window in which a position is booked above the threshold."""
+
+    position_id: int
+    position_name: str
+    start: date
+    end: Optional[date]
+    peak_percent: float
+    assignments: list[Allocation]
+
+
+def sweep(allocations: list[Allocation], threshold: float = 100.0) -> list[tuple]:
+    """Return ``(start, end, peak, assignments)`` windows for one position.
+
+    ``end`` is the last over-allocated day, or None when the window never
+    closes because open-ended assignments keep the load above ``threshold``.
+    """
+
+    events: list[tuple[date, int]] = []
+    for i, allocation in enumerate(allocations):
+        events.append((allocation.start_date, i))
+        if allocation.end_date is not None:
+            events.append((allocation.end_date + timedelta(days=1), ~i))
+    events.sort()
+
+    windows = []
+    active: set[int] = set()
+    load = 0.0
+    window = None  # [start, peak, contributing indices]
+    for day, group in groupby(events, key=lambda event: event[0]):
+        started = []
+        for _, i in group:
+            if i >= 0:
+                active.add(i)
+                started.append(i)
+                load += allocations[i].allocation_percent
+            else:
+                active.discard(~i)
+                load -= allocations[~i].allocation_percent
+        if not active:
+            load = 0.0  # drop accumulated rounding error
+        over = load > threshold + _TOLERANCE
+        if window is not None and not over:
+            windows.append(_close(window, day - timedelta(days=1), allocations))
+            window = None
+        elif window is None and over:
+            window = [day, load, set(active)]
+        elif window is not None:
+            window[1] = max(window[1], load)
+            window[2].update(started)
+    if window is not None:
+        windows.append(_close(window, None, allocations))
+    return windows
+
+
+def _close(window: list, end: Optional[date], allocations: list[Allocation]) -> tuple:
+    start, peak, contributing = window
+    members = sorted((allocations[i] for i in contributing), key=lambda a: (a.start_date, a.id))
+    return start, end, peak, members
+
+
+def overallocations(
+    session: Session,
+    *,
+    threshold: float = 100.0,
+    position_id: Optional[int] = None,
+    businessunit_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> list[Overallocation]:
+    """Find windows in which positions are booked above ``threshold`` percent.
+
+    ``start``/``end`` restrict the analysis to that period: assignments are
+    clipped to it before the sweep, so windows, peaks and members only reflect
+    days inside it (members keep their full dates). ``position_id`` and
+    ``businessunit_id`` (of the position) narrow the positions examined.
+    Raises ``ValueError`` when ``start`` is after ``end``.
+    """
+
+    if start is not None and end is not None and start > end:
+        raise ValueError(f"start {start.isoformat()} is after end {end.isoformat()}")
+
+    query = (
+        select(
+            ResourceAssignment.id,
+            ResourceAssignment.position_id,
+            ResourceAssignment.project_id,
+            ResourceAssignment.role,
+            ResourceAssignment.allocation_percent,
+            ResourceAssignment.start_date,
+            ResourceAssignment.end_date,
+            Position.name.label("position_name"),
+        )
+        .join(Position, Position.id == ResourceAssignment.position_id)
+        .where(ResourceAssignment.allocation_percent > 0)
+        .order_by(ResourceAssignment.position_id)
+    )
+    if position_id is not None:
+        query = query.where(ResourceAssignment.position_id == position_id)
+    if businessunit_id is not None:
+        query = query.where(Position.businessunit_id == businessunit_id)
+    if start is not None:
+        query = query.where(
+            (ResourceAssignment.end_date.is_(None)) | (ResourceAssignment.end_date >= start)
+        )
+    if end is not None:
+        query = query.where(ResourceAssignment.start_date <= end)
+
+    results = []
+    rows = session.execute(query)
+    by_position = groupby(rows, key=lambda row: (row.position_id, row.position_name))
+    for (position, name), group in by_position:
+        allocations = {row.id: Allocation(*row[:7]) for row in group}
+        # sweep only the days inside the period, so peaks and members outside it
+        # cannot leak into the windows
+        clipped = [_clip(allocation, start, end) for allocation in allocations.values()]
+        for window_start, window_end, peak, members in sweep(clipped, threshold):
+            members = [allocations[member.id] for member in members]
+            results.append(
+                Overallocation(position, name, window_start, window_end, peak, members)
+            )
+    return results
+
+
+def _clip(allocation: Allocation, start: Optional[date], end: Optional[date]) -> Allocation:
+    if start is not None and allocation.start_date < start:
+        allocation = allocation._replace(start_date=start)
+    if end is not None and (allocation.end_date is None or allocation.end_date > end):
+        allocation = allocation._replace(end_date=end)
+    return allocation
@@ -1,9 +1,17 @@
-"""Utilities for seeding the database with representative sample data."""
+"""Utilities for seeding the database with representative sample data.
+
+:func:`create_sample_data` adds the small "Acme Power" dataset used by the
+tests and demos. :func:`create_synthetic_portfolio` bulk-inserts a large,
+deterministic portfolio for measuring the API, CLI and diagrams at scale:
+the same parameters and ``seed`` always produce the same rows.
+"""
 
 from __future__ import annotations
 
-from datetime import date
+import random
+from datetime import date, timedelta
 
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 
 from .models import (
@@ -12,10 +20,13 @@ from .models import (
     ChangeRequest,
     ChangeRequestStatus,
     ControlAccount,
+    Dependency,
+    Expense,
     Initiative,
     Issue,
     IssueStatus,
     KeyResult,
+    Milestone,
     Objective,
     Position,
     Project,
@@ -24,6 +35,7 @@ from .models import (
     ProjectType,
     ResourceAssignment,
     Risk,
+    Task,
     WorkPackage,
 )
 
@@ -154,3 +166,337 @@ def create_sample_data(session: Session) -> dict[str, object]:
         "work_package": work_package,
         "positions": {"ceo": ceo, "coo": coo, "pm": pm},
     }
+
+
+SYNTHETIC_START = date(2025, 1, 1)
+# projects generated and inserted together; bounds memory for large portfolios
+SYNTHETIC_CHUNK = 500
+STAGES = list(ProjectLifecycleStage)
+
+
+def _insert(session: Session, model, rows: list[dict], counts: dict[str, int]) -> list[int]:
+    """Insert ``rows`` with one executemany and return their ids in order."""
+
+    counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(rows)
+    if not rows:
+        return []
+    return session.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).all()
+
+
+def create_synthetic_portfolio(
+    session: Session,
+    *,
+    units: int = 5,
+    projects: int = 100,
+    control_accounts: int = 3,
+    workpackages: int = 3,
+    tasks_per_wp: int = 10,
+    seed: int = 0,
+) -> dict[str, int]:
+    """Bulk-insert a synthetic portfolio and return the rows added per table.
+
+    Each business unit gets a management chain, project managers, engineers
+    and a business plan with objectives, key results and initiatives.
+    Projects are spread round-robin over the units; each has
+    ``control_accounts`` control accounts of ``workpackages`` work packages
+    holding ``tasks_per_wp`` chained tasks, plus status history, budgets,
+    expenses, assignments, issues, change requests, risks and a milestone.
+    Rows are written with batched Core ``INSERT`` statements and committed
+    once at the end.
+    """
+
+    if units < 1 or projects < 0:
+        raise ValueError("need at least one business unit and a non-negative project count")
+    rng = random.Random(seed)
+    counts: dict[str, int] = {}
+    offset = session.scalar(select(func.max(Project.id))) or 0
+
+    unit_ids = _insert(
+        session,
+        BusinessUnit,
+        [{"name": f"Unit {n + 1:03d}", "type": "businessunit"} for n in range(units)],
+        counts,
+    )
+    staff: dict[int, dict[str, list[int]]] = {}
+    plans = []
+    for unit_id in unit_ids:
+        head, operations = _insert(
+            session,
+            Position,
+            [
+                {"name": "Head of Unit", "type": "position", "businessunit_id": unit_id},
+                {
+                    "name": "Operations Director",
+                    "type": "position",
+                    "businessunit_id": unit_id,
+                },
+            ],
+            counts,
+        )
+        session.execute(
+            update(Position).where(Position.id == operations).values(parent_id=head)
+        )
+        managers = _insert(
+            session,
+            Position,
+            [
+                {
+                    "name": f"Project Manager {n + 1}",
+                    "type": "position",
+                    "businessunit_id": unit_id,
+                    "parent_id": operations,
+                }
+                for n in range(3)
+            ],
+            counts,
+        )
+        engineers = _insert(
+            session,
+            Position,
+            [
+                {
+                    "name": f"Engineer {n + 1}",
+                    "type": "position",
+                    "businessunit_id": unit_id,
+                    "parent_id": managers[n % len(managers)],
+                }
+                for n in range(4)
+            ],
+            counts,
+        )
+        staff[unit_id] = {"managers": managers, "engineers": engineers}
+        session.execute(
+            update(BusinessUnit).where(BusinessUnit.id == unit_id).values(manager_id=head)
+        )
+        plans.append({"name": f"{SYNTHETIC_START.year} Plan", "businessunit_id": unit_id})
+
+    plan_ids = _insert(session, BusinessPlan, plans, counts)
+    objective_ids = _insert(
+        session,
+        Objective,
+        [
+            {"name": f"Objective {n + 1}", "businessplan_id": plan_id}
+            for plan_id in plan_ids
+            for n in range(3)
+        ],
+        counts,
+    )
+    keyresult_ids = _insert(
+        session,
+        KeyResult,
+        [
+            {"name": f"Key result {n + 1}", "objective_id": objective_id}
+            for objective_id in objective_ids
+            for n in range(2)
+        ],
+        counts,
+    )
+    _insert(
+        session,
+        Initiative,
+        [{"name": "Initiative", "keyresult_id": keyresult} for keyresult in keyresult_ids],
+        counts,
+    )
+
+    for first in range(0, projects, SYNTHETIC_CHUNK):
+        numbers = range(first, min(first + SYNTHETIC_CHUNK, projects))
+        _add_synthetic_projects(
+            session,
+            rng,
+            numbers,
+            tender_prefix=f"SYN{seed}",
+            offset=offset,
+            staff=staff,
+            shape=(control_accounts, workpackages, tasks_per_wp),
+            counts=counts,
+        )
+
+    session.commit()
+    return counts
+
+
+def _add_synthetic_projects(
+    session: Session,
+    rng: random.Random,
+    numbers: range,
+    *,
+    tender_prefix: str,
+    offset: int,
+    staff: dict[int, dict[str, list[int]]],
+    shape: tuple[int, int, int],
+    counts: dict[str, int],
+):
+    """Insert projects ``numbers`` with their work breakdown and project records."""
+
+    control_accounts, workpackages, tasks_per_wp = shape
+    unit_ids = list(staff)
+    project_rows, project_info = [], []
+    for n in numbers:
+        unit_id = unit_ids[n % len(unit_ids)]
+        start = SYNTHETIC_START + timedelta(days=rng.randrange(365))
+        budget = float(rng.randrange(1_000, 50_000) * 1_000)
+        project_rows.append(
+            {
+                "name": f"Project {offset + n + 1:06d}",
+                "businessunit_id": unit_id,
+                "description": "Synthetic project",
+                "tender_no": f"{tender_prefix}-{offset + n + 1:06d}",
+                "scope_of_work": "Generated scope",
+                "category": rng.choice(list(ProjectType)),
+                "bid_issue_date": start - timedelta(days=60),
+                "tender_purchase_date": start - timedelta(days=55),
+                "bid_due_date": start - timedelta(days=30),
+                "completion_period_m": rng.randrange(6, 37),
+                "bid_validity_d": 90,
+                "budget": budget,
+                "bid_value": round(budget * rng.uniform(0.9, 1.1), 2),
+            }
+        )
+        project_info.append((unit_id, start, budget))
+    project_ids = _insert(session, Project, project_rows, counts)
+
+    leaf_models = (
+        ProjectStatusHistory,
+        Milestone,
+        Risk,
+        Expense,
+        ResourceAssignment,
+        Issue,
+        ChangeRequest,
+        Dependency,
+    )
+    leaves: dict[type, list[dict]] = {model: [] for model in leaf_models}
+    account_rows, account_info = [], []
+    for project_id, (unit_id, start, budget) in zip(project_ids, project_info):
+        for index, stage in enumerate(STAGES[: rng.randrange(1, len(STAGES) + 1)]):
+            leaves[ProjectStatusHistory].append(
+                {
+                    "name": stage.value.replace("_", " ").title(),
+                    "project_id": project_id,
+                    "stage": stage,
+                    "effective_date": start + timedelta(days=30 * index),
+                }
+            )
+        leaves[Milestone].append(
+            {
+                "name": "Handover",
+                "project_id": project_id,
+                "due_date": start + timedelta(days=365),
+            }
+        )
+        for n in range(rng.randrange(3)):
+            leaves[Risk].append({"name": f"Risk {n + 1}", "project_id": project_id})
+        leaves[ResourceAssignment].append(
+            {
+                "name": "Project management",
+                "project_id": project_id,
+                "position_id": rng.choice(staff[unit_id]["managers"]),
+                "role": "Project Manager",
+                "allocation_percent": rng.choice([25.0, 50.0, 100.0]),
+                "start_date": start,
+                "end_date": start + timedelta(days=365),
+            }
+        )
+        for n in range(control_accounts):
+            account_rows.append(
+                {
+                    "name": f"Control account {n + 1}",
+                    "project_id": project_id,
+                    "budget": budget / control_accounts,
+                }
+            )
+            account_info.append((project_id, unit_id, start, budget / control_accounts))
+    account_ids = _insert(session, ControlAccount, account_rows, counts)
+
+    package_rows, package_info = [], []
+    for account_id, (project_id, unit_id, start, budget) in zip(account_ids, account_info):
+        for n in range(workpackages):
+            package_start = start + timedelta(days=rng.randrange(90))
+            package_rows.append(
+                {
+                    "name": f"Work package {n + 1}",
+                    "controlaccount_id": account_id,
+                    "budget": budget / workpackages,
+                    "start_date": package_start,
+                    "end_date": package_start + timedelta(days=tasks_per_wp * 5),
+                }
+            )
+            package_info.append((project_id, unit_id, package_start, budget / workpackages))
+    package_ids = _insert(session, WorkPackage, package_rows, counts)
+
+    task_rows, task_info = [], []
+    for package_id, (project_id, unit_id, start, budget) in zip(package_ids, package_info):
+        task_start = start
+        for n in range(tasks_per_wp):
+            task_end = task_start + timedelta(days=rng.randrange(1, 10))
+            task_rows.append(
+                {
+                    "name": f"Task {n + 1}",
+                    "workpackage_id": package_id,
+                    "start_date": task_start,
+                    "end_date": task_end,
+                    "is_complete": task_end < SYNTHETIC_START + timedelta(days=180),
+                }
+            )
+            task_info.append((package_id, n))
+            task_start = task_end
+        leaves[Expense].append(
+            {
+                "name": "Progress claim",
+                "project_id": project_id,
+                "workpackage_id": package_id,
+                "amount": round(budget * rng.uniform(0.1, 0.6), 2),
+                "date": start + timedelta(days=30),
+                "description": "Synthetic expense",
+            }
+        )
+        if rng.random() < 0.2:
+            leaves[Issue].append(
+                {
+                    "name": "Site access delay",
+                    "project_id": project_id,
+                    "workpackage_id": package_id,
+                    "owner_id": rng.choice(staff[unit_id]["managers"]),
+                    "severity": rng.choice(["low", "medium", "high"]),
+                    "status": rng.choice(list(IssueStatus)),
+                    "opened_on": start,
+                }
+            )
+        if rng.random() < 0.1:
+            leaves[ChangeRequest].append(
+                {
+                    "name": "Scope change",
+                    "project_id": project_id,
+                    "workpackage_id": package_id,
+                    "requested_by_id": rng.choice(staff[unit_id]["engineers"]),
+                    "status": rng.choice(list(ChangeRequestStatus)),
+                    "submitted_on": start,
+                }
+            )
+        if rng.random() < 0.3:
+            leaves[ResourceAssignment].append(
+                {
+                    "name": "Engineering",
+                    "project_id": project_id,
+                    "position_id": rng.choice(staff[unit_id]["engineers"]),
+                    "workpackage_id": package_id,
+                    "role": "Engineer",
+                    "allocation_percent": rng.choice([50.0, 100.0]),
+                    "start_date": start,
+                    "end_date": start + timedelta(days=tasks_per_wp * 5),
+                }
+            )
+    task_ids = _insert(session, Task, task_rows, counts)
+
+    # finish-to-start chain through the tasks of each work package
+    for previous, (task_id, (_, n)) in zip([None, *task_ids], zip(task_ids, task_info)):
+        if n:
+            leaves[Dependency].append({"predecessor_id": previous, "successor_id": task_id})
+
+    for model, rows in leaves.items():
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(rows)
+        if rows:
+            # ids of leaf rows are never needed, so skip RETURNING
+            session.execute(insert(model), rows)
@@ -0,0 +1,596 @@
+"""Critical path method (CPM) over ``Task`` and ``Dependency``.
+
+A project's task network is loaded with a single statement (tasks left-joined
+to their incoming dependencies) into flat lists indexed by position, then
+solved in O(V + E):
+
+- a topological order is found with Kahn's algorithm, which also detects
+  cycles;
+- the forward pass gives early start/finish, where a task starts no earlier
+  than its planned ``start_date`` nor before all predecessors finish;
+- the backward pass from the project finish gives late start/finish;
+- total float is late start minus early start and zero-float tasks are
+  critical.
+
+Offsets are whole days from the earliest planned start in the project and a
+task's duration is ``end_date - start_date``.
+
+Solved networks are kept in a per-engine :class:`ScheduleCache`. Committed
+changes to a task's dates or to a ``Dependency`` row are replayed onto the
+cached network (see :meth:`ScheduleNetwork.update_task` and friends), which
+re-propagates only the downstream forward pass and upstream backward pass
+that can actually move; structural changes evict the affected project.
+Commits from other processes are noticed through the tables' change
+versions and drop the cache.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+import weakref
+from collections import deque
+from datetime import date, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from .db import primary_engine
+from .models import ControlAccount, Dependency, Task, WorkPackage
+from .versions import committed_versions, is_tracked, read_versions_by_name
+
+
+# tables a project's task network is loaded from
+SCHEDULE_TABLES = ("controlaccount", "dependency", "task", "workpackage")
+
+
+class ScheduleCycleError(ValueError):
+    """Raised when the dependency network of a project contains a cycle."""
+
+    def __init__(self, task_ids: list[int]):
+        self.task_ids = task_ids
+        super().__init__(f"Dependency cycle between tasks {sorted(task_ids)}")
+
+
+class ScheduledTask(NamedTuple):
+    task_id: int
+    name: str
+    duration: int
+    early_start: date
+    early_finish: date
+    late_start: date
+    late_finish: date
+    total_float: int
+    critical: bool
+
+
+class Schedule(NamedTuple):
+    project_id: int
+    start: Optional[date]
+    finish: Optional[date]
+    tasks: list[ScheduledTask]
+    critical_path: list[int]
+
+
+class ScheduleNetwork:
+    """Task network of one project plus the arrays of its last CPM pass."""
+
+    def __init__(
+        self,
+        project_id: int,
+        tasks: list[tuple[int, str, date, date]],
+        edges: list[tuple[int, int]],
+    ):
+        self.project_id = project_id
+        self.ids = [task[0] for task in tasks]
+        self.names = [task[1] for task in tasks]
+        self.index = {task_id: i for i, task_id in enumerate(self.ids)}
+        self.origin = min((task[2] for task in tasks), default=None)
+        self.planned_start = [(task[2] - self.origin).days for task in tasks]
+        self.duration = [max((task[3] - task[2]).days, 0) for task in tasks]
+        self.preds: list[list[int]] = [[] for _ in tasks]
+        self.succs: list[list[int]] = [[] for _ in tasks]
+        for predecessor, successor in edges:
+            u, v = self.index[predecessor], self.index[successor]
+            self.succs[u].append(v)
+            self.preds[v].append(u)
+        self.order: list[int] = []
+        self.position: list[int] = []
+        self.es: list[int] = []
+        self.ef: list[int] = []
+        self.ls: list[int] = []
+        self.lf: list[int] = []
+        self.finish = 0
+
+    @classmethod
+    def load(cls, session: Session, project_id: int) -> "ScheduleNetwork":
+        """Load the tasks of ``project_id`` and their dependencies in one query.
+
+        Dependencies on tasks outside the project are ignored.
+        """
+
+        rows = session.execute(
+            select(
+                Task.id,
+                Task.name,
+                Task.start_date,
+                Task.end_date,
+                Dependency.predecessor_id,
+            )
+            .join(WorkPackage, WorkPackage.id == Task.workpackage_id)
+            .join(ControlAccount, ControlAccount.id == WorkPackage.controlaccount_id)
+            .outerjoin(Dependency, Dependency.successor_id == Task.id)
+            .where(ControlAccount.project_id == project_id)
+            .order_by(Task.id)
+        ).all()
+
+        tasks: list[tuple[int, str, date, date]] = []
+        edges: list[tuple[int, int]] = []
+        seen: set[int] = set()
+        for task_id, name, start, end, predecessor_id in rows:
+            if task_id not in seen:
+                seen.add(task_id)
+                tasks.append((task_id, name, start, end))
+            if predecessor_id is not None:
+                edges.append((predecessor_id, task_id))
+        edges = [edge for edge in edges if edge[0] in seen]
+        return cls(project_id, tasks, edges)
+
+    def topological_order(self) -> list[int]:
+        """Return task positions in dependency order (Kahn's algorithm)."""
+
+        indegree = [len(p) for p in self.preds]
+        ready = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        order = []
+        while ready:
+            u = ready.popleft()
+            order.append(u)
+            for v in self.succs[u]:
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    ready.append(v)
+        if len(order) != len(self.ids):
+            raise ScheduleCycleError(
+                [self.ids[i] for i, degree in enumerate(indegree) if degree > 0]
+            )
+        return order
+
+    def forward_pass(self) -> None:
+        es = [0] * len(self.ids)
+        ef = [0] * len(self.ids)
+        for v in self.order:
+            start = self.planned_start[v]
+            for u in self.preds[v]:
+                if ef[u] > start:
+                    start = ef[u]
+            es[v] = start
+            ef[v] = start + self.duration[v]
+        self.es, self.ef = es, ef
+        self.finish = max(ef, default=0)
+
+    def backward_pass(self) -> None:
+        ls = [0] * len(self.ids)
+        lf = [0] * len(self.ids)
+        for u in reversed(self.order):
+            finish = self.finish
+            for v in self.succs[u]:
+                if ls[v] < finish:
+                    finish = ls[v]
+            lf[u] = finish
+            ls[u] = finish - self.duration[u]
+        self.ls, self.lf = ls, lf
+
+    def solve(self) -> Schedule:
+        """Run a full CPM pass and return the resulting :class:`Schedule`."""
+
+        self.order = self.topological_order()
+        self.position = [0] * len(self.order)
+        for slot, v in enumerate(self.order):
+            self.position[v] = slot
+        self.forward_pass()
+        self.backward_pass()
+        return self.result()
+
+    # Incremental updates. Each keeps ``order``/``position`` a valid
+    # topological order and then re-propagates from the touched tasks only.
+
+    def update_task(self, task_id: int, start: date, end: date, name: Optional[str] = None):
+        """Apply new planned dates (and optionally a new name) to one task."""
+
+        v = self.index[task_id]
+        if name is not None:
+            self.names[v] = name
+        duration = max((end - start).days, 0)
+        backward_seeds = {v} if duration != self.duration[v] else set()
+        self.planned_start[v] = (start - self.origin).days
+        self.duration[v] = duration
+        self._propagate({v}, backward_seeds)
+
+    def add_dependency(self, predecessor_id: int, successor_id: int):
+        """Add an edge, raising :class:`ScheduleCycleError` if it closes a cycle."""
+
+        u, v = self.index[predecessor_id], self.index[successor_id]
+        if self.position[u] >= self.position[v]:
+            self._reorder(u, v)
+        self.succs[u].append(v)
+        self.preds[v].append(u)
+        self._propagate({v}, {u})
+
+    def remove_dependency(self, predecessor_id: int, successor_id: int):
+        u, v = self.index[predecessor_id], self.index[successor_id]
+        self.succs[u].remove(v)
+        self.preds[v].remove(u)
+        self._propagate({v}, {u})
+
+    def _reorder(self, u: int, v: int):
+        """Restore the topological order before adding ``u -> v`` (Pearce-Kelly).
+
+        Only tasks positioned between ``v`` and ``u`` that are reachable from
+        ``v`` or reach ``u`` are shuffled.
+        """
+
+        lower, upper = self.position[v], self.position[u]
+        reached_from_v, stack = set(), [v]
+        while stack:
+            x = stack.pop()
+            if x == u:
+                raise ScheduleCycleError([self.ids[u], self.ids[v]])
+            if x in reached_from_v:
+                continue
+            reached_from_v.add(x)
+            stack.extend(y for y in self.succs[x] if self.position[y] <= upper)
+        reaching_u, stack = set(), [u]
+        while stack:
+            x = stack.pop()
+            if x in reaching_u:
+                continue
+            reaching_u.add(x)
+            stack.extend(y for y in self.preds[x] if self.position[y] >= lower)
+
+        moved = sorted(reaching_u, key=self.position.__getitem__) + sorted(
+            reached_from_v, key=self.position.__getitem__
+        )
+        slots = sorted(self.position[x] for x in moved)
+        for slot, x in zip(slots, moved):
+            self.position[x] = slot
+            self.order[slot] = x
+
+    def _propagate(self, forward_seeds: set[int], backward_seeds: set[int]):
+        if self._forward_from(forward_seeds):
+            # every late date hangs off the project finish
+            self.backward_pass()
+        else:
+            self._backward_from(backward_seeds)
+
+    def _forward_from(self, seeds: set[int]) -> bool:
+        """Recompute early dates downstream of ``seeds``; return True if the finish moved."""
+
+        es, ef, position = self.es, self.ef, self.position
+        heap = [(position[v], v) for v in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        rescan = False
+        finish = self.finish
+        while heap:
+            _, v = heapq.heappop(heap)
+            start = self.planned_start[v]
+            for u in self.preds[v]:
+                if ef[u] > start:
+                    start = ef[u]
+            end = start + self.duration[v]
+            if start == es[v] and end == ef[v]:
+                continue
+            if ef[v] == finish and end < finish:
+                rescan = True
+            es[v], ef[v] = start, end
+            if end > finish:
+                finish = end
+            for w in self.succs[v]:
+                if w not in queued:
+                    queued.add(w)
+                    heapq.heappush(heap, (position[w], w))
+        if rescan:
+            finish = max(ef, default=0)
+        moved = finish != self.finish
+        self.finish = finish
+        return moved
+
+    def _backward_from(self, seeds: set[int]):
+        ls, lf, position = self.ls, self.lf, self.position
+        heap = [(-position[u], u) for u in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        while heap:
+            _, u = heapq.heappop(heap)
+            finish = self.finish
+            for v in self.succs[u]:
+                if ls[v] < finish:
+                    finish = ls[v]
+            start = finish - self.duration[u]
+            if finish == lf[u] and start == ls[u]:
+                continue
+            lf[u], ls[u] = finish, start
+            for p in self.preds[u]:
+                if p not in queued:
+                    queued.add(p)
+                    heapq.heappush(heap, (-position[p], p))
+
+    def critical_path(self) -> list[int]:
+        """Return one driving chain of zero-float tasks ending at the finish."""
+
+        ends = [
+            v for v in range(len(self.ids))
+            if self.ef[v] == self.finish and self.ls[v] == self.es[v]
+        ]
+        if not ends:
+            return []
+        path = [min(ends, key=lambda v: self.ids[v])]
+        while True:
+            v = path[-1]
+            drivers = [
+                u for u in self.preds[v]
+                if self.ef[u] == self.es[v] and self.ls[u] == self.es[u]
+            ]
+            if not drivers:
+                break
+            path.append(min(drivers, key=lambda u: self.ids[u]))
+        return [self.ids[v] for v in reversed(path)]
+
+    def result(self) -> Schedule:
+        if self.origin is None:
+            return Schedule(self.project_id, None, None, [], [])
+
+        origin = self.origin
+        tasks = [
+            ScheduledTask(
+                task_id=self.ids[v],
+                name=self.names[v],
+                duration=self.duration[v],
+                early_start=origin + timedelta(days=self.es[v]),
+                early_finish=origin + timedelta(days=self.ef[v]),
+                late_start=origin + timedelta(days=self.ls[v]),
+                late_finish=origin + timedelta(days=self.lf[v]),
+                total_float=self.ls[v] - self.es[v],
+                critical=self.ls[v] == self.es[v],
+            )
+            # independent of how incremental edits reshuffled ``order``
+            for v in sorted(range(len(self.ids)), key=lambda v: (self.es[v], self.ids[v]))
+        ]
+        return Schedule(
+            project_id=self.project_id,
+            start=origin + timedelta(days=min(self.es)),
+            finish=origin + timedelta(days=self.finish),
+            tasks=tasks,
+            critical_path=self.critical_path(),
+        )
+
+
+def compute_schedule(session: Session, project_id: int) -> Schedule:
+    """Load and solve the task network of ``project_id``."""
+
+    return ScheduleNetwork.load(session, project_id).solve()
+
+
+class ScheduleCache:
+    """Solved networks of one database, kept current from committed changes.
+
+    Commits in this process are replayed by the session hooks below. Writes
+    from other processes are caught through the change versions of
+    ``SCHEDULE_TABLES`` (see :mod:`pmo.versions`): every read compares them
+    with the versions the cache is current with, one indexed lookup, and
+    drops every network when another process changed those tables.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._networks: dict[int, ScheduleNetwork] = {}
+        self._task_projects: dict[int, int] = {}
+        # versions of SCHEDULE_TABLES the networks reflect; None until first read
+        self._stamp: Optional[dict[str, int]] = None
+        # bumped whenever networks change or are dropped; guards installs of cold loads
+        self._generation = 0
+
+    def __contains__(self, project_id: int) -> bool:
+        return project_id in self._networks
+
+    def schedule(self, session: Session, project_id: int) -> Schedule:
+        """Return the schedule of ``project_id``, solving it on first use.
+
+        A cold load runs outside the lock, so it does not hold up reads of
+        other projects; its result is only kept if nothing was committed
+        meanwhile.
+        """
+
+        stamp = None
+        if is_tracked(session):
+            stamp = read_versions_by_name(session, SCHEDULE_TABLES)
+        with self._lock:
+            if stamp is not None and stamp != self._stamp:
+                if self._stamp is not None:
+                    self.invalidate()
+                self._stamp = stamp
+            network = self._networks.get(project_id)
+            if network is not None:
+                return network.result()
+            generation = self._generation
+
+        network = ScheduleNetwork.load(session, project_id)
+        network.solve()
+        with self._lock:
+            if generation == self._generation and stamp == self._stamp:
+                installed = self._networks.setdefault(project_id, network)
+                if installed is network:
+                    for task_id in network.ids:
+                        self._task_projects[task_id] = project_id
+                network = installed
+            return network.result()
+
+    def project_of(self, task_id: int) -> Optional[int]:
+        return self._task_projects.get(task_id)
+
+    def invalidate(self, project_id: Optional[int] = None):
+        """Drop one cached project, or every project when ``project_id`` is None."""
+
+        with self._lock:
+            self._generation += 1
+            if project_id is None:
+                self._networks.clear()
+                self._task_projects.clear()
+                return
+            network = self._networks.pop(project_id, None)
+            if network is not None:
+                for task_id in network.ids:
+                    self._task_projects.pop(task_id, None)
+
+    def apply(self, changes: list[tuple], versions: Optional[dict[str, int]] = None):
+        """Replay committed changes recorded by the session event hooks.
+
+        ``versions`` are the change versions the commit wrote. If they do not
+        directly follow the cache's, another process committed in between
+        and every network is dropped.
+        """
+
+        with self._lock:
+            self._generation += 1
+            versions = versions or {}
+            touched = {name: versions[name] for name in SCHEDULE_TABLES if name in versions}
+            if touched and self._stamp is not None:
+                if all(touched[name] == self._stamp[name] + 1 for name in touched):
+                    self._stamp = {**self._stamp, **touched}
+                else:
+                    self.invalidate()
+                    self._stamp = None
+                    return
+            for change in changes:
+                kind = change[0]
+                if kind == "clear":
+                    self.invalidate()
+                    continue
+                if kind == "invalidate":
+                    if change[1] is not None:
+                        self.invalidate(change[1])
+                    continue
+                task_id = change[1]
+                project_id = self._task_projects.get(task_id)
+                network = self._networks.get(project_id)
+                if network is None:
+                    continue
+                try:
+                    if kind == "task":
+                        network.update_task(*change[1:])
+                    elif kind == "add":
+                        network.add_dependency(*change[1:])
+                    elif kind == "remove":
+                        network.remove_dependency(*change[1:])
+                except (KeyError, ValueError):
+                    # unknown task (e.g. cross-project edge), missing edge or
+                    # a new cycle: let the next read solve from scratch
+                    self.invalidate(project_id)
+
+
+_caches: "weakref.WeakKeyDictionary[object, ScheduleCache]" = weakref.WeakKeyDictionary()
+_CHANGES_KEY = "pmo.schedule_changes"
+
+
+def schedule_cache(bind) -> ScheduleCache:
+    """Return the :class:`ScheduleCache` for an engine, creating it on demand."""
+
+    bind = primary_engine(bind)
+    cache = _caches.get(bind)
+    if cache is None:
+        cache = _caches.setdefault(bind, ScheduleCache())
+    return cache
+
+
+def _record_changes(session: Session, flush_context) -> None:
+    cache = _caches.get(primary_engine(session.get_bind()))
+    if cache is None:
+        return
+    changes = session.info.setdefault(_CHANGES_KEY, [])
+    moved_to: set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Task):
+            moved_to.add(obj.workpackage_id)
+        elif isinstance(obj, Dependency):
+            changes.append(("add", obj.predecessor_id, obj.successor_id))
+
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            changes.append(("invalidate", cache.project_of(obj.id)))
+        elif isinstance(obj, Dependency):
+            changes.append(("remove", obj.predecessor_id, obj.successor_id))
+        elif isinstance(obj, (WorkPackage, ControlAccount)):
+            changes.append(("clear",))
+
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Task):
+            if state.attrs.workpackage_id.history.has_changes():
+                changes.append(("invalidate", cache.project_of(obj.id)))
+                moved_to.add(obj.workpackage_id)
+            elif any(
+                state.attrs[name].history.has_changes()
+                for name in ("start_date", "end_date", "name")
+            ):
+                changes.append(("task", obj.id, obj.start_date, obj.end_date, obj.name))
+        elif isinstance(obj, Dependency):
+            predecessor = state.attrs.predecessor_id.history
+            successor = state.attrs.successor_id.history
+            if predecessor.has_changes() or successor.has_changes():
+                old_predecessor = (predecessor.deleted or [obj.predecessor_id])[0]
+                old_successor = (successor.deleted or [obj.successor_id])[0]
+                changes.append(("remove", old_predecessor, old_successor))
+                changes.append(("add", obj.predecessor_id, obj.successor_id))
+        elif isinstance(obj, WorkPackage):
+            if state.attrs.controlaccount_id.history.has_changes():
+                changes.append(("clear",))
+        elif isinstance(obj, ControlAccount):
+            if state.attrs.project_id.history.has_changes():
+                changes.append(("clear",))
+
+    moved_to.discard(None)
+    if moved_to:
+        # tasks that joined a project: one lookup for the whole flush
+        projects = session.execute(
+            select(ControlAccount.project_id)
+            .join(WorkPackage, WorkPackage.controlaccount_id == ControlAccount.id)
+            .where(WorkPackage.id.in_(moved_to))
+            .distinct()
+        ).scalars()
+        changes.extend(("invalidate", project_id) for project_id in projects)
+
+
+def _record_bulk_statement(orm_execute_state) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    session = orm_execute_state.session
+    if primary_engine(session.get_bind()) not in _caches:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (Task, Dependency, WorkPackage, ControlAccount):
+        session.info.setdefault(_CHANGES_KEY, []).append(("clear",))
+
+
+def _apply_changes(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    versions = committed_versions(session)
+    if changes or versions:
+        cache = _caches.get(primary_engine(session.get_bind()))
+        if cache is not None:
+            cache.apply(changes or [], versions)
+
+
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
+
+
+event.listen(Session, "after_flush", _record_changes)
+event.listen(Session, "do_orm_execute", _record_bulk_statement)
+event.listen(Session, "after_commit", _apply_changes)
+event.listen(Session, "after_rollback", _discard_changes)
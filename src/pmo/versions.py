@@ -0,0 +1,184 @@
+"""Per-table change versions, bumped in the transaction that changes the table.
+
+``pmo_change_version`` holds one row per model table: a counter and the time
+of the last committed change. Session event hooks collect the tables touched
+by each flush (new, changed and deleted objects) and by bulk ``insert`` /
+``update`` / ``delete`` statements, and just before commit one ``UPDATE``
+increments the counters of exactly those tables, so a version moves if and
+only if its table's rows did; the new values are read back for the commit
+hooks.
+
+Readers use :func:`read_versions` to fetch the versions of the tables a
+response is built from in a single primary-key lookup; the API derives ETags
+and ``Last-Modified`` from them (see :mod:`pmo.api.conditional`).
+``after_commit`` hooks can ask :func:`committed_tables` which tables the
+commit changed and :func:`committed_versions` which versions it gave them.
+
+Only engines whose schema went through :func:`pmo.migrations.ensure_schema`
+are tracked, as only those are known to have the table. Writes made outside
+the ORM session (raw SQL, other programs) do not bump versions.
+"""
+
+from __future__ import annotations
+
+import weakref
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, event, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .models import Base
+
+
+_metadata = MetaData()
+change_version = Table(
+    "pmo_change_version",
+    _metadata,
+    Column("table_name", String(64), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("changed_at", DateTime, nullable=False),
+)
+
+# engines known to have the change version table
+_tracked: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+_CHANGED_KEY = "pmo.changed_tables"
+_COMMITTED_KEY = "pmo.committed_tables"
+
+
+class TableVersion(NamedTuple):
+    version: int
+    changed_at: Optional[datetime]
+
+
+def _utcnow() -> datetime:
+    # stored naive, in UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def create_change_versions(connection: Connection, tables: Iterable[str]):
+    """Create the change version table if needed, with a row for each of ``tables``."""
+
+    _metadata.create_all(connection)
+    existing = set(connection.execute(select(change_version.c.table_name)).scalars())
+    missing = sorted(set(tables) - existing)
+    if missing:
+        now = _utcnow()
+        connection.execute(
+            change_version.insert(),
+            [{"table_name": name, "version": 1, "changed_at": now} for name in missing],
+        )
+
+
+def track_changes(engine: Engine):
+    """Bump change versions in sessions on ``engine`` or its writer and async engines."""
+
+    _tracked.add(engine)
+
+
+def read_versions(session: Session, tables: Iterable[str]) -> dict[str, TableVersion]:
+    """Return the :class:`TableVersion` of each of ``tables``; one indexed query."""
+
+    tables = sorted(set(tables))
+    rows = session.execute(
+        select(change_version).where(change_version.c.table_name.in_(tables))
+    ).all()
+    versions = {name: TableVersion(0, None) for name in tables}
+    versions.update((name, TableVersion(*row)) for name, *row in rows)
+    return versions
+
+
+def read_versions_by_name(session: Session, tables: Iterable[str]) -> dict[str, int]:
+    """Return ``{table: version}`` for ``tables``; see :func:`read_versions`."""
+
+    return {name: entry.version for name, entry in read_versions(session, tables).items()}
+
+
+def committed_versions(session: Session) -> dict[str, int]:
+    """``{table: version}`` written by the committing transaction; for ``after_commit``."""
+
+    return session.info.get(_COMMITTED_KEY, {})
+
+
+def committed_tables(session: Session) -> frozenset[str]:
+    """Tables whose versions the committing transaction bumped; for ``after_commit``."""
+
+    return frozenset(committed_versions(session))
+
+
+def is_tracked(session: Session) -> bool:
+    """Whether commits in ``session`` bump change versions (and it can read them)."""
+
+    from .db import primary_engine  # db imports this module through migrations
+
+    return primary_engine(session.get_bind()) in _tracked
+
+
+def _mapper_tables(mapper) -> set[str]:
+    return {table.name for table in mapper.tables if table.name in Base.metadata.tables}
+
+
+def _record_flush(session: Session, flush_context) -> None:
+    if not is_tracked(session):
+        return
+    changed = session.info.setdefault(_CHANGED_KEY, set())
+    for obj in (*session.new, *session.deleted):
+        changed |= _mapper_tables(type(obj).__mapper__)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            changed |= _mapper_tables(type(obj).__mapper__)
+
+
+def _record_bulk_statement(orm_execute_state) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    mapper = orm_execute_state.bind_mapper
+    session = orm_execute_state.session
+    if mapper is not None and is_tracked(session):
+        session.info.setdefault(_CHANGED_KEY, set()).update(_mapper_tables(mapper))
+
+
+def _bump_versions(session: Session) -> None:
+    if not is_tracked(session):
+        return
+    # commit flushes pending objects only after this hook; flush them first
+    session.flush()
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if not changed:
+        return
+    statement = (
+        change_version.update()
+        .where(change_version.c.table_name.in_(sorted(changed)))
+        .values(version=change_version.c.version + 1, changed_at=_utcnow())
+    )
+    if session.get_bind().dialect.update_returning:
+        statement = statement.returning(change_version.c.table_name, change_version.c.version)
+        versions = dict(session.execute(statement).all())
+    else:
+        session.execute(statement)
+        # the rows are locked by the update, so these are the versions it wrote
+        versions = read_versions_by_name(session, changed)
+    if len(versions) < len(changed) or 0 in versions.values():
+        # a table added after the database was created: start counting it now
+        create_change_versions(session.connection(), changed)
+        versions = read_versions_by_name(session, changed)
+    session.info[_COMMITTED_KEY] = versions
+
+
+def _discard_changes(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_CHANGED_KEY, None)
+        session.info.pop(_COMMITTED_KEY, None)
+
+
+event.listen(Session, "after_flush", _record_flush)
+event.listen(Session, "do_orm_execute", _record_bulk_statement)
+event.listen(Session, "before_commit", _bump_versions)
+event.listen(Session, "after_transaction_end", _discard_changes)
@@ -0,0 +1,430 @@
+"""Streaming Excel import and export of projects and their work breakdown.
+
+Import
+------
+
+A workbook holds one sheet per model, read in dependency order whatever the
+sheet order in the file:
+
+==================== ======================================================
+sheet                parent reference columns
+==================== ======================================================
+Projects             ``businessunit_id``
+ControlAccounts      ``project``
+WorkPackages         ``controlaccount``
+Tasks                ``workpackage``
+ResourceAssignments  ``project``, ``position_id``, ``workpackage``, ``task``
+==================== ======================================================
+
+Sheet names are matched ignoring case, spaces, underscores and a trailing
+``s``. The first row holds column names; any other header must be a column
+of the model. Rows reference the rows they belong to through workbook-local
+keys: a project is referenced by its ``tender_no`` and any other row by the
+value of its optional ``ref`` column. Database ids (``project_id``,
+``workpackage_id``, ...) may be given instead to attach rows to existing
+records; they are checked to exist. Dates may be Excel dates or ISO
+``YYYY-MM-DD`` text. Empty cells fall back to the column default.
+
+The workbook is read with openpyxl's read-only mode and rows are written
+with batched Core ``INSERT`` statements, so memory stays bounded by the
+batch size plus the ids of referenced rows, and no ORM objects are built.
+
+Export
+------
+:func:`export_workbook` writes one sheet per model listed in
+``EXPORT_SHEETS`` with every table column. Rows are fetched with
+``yield_per`` and appended to an openpyxl write-only workbook, which spools
+each sheet to a temporary file, so peak memory does not grow with the
+portfolio. :func:`stream_workbook` runs an export in a worker thread and
+yields the ``.xlsx`` bytes as openpyxl writes them.
+
+openpyxl is imported on first use, so importing this module (as the CLI
+and API do) stays cheap.
+"""
+
+from __future__ import annotations
+
+import enum
+import queue
+import threading
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import BinaryIO, Callable, Optional, Union
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    Budget,
+    ControlAccount,
+    Expense,
+    Issue,
+    Project,
+    ResourceAssignment,
+    Task,
+    WorkPackage,
+)
+
+
+DEFAULT_BATCH_SIZE = 5000
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class WorkbookImportError(ValueError):
+    """Raised when a workbook row cannot be mapped onto the models."""
+
+    def __init__(self, sheet: str, row: Optional[int], message: str):
+        location = f"{sheet}!{row}" if row is not None else sheet
+        super().__init__(f"{location}: {message}")
+        self.sheet = sheet
+        self.row = row
+
+
+# model, key column for references to its rows, {reference column: (parent model, fk)}
+IMPORT_SHEETS = (
+    (Project, "tender_no", {}),
+    (ControlAccount, "ref", {"project": (Project, "project_id")}),
+    (WorkPackage, "ref", {"controlaccount": (ControlAccount, "controlaccount_id")}),
+    (Task, "ref", {"workpackage": (WorkPackage, "workpackage_id")}),
+    (
+        ResourceAssignment,
+        None,
+        {
+            "project": (Project, "project_id"),
+            "workpackage": (WorkPackage, "workpackage_id"),
+            "task": (Task, "task_id"),
+        },
+    ),
+)
+
+
+def _normalise(name: str) -> str:
+    name = str(name).strip().lower().replace(" ", "").replace("_", "")
+    return name[:-1] if name.endswith("s") else name
+
+
+def _converter(column):
+    """Return a function turning a cell value into a value for ``column``."""
+
+    python_type = column.type.python_type
+    if issubclass(python_type, enum.Enum):
+
+        def convert(value):
+            if isinstance(value, str):
+                return python_type[value.strip()]
+            return python_type(value)
+
+        return convert
+    if python_type is date:
+
+        def convert(value):
+            if isinstance(value, datetime):
+                return value.date()
+            if isinstance(value, date):
+                return value
+            if isinstance(value, str):
+                return date.fromisoformat(value.strip())
+            raise TypeError(f"not a date: {value!r}")
+
+        return convert
+    if python_type is bool:
+
+        def convert(value):
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "y")
+            return bool(value)
+
+        return convert
+    if python_type in (int, float, str):
+        return python_type
+    return lambda value: value
+
+
+class _SheetReader:
+    def __init__(self, sheet, model, key: Optional[str], references: dict):
+        self.sheet = sheet
+        self.title = sheet.title
+        self.model = model
+        self.key = key
+        self.references = references
+        self.columns: list = []
+        # foreign key columns given as database ids -> the column they reference
+        self.foreign_keys: dict = {}
+
+    def read_header(self, header: tuple):
+        table = self.model.__table__
+        for index, cell in enumerate(header):
+            if cell is None:
+                continue
+            name = str(cell).strip().lower()
+            if name in self.references or (name == self.key and name not in table.c):
+                self.columns.append((index, name, None))
+            elif name in table.c and name != "id":
+                column = table.c[name]
+                self.columns.append((index, name, _converter(column)))
+                for foreign_key in column.foreign_keys:
+                    self.foreign_keys[name] = foreign_key.column
+            else:
+                raise WorkbookImportError(self.title, 1, f"unknown column {cell!r}")
+
+    def rows(self):
+        """Yield ``(row number, key, values)`` for each non-empty row."""
+
+        rows = self.sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        self.read_header(header)
+        for number, row in enumerate(rows, start=2):
+            values = {}
+            for index, name, convert in self.columns:
+                value = row[index] if index < len(row) else None
+                if value is None or value == "":
+                    continue
+                if convert is not None:
+                    try:
+                        value = convert(value)
+                    except (KeyError, TypeError, ValueError) as exc:
+                        raise WorkbookImportError(
+                            self.title, number, f"invalid {name} {value!r}"
+                        ) from exc
+                values[name] = value
+            if values:
+                key = values.pop("ref", None) if self.key == "ref" else values.get(self.key)
+                yield number, key, values
+
+
+def import_workbook(
+    session: Session,
+    source: Union[str, BinaryIO],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int]:
+    """Import a workbook into the database and return the rows added per sheet.
+
+    Everything is inserted in the session's transaction and committed at the
+    end; nothing is written if any row is rejected.
+    """
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheets = {_normalise(sheet.title): sheet for sheet in workbook.worksheets}
+        keys: dict[type, dict[object, int]] = {model: {} for model, _, _ in IMPORT_SHEETS}
+        existing: dict = {}
+        counts = {}
+        try:
+            for model, key, references in IMPORT_SHEETS:
+                sheet = sheets.get(_normalise(model.__tablename__))
+                if sheet is None:
+                    continue
+                reader = _SheetReader(sheet, model, key, references)
+                counts[sheet.title] = _import_sheet(
+                    session, reader, keys, existing, batch_size
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    finally:
+        workbook.close()
+    return counts
+
+
+def _check_foreign_keys(
+    session: Session, reader: _SheetReader, batch: list[dict], numbers: list[int], existing
+):
+    """Raise unless every database id given in ``batch`` names an existing row.
+
+    One ``IN`` query per foreign key column and batch; ids found are kept in
+    ``existing`` (referenced column -> ids) so later batches skip them.
+    """
+
+    for name, target in reader.foreign_keys.items():
+        known = existing.setdefault(target, set())
+        wanted = {values[name] for values in batch if name in values} - known
+        if wanted:
+            known.update(session.scalars(select(target).where(target.in_(wanted))))
+        for number, values in zip(numbers, batch):
+            if name in values and values[name] not in known:
+                raise WorkbookImportError(
+                    reader.title, number, f"unknown {name} {values[name]!r}"
+                )
+
+
+def _import_sheet(
+    session: Session, reader: _SheetReader, keys: dict, existing: dict, batch_size: int
+) -> int:
+    model = reader.model
+    own_keys = keys[model]
+    count = 0
+    batch: list[dict] = []
+    batch_keys: list = []
+    batch_numbers: list[int] = []
+    pending = set()
+
+    def flush():
+        if not batch:
+            return
+        _check_foreign_keys(session, reader, batch, batch_numbers, existing)
+        if any(key is not None for key in batch_keys):
+            ids = session.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True), batch
+            ).all()
+            for key, new_id in zip(batch_keys, ids):
+                if key is not None:
+                    own_keys[key] = new_id
+        else:
+            session.execute(insert(model), batch)
+        batch.clear()
+        batch_keys.clear()
+        pending.clear()
+        batch_numbers.clear()
+
+    for number, key, values in reader.rows():
+        for column, (parent, foreign_key) in reader.references.items():
+            if column not in values:
+                continue
+            reference = values.pop(column)
+            if reference not in keys[parent]:
+                raise WorkbookImportError(
+                    reader.title, number, f"unknown {column} {reference!r}"
+                )
+            values[foreign_key] = keys[parent][reference]
+        if key is not None:
+            if key in own_keys or key in pending:
+                raise WorkbookImportError(reader.title, number, f"duplicate key {key!r}")
+            pending.add(key)
+        batch.append(values)
+        batch_keys.append(key)
+        batch_numbers.append(number)
+        count += 1
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return count
+
+
+# -----------------------------------------------------------------------------
+# Export
+
+
+EXPORT_SHEETS = (
+    ("Projects", Project),
+    ("Control Accounts", ControlAccount),
+    ("Work Packages", WorkPackage),
+    ("Budgets", Budget),
+    ("Expenses", Expense),
+    ("Issues", Issue),
+)
+
+
+def export_workbook(
+    session: Session,
+    destination: Union[str, BinaryIO],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int]:
+    """Write every ``EXPORT_SHEETS`` table to ``destination``; return rows per sheet."""
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    counts = {}
+    for title, model in EXPORT_SHEETS:
+        table = model.__table__
+        sheet = workbook.create_sheet(title)
+        sheet.append([column.name for column in table.c])
+        enums = [
+            index
+            for index, column in enumerate(table.c)
+            if issubclass(column.type.python_type, enum.Enum)
+        ]
+        rows = session.execute(
+            select(table).order_by(table.c.id).execution_options(yield_per=batch_size)
+        )
+        count = 0
+        for row in rows:
+            values = list(row)
+            for index in enums:
+                if values[index] is not None:
+                    values[index] = values[index].name
+            sheet.append(values)
+            count += 1
+        counts[title] = count
+    workbook.save(destination)
+    return counts
+
+
+class _QueueWriter:
+    """Unseekable file object handing fixed-size chunks to a bounded queue.
+
+    Once the consumer has gone away writes are discarded, letting openpyxl
+    finish and clean up its temporary files normally.
+    """
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event, chunk_size: int):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+
+    def write(self, data) -> int:
+        self.buffer += data
+        if len(self.buffer) >= self.chunk_size:
+            self.put(bytes(self.buffer))
+            self.buffer.clear()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.buffer:
+            self.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def stream_workbook(
+    session_factory: Callable[[], Session],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield an :func:`export_workbook` file chunk by chunk as it is written.
+
+    The export runs in a worker thread with its own session. Closing the
+    iterator early (e.g. a dropped HTTP client) stops the worker.
+    """
+
+    chunks: queue.Queue = queue.Queue(maxsize=16)
+    cancelled = threading.Event()
+    finished = object()
+
+    def produce():
+        writer = _QueueWriter(chunks, cancelled, chunk_size)
+        try:
+            with session_factory() as session:
+                export_workbook(session, writer)
+            writer.close()
+            writer.put(finished)
+        except BaseException as exc:
+            writer.put(exc)
+
+    worker = threading.Thread(target=produce, name="pmo-xlsx-export", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is finished:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
@@ -1,21 +1,36 @@
-from datetime import date
+import io
+from datetime import date, datetime
 from pathlib import Path
 
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
+from openpyxl import Workbook, load_workbook
+from sqlalchemy import event
 
 from pmo.api import create_app
+from pmo.api.conditional import Validators
+from pmo.api.schemas import MAX_BATCH_ITEMS
+from pmo.graph import RenderCache
+from pmo.models import Dependency, Task, WorkPackage
+from pmo.versions import TableVersion
 
 
-@pytest.fixture()
-def api_client(tmp_path: Path):
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def api_client(tmp_path: Path, request):
     db_file = tmp_path / "api.db"
-    app = create_app(f"sqlite:///{db_file}")
-    client = TestClient(app)
-    try:
+    app = create_app(f"sqlite:///{db_file}", async_api=request.param)
+    with TestClient(app) as client:
         yield client
-    finally:
-        client.close()
+
+
+def _read_engine(api_client: TestClient):
+    """The engine, sync or the async one's ``sync_engine``, that reads go through."""
+
+    async_session_factory = api_client.app.state.async_session_factory
+    if async_session_factory is not None:
+        return async_session_factory.kw["bind"].sync_engine
+    return api_client.app.state.session_factory.kw["bind"]
 
 
 def test_api_sample_seed(api_client: TestClient):
@@ -26,7 +41,7 @@ def test_api_sample_seed(api_client: TestClient):
 
     list_response = api_client.get("/api/business-units")
     assert list_response.status_code == 200
-    units = list_response.json()
+    units = list_response.json()["items"]
     assert len(units) == 1
     assert units[0]["projects"]
 
@@ -64,7 +79,7 @@ def test_project_crud(api_client: TestClient):
     api_client.post("/api/sample-data")
 
     units_resp = api_client.get("/api/business-units")
-    unit_id = units_resp.json()[0]["id"]
+    unit_id = units_resp.json()["items"][0]["id"]
 
     create_payload = {
         "name": "Test Project",
@@ -97,7 +112,7 @@ def test_project_crud(api_client: TestClient):
 def test_issue_crud(api_client: TestClient):
     api_client.post("/api/sample-data")
     units_resp = api_client.get("/api/business-units")
-    project_id = units_resp.json()[0]["projects"][0]["id"]
+    project_id = units_resp.json()["items"][0]["projects"][0]["id"]
 
     create_resp = api_client.post(
         f"/api/projects/{project_id}/issues",
@@ -127,7 +142,7 @@ def test_issue_crud(api_client: TestClient):
 def test_change_request_crud(api_client: TestClient):
     api_client.post("/api/sample-data")
     units_resp = api_client.get("/api/business-units")
-    project_id = units_resp.json()[0]["projects"][0]["id"]
+    project_id = units_resp.json()["items"][0]["projects"][0]["id"]
 
     create_resp = api_client.post(
         f"/api/projects/{project_id}/change-requests",
@@ -151,3 +166,651 @@ def test_change_request_crud(api_client: TestClient):
 
     delete_resp = api_client.delete(f"/api/change-requests/{cr_id}")
     assert delete_resp.status_code == 204
+
+
+def _write_selects(api_client: TestClient, run):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        if statement.startswith("SELECT"):
+            statements.append(statement)
+
+    writer = api_client.app.state.write_session_factory.kw["bind"]
+    event.listen(writer, "before_cursor_execute", listener)
+    try:
+        response = run()
+    finally:
+        event.remove(writer, "before_cursor_execute", listener)
+    return len(statements), response
+
+
+def test_write_endpoints_check_parents_by_key(api_client: TestClient):
+    seeded = api_client.post("/api/sample-data").json()
+    for n in range(20):
+        _create_project(api_client, seeded["business_unit_id"], f"KEY-{n}")
+    project = {
+        "name": "Feeder",
+        "businessunit_id": seeded["business_unit_id"],
+        "description": "New feeder",
+        "tender_no": "KEY-NEW",
+        "scope_of_work": "Scope",
+        "budget": 10.0,
+        "bid_value": 9.0,
+    }
+
+    selects, response = _write_selects(
+        api_client, lambda: api_client.post("/api/projects", json=project)
+    )
+    assert response.status_code == 201
+    assert response.json()["issues"] == [] and response.json()["tender_no"] == "KEY-NEW"
+    assert selects == 1  # SELECT businessunit.id, nothing of the unit's 21 projects
+
+    issue = {"name": "Cable fault", "severity": "high", "opened_on": "2025-03-01"}
+    project_id = response.json()["id"]
+    selects, response = _write_selects(
+        api_client, lambda: api_client.post(f"/api/projects/{project_id}/issues", json=issue)
+    )
+    assert response.status_code == 201 and response.json()["project_id"] == project_id
+    assert selects == 1
+
+    missing = api_client.post("/api/projects", json={**project, "businessunit_id": 999})
+    assert missing.status_code == 404
+    assert api_client.post("/api/projects/999/issues", json=issue).status_code == 404
+
+
+def test_issue_batch(api_client: TestClient):
+    project_id = api_client.post("/api/sample-data").json()["project_id"]
+    existing = api_client.get(f"/api/projects/{project_id}").json()["issues"][0]["id"]
+
+    def batch(count):
+        body = {
+            "create": [
+                {"name": f"Site log {n}", "project_id": project_id, "severity": "low"}
+                for n in range(count)
+            ],
+            "update": [{"id": existing, "status": "resolved", "severity": "high"}],
+        }
+        return lambda: api_client.post("/api/issues:batch", json=body)
+
+    small, response = _write_selects(api_client, batch(3))
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["created"]) == 3 and result["updated"] == [existing]
+    large, response = _write_selects(api_client, batch(300))
+    assert response.status_code == 200 and large == small  # no per-item lookups
+
+    issues = api_client.get(f"/api/projects/{project_id}").json()["issues"]
+    assert len(issues) == 304
+    updated = next(issue for issue in issues if issue["id"] == existing)
+    assert (updated["status"], updated["severity"]) == ("resolved", "high")
+
+    deleted = api_client.post("/api/issues:batch", json={"delete": result["created"]})
+    assert deleted.json() == {"created": [], "updated": [], "deleted": result["created"]}
+    assert len(api_client.get(f"/api/projects/{project_id}").json()["issues"]) == 301
+
+    # the limit covers create, update and delete together
+    oversized = {"update": [{"id": existing}], "delete": list(range(MAX_BATCH_ITEMS))}
+    response = api_client.post("/api/issues:batch", json=oversized)
+    assert response.status_code == 422
+    assert len(api_client.get(f"/api/projects/{project_id}").json()["issues"]) == 301
+
+
+def test_batch_reports_every_invalid_item_and_writes_nothing(api_client: TestClient):
+    project_id = api_client.post("/api/sample-data").json()["project_id"]
+    change_request = api_client.get(f"/api/projects/{project_id}").json()["change_requests"][0]
+
+    response = api_client.post(
+        "/api/change-requests:batch",
+        json={
+            "create": [
+                {"name": "Valid", "project_id": project_id},
+                {"name": "No project"},
+                {"name": "Unknown project", "project_id": 999},
+            ],
+            "update": [{"id": change_request["id"], "status": "approved"}, {"id": 998}],
+            "delete": [change_request["id"]],
+        },
+    )
+    assert response.status_code == 422
+    assert [(e["op"], e["index"], e["detail"]) for e in response.json()["detail"]] == [
+        ("create", 1, "project_id is required"),
+        ("create", 2, "Project 999 not found"),
+        ("update", 1, "Change request 998 not found"),
+        ("delete", 0, f"Change request {change_request['id']} is listed more than once"),
+    ]
+
+    project = api_client.get(f"/api/projects/{project_id}").json()
+    assert [cr["name"] for cr in project["change_requests"]] == [change_request["name"]]
+    assert project["change_requests"][0]["status"] == change_request["status"]
+
+    response = api_client.post(
+        "/api/change-requests:batch",
+        json={"create": [{"name": "Reroute feeder", "project_id": project_id}]},
+    )
+    assert response.status_code == 200 and len(response.json()["created"]) == 1
+
+
+def _create_project(api_client: TestClient, unit_id: int, tender_no: str):
+    response = api_client.post(
+        "/api/projects",
+        json={
+            "name": f"Project {tender_no}",
+            "businessunit_id": unit_id,
+            "description": "Paged",
+            "tender_no": tender_no,
+            "scope_of_work": "Scope",
+            "budget": 1000.0,
+            "bid_value": 900.0,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_business_units_keyset_pagination(api_client: TestClient):
+    for index in range(5):
+        api_client.post("/api/business-units", json={"name": f"Unit {index}"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["after_id"] = cursor
+        page = api_client.get("/api/business-units", params=params).json()
+        assert len(page["items"]) <= 2
+        seen.extend(unit["id"] for unit in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen)
+    assert len(seen) == 5
+
+
+def test_projects_listing_pagination(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    unit_id = api_client.get("/api/business-units").json()["items"][0]["id"]
+    other_unit = api_client.post("/api/business-units", json={"name": "Other"}).json()
+    for index in range(3):
+        _create_project(api_client, unit_id, f"PAGE-{index}")
+    _create_project(api_client, other_unit["id"], "OTHER-1")
+
+    first = api_client.get("/api/projects", params={"limit": 3}).json()
+    assert len(first["items"]) == 3
+    assert first["next_cursor"] == first["items"][-1]["id"]
+
+    second = api_client.get(
+        "/api/projects", params={"limit": 3, "after_id": first["next_cursor"]}
+    ).json()
+    assert [p["tender_no"] for p in second["items"]] == ["PAGE-2", "OTHER-1"]
+    assert second["next_cursor"] is None
+
+    filtered = api_client.get(
+        "/api/projects", params={"businessunit_id": other_unit["id"]}
+    ).json()
+    assert [p["tender_no"] for p in filtered["items"]] == ["OTHER-1"]
+
+    assert api_client.get("/api/projects", params={"limit": 0}).status_code == 422
+
+
+def test_sparse_fieldsets_and_include(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    engine = _read_engine(api_client)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = api_client.get(
+            "/api/business-units",
+            params={"include": "projects", "fields": "name,projects.category"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    unit = response.json()["items"][0]
+    assert set(unit) == {"id", "name", "projects"}
+    assert set(unit["projects"][0]) == {"id", "category"}
+    # the change version lookup, one query for the units and one for their projects
+    assert len(statements) == 3 and "pmo_change_version" in statements[0]
+    assert "tender_no" not in statements[1]
+
+    project_id = unit["projects"][0]["id"]
+    detail = api_client.get(
+        f"/api/projects/{project_id}", params={"include": "issues", "fields": "name"}
+    ).json()
+    assert set(detail) == {"id", "name", "issues"}
+    assert detail["issues"][0]["name"] == "Vendor kickoff delay"
+
+    bare = api_client.get(f"/api/projects/{project_id}", params={"include": ""}).json()
+    assert "issues" not in bare and bare["tender_no"] == "ACME-RYD-001"
+
+    listing = api_client.get(
+        "/api/projects", params={"include": "", "fields": "budget"}
+    ).json()
+    assert listing["items"] == [{"id": project_id, "budget": 2_500_000.0}]
+
+
+def test_fields_without_include_expand_only_dotted_paths(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    engine = _read_engine(api_client)
+    project_id = api_client.get("/api/projects").json()["items"][0]["id"]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        detail = api_client.get(
+            f"/api/projects/{project_id}", params={"fields": "category"}
+        ).json()
+        nested = api_client.get(
+            f"/api/projects/{project_id}", params={"fields": "name,issues.name"}
+        ).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert detail == {"id": project_id, "category": detail["category"]}
+    assert set(nested) == {"id", "name", "issues"}
+    assert set(nested["issues"][0]) == {"id", "name"}
+    # per request: the change version lookup and the project; issues add one query
+    assert len(statements) == 5
+    assert not any("risk" in statement for statement in statements)
+
+
+def test_sparse_fieldsets_reject_unknown_paths(api_client: TestClient):
+    assert api_client.get("/api/projects", params={"fields": "nope"}).status_code == 400
+    assert api_client.get("/api/projects", params={"include": "risks"}).status_code == 400
+    assert (
+        api_client.get("/api/business-units", params={"fields": "projects.nope"}).status_code
+        == 400
+    )
+
+
+def test_read_endpoints_answer_conditional_requests(api_client: TestClient):
+    project_id = api_client.post("/api/sample-data").json()["project_id"]
+    units = api_client.get("/api/business-units")
+    etag = units.headers["etag"]
+    assert etag.startswith('"') and units.headers["cache-control"] == "no-cache"
+    assert "GMT" in units.headers["last-modified"]
+
+    engine = _read_engine(api_client)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        cached = api_client.get("/api/business-units", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    # only the change version lookup; the tree is neither loaded nor serialized
+    assert len(statements) == 1 and "pmo_change_version" in statements[0]
+
+    since = {"If-Modified-Since": units.headers["last-modified"]}
+    assert api_client.get("/api/business-units", headers=since).status_code == 304
+    other = api_client.get("/api/business-units", params={"limit": 1})
+    assert other.headers["etag"] != etag
+
+    # a new issue changes every representation that includes issues
+    bare = api_client.get("/api/business-units", params={"include": ""})
+    project = api_client.get(f"/api/projects/{project_id}")
+    api_client.post(
+        f"/api/projects/{project_id}/issues",
+        json={"name": "Polled", "severity": "low", "opened_on": date.today().isoformat()},
+    )
+    changed = api_client.get("/api/business-units", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert api_client.get(
+        f"/api/projects/{project_id}", headers={"If-None-Match": project.headers["etag"]}
+    ).status_code == 200
+    assert api_client.get(
+        "/api/business-units",
+        params={"include": ""},
+        headers={"If-None-Match": bare.headers["etag"]},
+    ).status_code == 304
+
+    # "*" matches any current representation, but only of a resource that exists
+    anything = {"If-None-Match": "*"}
+    assert api_client.get("/api/projects/999999", headers=anything).status_code == 404
+    found = api_client.get(f"/api/projects/{project_id}", headers=anything)
+    assert found.status_code == 304
+    assert api_client.get(
+        f"/api/projects/{project_id}", params={"fields": "name"}, headers=anything
+    ).status_code == 304
+
+    # bulk statements bump versions too
+    issue_id = changed.json()["items"][0]["projects"][0]["issues"][-1]["id"]
+    api_client.post("/api/issues:batch", json={"delete": [issue_id]})
+    assert api_client.get(
+        "/api/business-units", headers={"If-None-Match": changed.headers["etag"]}
+    ).status_code == 200
+
+
+def test_last_modified_rounds_up_to_the_next_second():
+    def request(*headers: tuple[bytes, bytes]) -> Request:
+        scope = {"type": "http", "path": "/api/projects", "query_string": b""}
+        return Request({**scope, "headers": list(headers)})
+
+    def since(value: str) -> Request:
+        return request((b"if-modified-since", value.encode()))
+
+    changed_at = datetime(2025, 3, 1, 12, 0, 0, 700_000)
+    validators = Validators.for_request(request(), {"project": TableVersion(2, changed_at)})
+    assert validators.headers()["Last-Modified"] == "Sat, 01 Mar 2025 12:00:01 GMT"
+
+    # a copy fetched earlier in the same second predates the change
+    assert not validators.fresh(since("Sat, 01 Mar 2025 12:00:00 GMT"))
+    assert validators.fresh(since("Sat, 01 Mar 2025 12:00:01 GMT"))
+
+
+def test_read_responses_are_cached_until_a_commit_touches_their_tables(
+    api_client: TestClient,
+):
+    project_id = api_client.post("/api/sample-data").json()["project_id"]
+    first = api_client.get("/api/business-units")
+    bare = api_client.get("/api/business-units", params={"include": ""})
+    assert api_client.get("/metrics/cache").json()["misses"] == 2
+
+    engine = _read_engine(api_client)
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        again = api_client.get("/api/business-units")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert again.content == first.content
+    assert again.headers["etag"] == first.headers["etag"]
+    assert len(statements) == 1 and "pmo_change_version" in statements[0]
+
+    api_client.put(f"/api/projects/{project_id}", json={"name": "Renamed"})
+    metrics = api_client.get("/metrics/cache").json()
+    # the project change drops the full tree but not the units-only listing
+    assert metrics["hits"] == 1 and metrics["invalidations"] == 1
+    assert metrics["entries"] == 1
+
+    renamed = api_client.get("/api/business-units").json()
+    assert renamed["items"][0]["projects"][0]["name"] == "Renamed"
+    assert api_client.get("/api/business-units", params={"include": ""}).content == (
+        bare.content
+    )
+    assert api_client.get("/metrics/cache").json()["hits"] == 2
+
+
+def test_response_cache_backend_is_pluggable(tmp_path: Path):
+    class DictBackend:
+        def __init__(self):
+            self.entries = {}
+
+        def get(self, key):
+            return self.entries.get(key, (None,))[0]
+
+        def set(self, key, value, ttl, tags):
+            self.entries[key] = (value, frozenset(tags))
+
+        def invalidate(self, tags):
+            dropped = [key for key, (_, keyed) in self.entries.items() if keyed & set(tags)]
+            for key in dropped:
+                del self.entries[key]
+            return len(dropped)
+
+        def clear(self):
+            self.entries.clear()
+
+        def stats(self):
+            return {"entries": len(self.entries)}
+
+    backend = DictBackend()
+    app = create_app(f"sqlite:///{tmp_path / 'plugged.db'}", cache_backend=backend)
+    with TestClient(app) as client:
+        project_id = client.post("/api/sample-data").json()["project_id"]
+        client.get(f"/api/projects/{project_id}")
+        client.get(f"/api/projects/{project_id}")
+        assert client.get("/metrics/cache").json()["hits"] == 1
+        assert len(backend.entries) == 1
+        client.delete(f"/api/projects/{project_id}")
+        assert backend.entries == {}
+        assert client.get(f"/api/projects/{project_id}").status_code == 404
+
+
+def test_portfolio_summary(api_client: TestClient):
+    empty = api_client.get("/api/portfolio/summary").json()
+    assert empty["totals"]["projects"] == 0
+    assert empty["by_category"] == []
+
+    api_client.post("/api/sample-data")
+    unit_id = api_client.get("/api/business-units").json()["items"][0]["id"]
+    other = api_client.post("/api/business-units", json={"name": "Idle"}).json()
+    project_id = _create_project(api_client, unit_id, "SUM-1")
+    api_client.post(
+        f"/api/projects/{project_id}/issues",
+        json={
+            "name": "Closed one",
+            "status": "closed",
+            "severity": "low",
+            "opened_on": date.today().isoformat(),
+        },
+    )
+
+    summary = api_client.get("/api/portfolio/summary").json()
+    assert summary["totals"] == {
+        "projects": 2,
+        "budget": 2_501_000.0,
+        "bid_value": 2_450_900.0,
+        "open_issues": 1,
+        "pending_change_requests": 1,
+    }
+    by_unit = {row["businessunit_id"]: row for row in summary["by_business_unit"]}
+    assert by_unit[unit_id]["projects"] == 2
+    assert by_unit[other["id"]]["projects"] == 0
+    assert by_unit[other["id"]]["budget"] == 0.0
+    assert summary["by_category"] == [
+        {
+            "category": 0,
+            "projects": 2,
+            "budget": 2_501_000.0,
+            "bid_value": 2_450_900.0,
+            "open_issues": 1,
+            "pending_change_requests": 1,
+        }
+    ]
+    stages = {row["stage"]: row["projects"] for row in summary["by_stage"]}
+    assert stages == {None: 1, "awarded": 1}
+
+
+def test_earned_value_endpoint(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    response = api_client.get("/api/evm", params={"level": "workpackage"})
+    assert response.status_code == 200
+    (row,) = response.json()
+    assert row["name"] == "Site Preparation"
+    assert row["bac"] == 150_000.0
+
+    by_unit = api_client.get(
+        "/api/evm", params={"level": "businessunit", "as_of": "2000-01-01"}
+    ).json()
+    assert by_unit[0]["pv"] == 0.0
+    assert api_client.get("/api/evm", params={"level": "task"}).status_code == 422
+
+
+def test_project_schedule_endpoint(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    project_id = api_client.get("/api/projects").json()["items"][0]["id"]
+
+    schedule = api_client.get(f"/api/projects/{project_id}/schedule")
+    assert schedule.status_code == 200
+    assert schedule.json() == {
+        "project_id": project_id,
+        "start": None,
+        "finish": None,
+        "tasks": [],
+        "critical_path": [],
+    }
+    assert api_client.get("/api/projects/9999/schedule").status_code == 404
+
+    with api_client.app.state.session_factory() as session:
+        work_package = session.query(WorkPackage).first()
+        first, second = (
+            Task(
+                name=name,
+                workpackage=work_package,
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 3),
+            )
+            for name in ("Survey", "Excavate")
+        )
+        session.add_all([first, second])
+        session.flush()
+        session.add(Dependency(predecessor_id=first.id, successor_id=second.id))
+        session.commit()
+        ids = [first.id, second.id]
+
+    payload = api_client.get(f"/api/projects/{project_id}/schedule").json()
+    assert payload["finish"] == "2025-01-05"
+    assert payload["critical_path"] == ids
+
+    with api_client.app.state.session_factory() as session:
+        session.add(Dependency(predecessor_id=ids[1], successor_id=ids[0]))
+        session.commit()
+    assert api_client.get(f"/api/projects/{project_id}/schedule").status_code == 409
+
+
+def test_resource_overallocations_endpoint(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    assert api_client.get("/api/resources/overallocations").json() == []
+
+    # The sample project manager is booked at 80% from today onwards
+    response = api_client.get("/api/resources/overallocations", params={"threshold": 50})
+    assert response.status_code == 200
+    [window] = response.json()
+    assert window["position_name"] == "Project Manager"
+    assert window["end"] is None
+    assert window["peak_percent"] == 80.0
+    assert [assignment["role"] for assignment in window["assignments"]] == ["Lead PM"]
+    assert (
+        api_client.get("/api/resources/overallocations", params={"threshold": 0}).status_code
+        == 422
+    )
+    inverted = api_client.get(
+        "/api/resources/overallocations", params={"start": "2025-06-01", "end": "2025-03-01"}
+    )
+    assert inverted.status_code == 422 and "after end" in inverted.json()["detail"]
+
+
+def test_import_xlsx_upload(api_client: TestClient):
+    project_id = api_client.post("/api/sample-data").json()["project_id"]
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Control Accounts"
+    sheet.append(["project_id", "name", "budget"])
+    sheet.append([project_id, "Imported account", 10.0])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    response = api_client.post(
+        "/api/import.xlsx",
+        files={"workbook": ("tender.xlsx", buffer.getvalue())},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"Control Accounts": 1}
+
+    rejected = api_client.post(
+        "/api/import.xlsx", files={"workbook": ("tender.xlsx", b"not a workbook")}
+    )
+    assert rejected.status_code == 400
+
+
+def test_export_xlsx_streams_workbook(api_client: TestClient):
+    api_client.post("/api/sample-data")
+    response = api_client.get("/api/export.xlsx")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.openxmlformats")
+    assert "pmo-export.xlsx" in response.headers["content-disposition"]
+
+    workbook = load_workbook(io.BytesIO(response.content), read_only=True)
+    assert len(list(workbook["Projects"].iter_rows())) == 2
+
+
+def test_pool_metrics_endpoint(api_client: TestClient):
+    api_client.get("/api/projects")
+    url = str(api_client.app.state.session_factory.kw["bind"].url)
+    figures = api_client.get("/metrics/pool").json()[url]
+    assert figures["checkouts"] >= 1 and figures["checked_out"] == 0
+
+
+def test_sqlite_profile_routes_writes_through_writer(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PMO_DB_SQLITE_PROFILE", "1")
+    app = create_app(f"sqlite:///{tmp_path / 'profile.db'}")
+    writer = app.state.write_session_factory.kw["bind"]
+    assert writer is not app.state.session_factory.kw["bind"]
+
+    statements = []
+    event.listen(writer, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with TestClient(app) as client:
+        created = client.post("/api/business-units", json={"name": "Grid Services"})
+        assert created.status_code == 201
+        assert "BEGIN IMMEDIATE" in statements
+        names = [unit["name"] for unit in client.get("/api/business-units").json()["items"]]
+    assert "Grid Services" in names
+
+
+def test_async_api_serves_reads_from_async_engine(tmp_path: Path):
+    app = create_app(f"sqlite:///{tmp_path / 'api.db'}", async_api=True)
+    sync_engine = app.state.session_factory.kw["bind"]
+    async_engine = app.state.async_session_factory.kw["bind"].sync_engine
+    counts = {sync_engine: 0, async_engine: 0}
+
+    def count(conn, *args):
+        counts[conn.engine] += 1
+
+    with TestClient(app) as client:
+        project_id = client.post("/api/sample-data").json()["project_id"]
+        for engine in counts:
+            event.listen(engine, "before_cursor_execute", count)
+        try:
+            for path in ("/api/projects", f"/api/projects/{project_id}/schedule", "/api/evm"):
+                assert client.get(path).status_code == 200
+        finally:
+            for engine in counts:
+                event.remove(engine, "before_cursor_execute", count)
+        operations = client.get("/openapi.json").json()["paths"]["/api/projects"]
+
+    assert counts[sync_engine] == 0 and counts[async_engine] > 0
+    assert set(operations) == {"get", "post"}
+
+
+def test_business_unit_graph_svg_is_cached(api_client: TestClient, tmp_path: Path):
+    calls = []
+
+    def renderer(source, format, engine):
+        calls.append(format)
+        return b"<svg>" + source.encode() + b"</svg>"
+
+    api_client.app.state.render_cache = RenderCache(tmp_path / "graphs", renderer=renderer)
+    unit_id = api_client.post("/api/sample-data").json()["business_unit_id"]
+
+    for _ in range(2):
+        response = api_client.get(f"/api/business-units/{unit_id}/graph.svg")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/svg+xml"
+        assert b"Acme Power" in response.content
+    assert calls == ["svg"]
+
+    api_client.put(f"/api/business-units/{unit_id}", json={"name": "Renamed"})
+    assert b"Renamed" in api_client.get(f"/api/business-units/{unit_id}/graph.svg").content
+    assert calls == ["svg", "svg"]
+
+    assert api_client.get("/api/business-units/999/graph.svg").status_code == 404
+
+    trimmed = api_client.get(
+        f"/api/business-units/{unit_id}/graph.svg", params={"max_depth": 1, "types": "project"}
+    )
+    assert trimmed.status_code == 200 and b"controlaccount" not in trimmed.content
+    bogus = api_client.get(f"/api/business-units/{unit_id}/graph.svg", params={"types": "bogus"})
+    assert bogus.status_code == 400
@@ -0,0 +1,56 @@
+import pytest
+
+from pmo.api import cache as cache_module
+from pmo.api.cache import MemoryBackend, NullBackend, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_memory_backend_evicts_least_recently_used_and_expired(clock):
+    backend = MemoryBackend(max_bytes=10)
+    backend.set("a", b"aaaa", 60, {"project"})
+    backend.set("b", b"bbbb", 60, {"issue"})
+    assert backend.get("a") == b"aaaa"
+    backend.set("c", b"cccc", 60, {"project"})  # over 10 bytes: "b" is the oldest
+    assert backend.get("b") is None
+    assert backend.stats() == {"entries": 2, "bytes": 8, "evictions": 1}
+
+    backend.set("huge", b"x" * 11, 60, ())
+    assert backend.get("huge") is None
+
+    clock[0] += 61
+    assert backend.get("a") is None
+    assert backend.stats()["evictions"] == 2
+
+
+def test_response_cache_counts_and_invalidates_by_table():
+    cache = ResponseCache(MemoryBackend(), ttl=60)
+    assert cache.get("etag-1") is None
+    cache.put("etag-1", b"{}", {"businessunit", "project"})
+    cache.put("etag-2", b"[]", {"issue"})
+    assert cache.get("etag-1") == b"{}"
+
+    cache.invalidate({"project", "risk"})
+    assert cache.get("etag-1") is None and cache.get("etag-2") == b"[]"
+    assert cache.stats() == {
+        "ttl": 60,
+        "hits": 2,
+        "misses": 2,
+        "invalidations": 1,
+        "entries": 1,
+        "bytes": 2,
+        "evictions": 0,
+    }
+
+    disabled = ResponseCache(ttl=0)
+    disabled.put("etag-1", b"{}", {"project"})
+    assert disabled.get("etag-1") is None and disabled.stats()["misses"] == 0
+
+    nothing = ResponseCache(NullBackend(), ttl=60)
+    nothing.put("etag-1", b"{}", {"project"})
+    assert nothing.get("etag-1") is None and nothing.stats()["misses"] == 1
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from pmo.cli import PMOCli, main
+from pmo.db import dispose_engines
+from pmo.models import BusinessPlan, Objective, Project
+from pmo.sample_data import create_sample_data
+
+
+@pytest.fixture
+def cli(tmp_path):
+    cli = PMOCli(f"sqlite:///{tmp_path / 'cli.db'}")
+    with cli.get_session() as session:
+        create_sample_data(session)
+    yield cli
+    dispose_engines()
+
+
+def _add_rows(cli, count):
+    with cli.get_session() as session:
+        unit_id = session.get(Project, 1).businessunit_id
+        for n in range(count):
+            session.add(
+                Project(
+                    name=f"Bulk {n}",
+                    businessunit_id=unit_id,
+                    description="Bulk project",
+                    tender_no=f"BULK-{n}",
+                    scope_of_work="Scope",
+                    bid_issue_date=date(2025, 1, 1),
+                    tender_purchase_date=date(2025, 1, 1),
+                    bid_due_date=date(2025, 1, 1),
+                    bid_validity_d=90,
+                    budget=1.0,
+                    bid_value=1.0,
+                )
+            )
+            plan = BusinessPlan(name=f"Plan {n}", businessunit_id=unit_id)
+            session.add_all([plan, Objective(name=f"Objective {n}", businessplan=plan)])
+        session.commit()
+
+
+def _listing_queries(cli, run):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(cli.engine, "before_cursor_execute", listener)
+    try:
+        run()
+    finally:
+        event.remove(cli.engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+def test_text_listings(cli, capsys):
+    cli.list_business_units()
+    cli.list_positions()
+    cli.list_business_plans(businessunit_id=1)
+    cli.list_projects(businessunit_id=99)
+
+    out = capsys.readouterr().out.splitlines()
+    assert "  1: Acme Power [businessunit] (managed by: Chief Executive Officer)" in out
+    assert "  1: Chief Executive Officer [Acme Power] (manages: Acme Power)" in out
+    assert (
+        "  3: Project Manager [Acme Power] (reports to: Chief Operations Officer)" in out
+    )
+    assert "  1: 2025 Growth Plan [Acme Power] (1 objectives)" in out
+    assert out[-1] == "No projects found."
+
+
+def test_json_and_csv_listings(cli, capsys):
+    cli.list_projects(output_format="json")
+    projects = json.loads(capsys.readouterr().out)
+    assert projects == [
+        {
+            "id": 1,
+            "name": "Riyadh Substation Upgrade",
+            "businessunit": "Acme Power",
+            "tender_no": "ACME-RYD-001",
+            "budget": 2500000.0,
+            "category": "substation",
+        }
+    ]
+
+    cli.list_positions(output_format="csv")
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert [row["name"] for row in rows] == [
+        "Chief Executive Officer",
+        "Chief Operations Officer",
+        "Project Manager",
+    ]
+    assert rows[1]["parent"] == "Chief Executive Officer" and rows[1]["manages"] == ""
+
+    cli.list_business_plans(businessunit_id=99, output_format="json")
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_listing_query_count_does_not_grow_with_rows(cli, capsys):
+    listings = [
+        cli.list_business_units,
+        cli.list_positions,
+        cli.list_projects,
+        cli.list_business_plans,
+    ]
+    small = [_listing_queries(cli, listing) for listing in listings]
+    _add_rows(cli, 50)
+    large = [_listing_queries(cli, listing) for listing in listings]
+
+    assert large == small == [1, 1, 1, 1]
+    assert "  51: Bulk 49 [Acme Power]" in capsys.readouterr().out
+
+
+def test_overallocations_rejects_an_inverted_period(tmp_path, monkeypatch, capsys):
+    database = f"sqlite:///{tmp_path / 'cli.db'}"
+    period = ["--start", "2025-06-01", "--end", "2025-03-01"]
+    monkeypatch.setattr("sys.argv", ["pmo", "--db", database, "overallocations", *period])
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    dispose_engines()
+    assert exit_info.value.code == 2
+    assert "--start must not be after --end" in capsys.readouterr().err
@@ -0,0 +1,67 @@
+"""Importing the CLI must stay cheap: scripts run it thousands of times a day.
+
+``python -X importtime`` reports the cumulative import time of every module;
+the heavy dependencies may only be imported by the subcommands that use
+them, and the whole CLI import has a time budget
+(``PMO_CLI_IMPORT_BUDGET_MS``, default 1000 ms).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# imported on demand by serve, graph, import/export xlsx and async engines
+LAZY_MODULES = (
+    "uvicorn",
+    "fastapi",
+    "starlette",
+    "sqladmin",
+    "graphviz",
+    "openpyxl",
+    "pmo.api",
+    "sqlalchemy.ext.asyncio",
+)
+DEFAULT_BUDGET_MS = 1000
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """Return ``{module: cumulative microseconds}`` for a fresh ``import module``."""
+
+    path = os.pathsep.join([str(SRC), os.environ.get("PYTHONPATH", "")])
+    env = dict(os.environ, PYTHONPATH=path)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_skips_heavy_dependencies():
+    imported = _importtime("pmo.cli")
+    assert "pmo.cli" in imported
+    loaded = [
+        lazy
+        for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in imported)
+    ]
+    assert not loaded, f"imported at CLI startup: {loaded}"
+
+
+def test_cli_import_time_budget():
+    budget_ms = int(os.environ.get("PMO_CLI_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+    # best of three, so a cold disk cache or a busy machine does not fail the run
+    best_ms = min(_importtime("pmo.cli")["pmo.cli"] for _ in range(3)) / 1000
+    assert best_ms <= budget_ms, f"pmo.cli imports in {best_ms:.0f} ms (budget {budget_ms} ms)"
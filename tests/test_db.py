@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, exc, text
+
+from pmo.db import (
+    EngineConfig,
+    async_url,
+    dispose_engines,
+    get_async_engine,
+    get_engine,
+    get_writer_engine,
+    load_engine_config,
+    pool_metrics,
+    primary_engine,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch):
+    variables = ["PMO_CONFIG", "PMO_DATABASE_URL"]
+    variables += [f"PMO_DB_{name.upper()}" for name in EngineConfig._fields]
+    for variable in variables:
+        monkeypatch.delenv(variable, raising=False)
+    yield
+    dispose_engines()
+
+
+def test_config_precedence(tmp_path, monkeypatch):
+    assert load_engine_config() == EngineConfig()
+
+    config_file = tmp_path / "pmo.toml"
+    config_file.write_text(
+        '[database]\nurl = "sqlite:///from-file.db"\npool_size = 3\npool_pre_ping = false\n'
+    )
+    monkeypatch.setenv("PMO_CONFIG", str(config_file))
+    config = load_engine_config()
+    assert config.url == "sqlite:///from-file.db"
+    assert (config.pool_size, config.pool_pre_ping) == (3, False)
+
+    monkeypatch.setenv("PMO_DB_POOL_SIZE", "8")
+    monkeypatch.setenv("PMO_DATABASE_URL", "sqlite:///from-env.db")
+    config = load_engine_config()
+    assert (config.url, config.pool_size) == ("sqlite:///from-env.db", 8)
+    assert load_engine_config("sqlite:///explicit.db").url == "sqlite:///explicit.db"
+
+    config_file.write_text("[database]\npool_sise = 3\n")
+    with pytest.raises(ValueError, match="pool_sise"):
+        load_engine_config()
+
+
+def test_registry_keeps_one_engine_per_url(tmp_path):
+    first = get_engine(f"sqlite:///{tmp_path / 'a.db'}")
+    second = get_engine(f"sqlite:///{tmp_path / 'b.db'}")
+    assert first is not second
+    assert get_engine(f"sqlite:///{tmp_path / 'a.db'}") is first
+    assert first.pool.size() == EngineConfig().pool_size
+
+
+def test_pool_metrics_record_checkouts_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setenv("PMO_DB_POOL_SIZE", "1")
+    monkeypatch.setenv("PMO_DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("PMO_DB_POOL_TIMEOUT", "0.05")
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = get_engine(url)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        [figures] = pool_metrics().values()
+        assert figures["checked_out"] == 1
+
+    [figures] = pool_metrics().values()
+    assert figures["connects"] == 1
+    assert figures["checkouts"] == figures["checkins"] == 1
+    assert figures["checkout_timeouts"] == 1
+    assert figures["checkout_wait_max_seconds"] >= 0.05
+    assert figures["pool"] == "TimedQueuePool" and figures["checked_in"] == 1
+
+
+def test_sqlite_profile_pragmas_and_writer(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'profile.db'}"
+    assert get_writer_engine(url) is get_engine(url)
+    dispose_engines()
+
+    monkeypatch.setenv("PMO_DB_SQLITE_PROFILE", "1")
+    engine = get_engine(url)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+    writer = get_writer_engine(url)
+    assert writer is not engine and get_writer_engine(url) is writer
+    assert primary_engine(writer) is engine and primary_engine(engine) is engine
+    assert writer.pool.size() == 1 and writer.pool._max_overflow == 0
+
+    statements = []
+    event.listen(writer, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with writer.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+    assert statements[0] == "BEGIN IMMEDIATE"
+    assert f"{writer.url} (writer)" in pool_metrics()
+
+
+def test_memory_sqlite_ignores_profile(monkeypatch):
+    monkeypatch.setenv("PMO_DB_SQLITE_PROFILE", "1")
+    assert get_writer_engine("sqlite://") is get_engine("sqlite://")
+
+
+def test_async_engine_uses_asyncio_driver_and_shares_registry(tmp_path, monkeypatch):
+    assert async_url("sqlite:///pmo.db").drivername == "sqlite+aiosqlite"
+    assert async_url("postgresql://u:p@db/pmo").drivername == "postgresql+asyncpg"
+    assert async_url("postgresql+asyncpg://u:p@db/pmo").drivername == "postgresql+asyncpg"
+    with pytest.raises(ValueError):
+        async_url("oracle://u:p@db/pmo")
+
+    monkeypatch.setenv("PMO_DB_POOL_SIZE", "2")
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = get_async_engine(url)
+    assert get_async_engine(url) is engine
+    assert engine.pool.size() == 2
+    assert primary_engine(engine.sync_engine) is get_engine(url)
+
+    async def query():
+        async with engine.connect() as connection:
+            value = (await connection.execute(text("select 1"))).scalar()
+        await engine.dispose()
+        return value
+
+    assert asyncio.run(query()) == 1
+    metrics = pool_metrics()[f"sqlite+aiosqlite:///{tmp_path / 'async.db'} (async)"]
+    assert metrics["checkouts"] == 1
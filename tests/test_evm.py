@@ -0,0 +1,167 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from pmo.evm import earned_value
+from pmo.models import Budget, ControlAccount, Expense, Task, WorkPackage
+
+
+AS_OF = date(2025, 1, 11)
+
+
+@pytest.fixture
+def evm_dataset(session, sample_dataset):
+    project = sample_dataset["project"]
+    control_account = project.controlaccounts[0]
+    site_prep = sample_dataset["work_package"]
+    site_prep.start_date = date(2025, 1, 1)
+    site_prep.end_date = date(2025, 1, 5)
+    site_prep.budget = 100.0
+
+    # Ten-day package with four of its days elapsed as of AS_OF
+    civils = WorkPackage(
+        name="Civils",
+        controlaccount=control_account,
+        budget=1000.0,
+        start_date=date(2025, 1, 7),
+        end_date=date(2025, 1, 17),
+    )
+    for index in range(4):
+        Task(
+            name=f"Pour {index}",
+            workpackage=civils,
+            start_date=civils.start_date,
+            end_date=civils.end_date,
+            is_complete=index == 0,
+        )
+    clear_site = Task(
+        name="Clear site",
+        workpackage=site_prep,
+        start_date=site_prep.start_date,
+        end_date=site_prep.end_date,
+        is_complete=True,
+    )
+
+    session.add_all([civils, clear_site])
+    session.flush()
+
+    def expense(name, amount, day, workpackage=None):
+        return Expense(
+            name=name,
+            project_id=project.id,
+            workpackage_id=workpackage.id if workpackage else None,
+            amount=amount,
+            date=day,
+            description="",
+        )
+
+    session.add_all(
+        [
+            expense("Crew", 80.0, date(2025, 1, 3), site_prep),
+            expense("Concrete", 300.0, date(2025, 1, 10), civils),
+            expense("Future", 999.0, date(2025, 2, 1), civils),
+            expense("Overheads", 20.0, date(2025, 1, 2)),
+        ]
+    )
+    session.commit()
+    return {"project": project, "site_prep": site_prep, "civils": civils}
+
+
+def test_workpackage_figures(session, evm_dataset):
+    rows = {row["id"]: row for row in earned_value(session, as_of=AS_OF, level="workpackage")}
+
+    site_prep = rows[evm_dataset["site_prep"].id]
+    assert site_prep["pv"] == pytest.approx(100.0)
+    assert site_prep["ev"] == pytest.approx(100.0)
+    assert site_prep["ac"] == pytest.approx(80.0)
+    assert site_prep["cpi"] == pytest.approx(1.25)
+
+    civils = rows[evm_dataset["civils"].id]
+    assert civils["pv"] == pytest.approx(400.0)
+    assert civils["ev"] == pytest.approx(250.0)
+    assert civils["ac"] == pytest.approx(300.0)
+    assert civils["spi"] == pytest.approx(0.625)
+    assert civils["eac"] == pytest.approx(1000.0 / (250.0 / 300.0))
+
+
+def test_rollups(session, evm_dataset):
+    project_id = evm_dataset["project"].id
+    # the account's own budget of 500,000 of which 1,100 is in work packages
+    (account,) = earned_value(session, as_of=AS_OF, level="controlaccount")
+    assert account["bac"] == pytest.approx(500_000.0)
+    assert account["undistributed"] == pytest.approx(498_900.0)
+    assert account["ac"] == pytest.approx(380.0)
+
+    (project,) = earned_value(session, as_of=AS_OF, project_id=project_id)
+    assert project["pv"] == pytest.approx(500.0)
+    assert project["ev"] == pytest.approx(350.0)
+    # includes the expense booked without a work package
+    assert project["ac"] == pytest.approx(400.0)
+
+    (unit,) = earned_value(session, as_of=AS_OF, level="businessunit")
+    assert unit["ac"] == pytest.approx(400.0)
+    assert unit["bac"] == pytest.approx(500_000.0)
+
+    before = earned_value(session, as_of=date(2024, 12, 1), project_id=project_id)[0]
+    assert before["pv"] == 0.0 and before["ac"] == 0.0
+    assert before["cpi"] is None and before["spi"] is None
+
+
+def test_budget_sources(session, evm_dataset):
+    project = evm_dataset["project"]
+    civils = evm_dataset["civils"]
+    # planned budget lines replace the work package budget; actuals are undated
+    session.add_all(
+        [
+            Budget(name="Civils base", workpackage_id=civils.id, planned=1500.0, actual=9e6),
+            Budget(name="Civils change", workpackage_id=civils.id, planned=500.0),
+            Budget(name="Project reserve", project_id=project.id, planned=7e6),
+        ]
+    )
+    project.controlaccounts[0].budget = 0.0
+    empty = ControlAccount(name="Commissioning", project=project, budget=250.0)
+    session.add(empty)
+    session.commit()
+
+    rows = {row["id"]: row for row in earned_value(session, as_of=AS_OF, level="workpackage")}
+    assert rows[civils.id]["bac"] == pytest.approx(2000.0)
+    assert rows[civils.id]["pv"] == pytest.approx(800.0)
+    assert rows[civils.id]["ac"] == pytest.approx(300.0)
+
+    accounts = {
+        row["id"]: row for row in earned_value(session, as_of=AS_OF, level="controlaccount")
+    }
+    # without its own budget an account is the sum of its work packages
+    mobilization = accounts[project.controlaccounts[0].id]
+    assert mobilization["bac"] == pytest.approx(2100.0)
+    assert mobilization["undistributed"] == 0.0
+    # an account with a budget but no work packages yet
+    assert accounts[empty.id]["bac"] == pytest.approx(250.0)
+    assert accounts[empty.id]["undistributed"] == pytest.approx(250.0)
+    assert accounts[empty.id]["pv"] == 0.0
+
+    (totals,) = earned_value(session, as_of=AS_OF, project_id=project.id)
+    assert totals["bac"] == pytest.approx(2350.0)
+    assert totals["undistributed"] == pytest.approx(250.0)
+    assert totals["ac"] == pytest.approx(400.0)
+
+
+def test_each_level_is_a_single_statement(engine, session, evm_dataset):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        for level in ("workpackage", "controlaccount", "project", "businessunit"):
+            earned_value(session, as_of=AS_OF, level=level)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 4
+
+
+def test_unknown_level(session):
+    with pytest.raises(ValueError):
+        earned_value(session, level="task")
@@ -0,0 +1,54 @@
+import io
+from datetime import date
+
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from pmo.models import Base, Expense
+from pmo.sample_data import create_sample_data
+from pmo.xlsx import EXPORT_SHEETS, export_workbook, stream_workbook
+
+
+def test_export_writes_one_sheet_per_model(session, sample_dataset):
+    session.add(
+        Expense(
+            name="Survey crew",
+            project_id=sample_dataset["project"].id,
+            amount=250.0,
+            date=date(2025, 1, 3),
+            description="Day rate",
+        )
+    )
+    session.commit()
+
+    buffer = io.BytesIO()
+    counts = export_workbook(session, buffer, batch_size=2)
+    assert counts["Projects"] == 1 and counts["Expenses"] == 1
+
+    workbook = load_workbook(io.BytesIO(buffer.getvalue()), read_only=True)
+    assert workbook.sheetnames == [title for title, _ in EXPORT_SHEETS]
+    header, row = workbook["Projects"].iter_rows(values_only=True)
+    assert dict(zip(header, row))["category"] == sample_dataset["project"].category.name
+    [_, expense] = workbook["Expenses"].iter_rows(values_only=True)
+    assert "Survey crew" in expense
+
+
+def test_stream_workbook_yields_chunks(tmp_path):
+    # a file database: the export runs in another thread
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(engine)
+    with factory() as session:
+        create_sample_data(session)
+
+    chunks = list(stream_workbook(factory, chunk_size=1024))
+    assert len(chunks) > 1
+    workbook = load_workbook(io.BytesIO(b"".join(chunks)), read_only=True)
+    assert "Work Packages" in workbook.sheetnames
+
+    # abandoning the stream early stops the worker
+    stream = stream_workbook(factory, chunk_size=1024)
+    next(stream)
+    stream.close()
+    engine.dispose()
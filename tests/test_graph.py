@@ -0,0 +1,259 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from pmo.graph import (
+    RenderCache,
+    load_unit_graph,
+    render_to_files,
+    shape_graph,
+    to_digraph,
+)
+from pmo.models import (
+    BusinessUnit,
+    ControlAccount,
+    Issue,
+    Project,
+    ResourceAssignment,
+    Task,
+    WorkPackage,
+)
+
+
+def _count_queries(engine, run):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = run()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), result
+
+
+def _add_projects(session, unit, count):
+    pm = next(position for position in unit.positions if position.name == "Project Manager")
+    for n in range(count):
+        project = Project(
+            name=f"Extra {n}",
+            businessunit=unit,
+            description="Extra project",
+            tender_no=f"EXTRA-{n}",
+            scope_of_work="Scope",
+            bid_issue_date=date(2025, 1, 1),
+            tender_purchase_date=date(2025, 1, 1),
+            tender_purchase_fee=0.0,
+            bid_due_date=date(2025, 1, 1),
+            bid_validity_d=90,
+            include_vat=False,
+            budget=1.0,
+            bid_value=1.0,
+            perf_bond_p=0.0,
+            advance_pmt_p=0.0,
+        )
+        account = ControlAccount(name=f"CA {n}", project=project)
+        workpackage = WorkPackage(
+            name=f"WP {n}",
+            controlaccount=account,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1),
+        )
+        task = Task(
+            name=f"Task {n}",
+            workpackage=workpackage,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 5),
+        )
+        assignment = ResourceAssignment(
+            name=f"Assignment {n}",
+            project=project,
+            position=pm,
+            task=task,
+            role="Engineer",
+            start_date=date(2025, 1, 1),
+        )
+        issue = Issue(
+            name=f"Issue {n}",
+            project=project,
+            severity="low",
+            opened_on=date(2025, 1, 1),
+        )
+        session.add_all([project, account, workpackage, task, assignment, issue])
+    session.commit()
+
+
+def test_unit_graph_nodes_and_edges(session, sample_dataset):
+    unit = sample_dataset["business_unit"]
+    project = sample_dataset["project"]
+    work_package = sample_dataset["work_package"]
+    positions = sample_dataset["positions"]
+
+    unit_graph = load_unit_graph(session, unit.id)
+    edges = {
+        (node.id, node.parent) for section in unit_graph.sections for node in section.nodes
+    }
+    issue = project.issues[0]
+    assert (positions["ceo"].idx, unit.idx) in edges  # the unit's manager
+    assert (positions["pm"].idx, positions["coo"].idx) in edges
+    assert (project.idx, unit.idx) in edges
+    assert (issue.idx, work_package.idx) in edges
+    assert [section.label for section in unit_graph.sections if section.name] == [
+        "orgchart",
+        "projects",
+        "businessplans",
+    ]
+
+    source = to_digraph(unit_graph).source
+    assert f"{issue.idx} -> {work_package.idx}" in source
+    assert "subgraph cluster_2" in source
+    assert load_unit_graph(session, unit.id + 100) is None
+
+
+def test_mk_graph_query_count_does_not_grow_with_data(engine, session, sample_dataset):
+    unit_id = sample_dataset["business_unit"].id
+    session.expunge_all()
+
+    def build():
+        unit = session.get(BusinessUnit, unit_id)
+        return unit.mk_graph(render=False)
+
+    small, graph = _count_queries(engine, build)
+    assert "changerequest" in graph.source
+
+    session.expunge_all()
+    _add_projects(session, session.get(BusinessUnit, unit_id), 25)
+    session.expunge_all()
+    large, graph = _count_queries(engine, build)
+
+    assert large == small
+    assert "Extra 24" in graph.source
+    assert graph.source.count("-> task") == 25
+
+
+def test_mk_graph_requires_a_session():
+    with pytest.raises(ValueError):
+        BusinessUnit(name="Loose", type="businessunit").mk_graph(render=False)
+
+
+def _nodes(unit_graph):
+    return [node for section in unit_graph.sections for node in section.nodes]
+
+
+def test_shape_graph_depth_types_and_project(session, sample_dataset):
+    unit = sample_dataset["business_unit"]
+    project = sample_dataset["project"]
+    _add_projects(session, unit, 3)
+    full = load_unit_graph(session, unit.id)
+
+    shallow = shape_graph(full, max_depth=1)
+    assert {node.depth for node in _nodes(shallow)} == {0, 1}
+    assert {"project", "businessplan", "position"} <= {node.kind for node in _nodes(shallow)}
+
+    issues_only = shape_graph(full, kinds={"project", "issue"})
+    issue = next(node for node in _nodes(issues_only) if node.id == project.issues[0].idx)
+    assert issue.parent == project.idx  # its work package and control account are gone
+    assert {node.kind for node in _nodes(issues_only)} == {"businessunit", "project", "issue"}
+    with pytest.raises(ValueError, match="task"):
+        shape_graph(full, kinds={"task"})
+
+    single = shape_graph(full, project_id=project.id)
+    assert {node.project_id for node in _nodes(single) if node.depth} == {project.id}
+    assert [section.label for section in single.sections if section.name] == ["projects"]
+    assert "cluster_1" not in to_digraph(single).source
+
+
+def test_shape_graph_collapses_repeated_leaves(session, sample_dataset):
+    unit = sample_dataset["business_unit"]
+    _add_projects(session, unit, 5)
+
+    collapsed = shape_graph(load_unit_graph(session, unit.id), max_depth=1, collapse=3)
+    badges = [node for node in _nodes(collapsed) if node.kind == "project"]
+    assert len(badges) == 1
+    assert badges[0].label == "6 × Project" and badges[0].parent == unit.idx
+    # a single business plan stays as it is
+    assert [node.label for node in _nodes(collapsed) if node.kind == "businessplan"] == [
+        "2025 Growth Plan"
+    ]
+
+    graph = unit.mk_graph(render=False, kinds={"project", "issue"}, collapse=2)
+    assert "6 × Project" not in graph.source  # projects have issues below them
+    assert graph.source.count("× Issue") == 0
+
+
+class FakeRenderer:
+    def __init__(self, size=100):
+        self.size = size
+        self.calls = []
+
+    def __call__(self, source, format, engine):
+        self.calls.append((format, engine))
+        return f"<{format}>".encode().ljust(self.size, b" ")
+
+
+def test_render_cache_hits_on_identical_source(tmp_path):
+    renderer = FakeRenderer()
+    cache = RenderCache(tmp_path / "cache", renderer=renderer)
+
+    first = cache.render("digraph { a -> b }", "svg")
+    assert cache.render("digraph { a -> b }", "svg") == first
+    assert renderer.calls == [("svg", "dot")]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.render("digraph { a -> b }", "png")
+    cache.render("digraph { a -> c }", "svg")
+    assert len(renderer.calls) == 3
+
+
+def test_render_cache_evicts_least_recently_used(tmp_path):
+    renderer = FakeRenderer(size=100)
+    cache = RenderCache(tmp_path, max_bytes=250, renderer=renderer)
+    sources = [f"digraph {{ n{i} }}" for i in range(3)]
+
+    cache.render(sources[0])
+    cache.render(sources[1])
+    first, second = (cache.path(cache.key(source), "svg") for source in sources[:2])
+    os.utime(first, ns=(1, 1))
+    os.utime(second, ns=(2, 2))
+    cache.render(sources[0])  # a hit makes it the most recently used
+    cache.render(sources[2])
+
+    assert cache.size() <= 250
+    assert first.exists() and not second.exists()
+    cache.render(sources[0])
+    assert len(renderer.calls) == 3
+
+
+def test_render_cache_scans_its_directory_only_when_over_the_limit(tmp_path, monkeypatch):
+    cache = RenderCache(tmp_path, max_bytes=450, renderer=FakeRenderer(size=100))
+    (tmp_path / "earlier.svg").write_bytes(b"x" * 100)  # left by an earlier process
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(3):
+        cache.render(f"digraph {{ n{i} }}")
+    assert len(scans) == 1  # the first store counts what is already there
+
+    cache.render("digraph { n3 }")  # 500 bytes: over the limit
+    assert len(scans) == 2 and cache.size() <= 450
+    cache.render("digraph { n4 }")
+    assert len(scans) == 3 and cache.size() <= 450
+
+
+def test_mk_graph_renders_through_the_cache(session, sample_dataset, tmp_path, monkeypatch):
+    renderer = FakeRenderer()
+    cache = RenderCache(tmp_path / "cache", renderer=renderer)
+    monkeypatch.setattr("pmo.graph._default_cache", cache)
+    unit = sample_dataset["business_unit"]
+
+    unit.mk_graph(directory=str(tmp_path / "out"), render=True)
+    unit.mk_graph(directory=str(tmp_path / "out"), render=True)
+
+    assert (tmp_path / "out" / "pmo.gv").read_text().startswith("// dag")
+    assert (tmp_path / "out" / "pmo.gv.pdf").read_bytes().startswith(b"<pdf>")
+    assert renderer.calls == [("pdf", "dot")]
+
+    path = render_to_files(to_digraph(load_unit_graph(session, unit.id)), str(tmp_path), "x.gv")
+    assert path == str(tmp_path / "x.gv.pdf")
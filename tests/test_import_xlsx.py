@@ -0,0 +1,147 @@
+import io
+import time
+from datetime import date, datetime
+
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import func, select
+
+from pmo.models import Project, ProjectType, Task
+from pmo.xlsx import WorkbookImportError, import_workbook
+
+
+PROJECT_HEADER = [
+    "name", "tender_no", "businessunit_id", "description", "scope_of_work", "category",
+    "bid_issue_date", "tender_purchase_date", "bid_due_date", "bid_validity_d", "budget",
+    "bid_value",
+]
+
+
+def _project_row(tender_no, businessunit_id):
+    return [
+        f"Project {tender_no}", tender_no, businessunit_id, "Imported", "Scope", "ohtl",
+        datetime(2025, 1, 1), datetime(2025, 1, 5), datetime(2025, 2, 1), 90, 1000.0, 1200.0,
+    ]
+
+
+def _workbook(sheets: dict) -> io.BytesIO:
+    workbook = Workbook(write_only=True)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def tender_workbook(sample_dataset):
+    unit_id = sample_dataset["business_unit"].id
+    position_id = sample_dataset["positions"]["pm"].id
+    # sheets deliberately out of dependency order
+    return _workbook(
+        {
+            "Tasks": [
+                ["workpackage", "ref", "name", "start_date", "end_date", "is_complete"],
+                ["wp-1", "t-1", "Survey", datetime(2025, 3, 1), datetime(2025, 3, 4), "yes"],
+                ["wp-1", None, "Excavate", datetime(2025, 3, 4), datetime(2025, 3, 9), None],
+            ],
+            "Resource Assignments": [
+                ["project", "position_id", "task", "name", "role", "allocation_percent",
+                 "start_date"],
+                ["T-100", position_id, "t-1", "Surveyor", "Survey lead", 50, datetime(2025, 3, 1)],
+            ],
+            "Projects": [PROJECT_HEADER, _project_row("T-100", unit_id)],
+            "control_accounts": [
+                ["ref", "project", "name", "budget"],
+                ["ca-1", "T-100", "Civil works", 800.0],
+            ],
+            "WorkPackages": [
+                ["ref", "controlaccount", "name", "budget", "start_date", "end_date"],
+                ["wp-1", "ca-1", "Foundations", 500.0, datetime(2025, 3, 1), datetime(2025, 4, 1)],
+            ],
+        }
+    )
+
+
+def test_import_maps_sheets_onto_models(session, tender_workbook):
+    counts = import_workbook(session, tender_workbook)
+    assert counts == {
+        "Projects": 1,
+        "control_accounts": 1,
+        "WorkPackages": 1,
+        "Tasks": 2,
+        "Resource Assignments": 1,
+    }
+
+    project = session.scalars(select(Project).where(Project.tender_no == "T-100")).one()
+    assert project.category is ProjectType.ohtl
+    assert project.bid_issue_date == date(2025, 1, 1)
+    assert project.completion_period_m == 12  # column default
+    [account] = project.controlaccounts
+    [package] = account.workpackages
+    assert package.is_planned is False
+    survey, excavate = sorted(package.tasks, key=lambda task: task.start_date)
+    assert survey.is_complete and not excavate.is_complete
+    [assignment] = project.resource_assignments
+    assert assignment.task_id == survey.id and assignment.end_date is None
+
+
+def test_import_is_all_or_nothing(session, sample_dataset):
+    workbook = _workbook(
+        {
+            "Projects": [PROJECT_HEADER, _project_row("T-200", sample_dataset["business_unit"].id)],
+            "Control Accounts": [["ref", "project", "name"], ["ca-1", "T-999", "Orphan"]],
+        }
+    )
+    with pytest.raises(WorkbookImportError, match="Control Accounts!2: unknown project 'T-999'"):
+        import_workbook(session, workbook)
+    assert session.scalar(select(func.count()).select_from(Project)) == 1
+
+    workbook = _workbook({"Projects": [["name", "colour"]]})
+    with pytest.raises(WorkbookImportError, match="unknown column 'colour'"):
+        import_workbook(session, workbook)
+
+
+def test_import_parses_iso_dates_and_checks_database_ids(session, sample_dataset):
+    unit_id = sample_dataset["business_unit"].id
+    row = _project_row("T-300", unit_id)
+    row[6:9] = ["2025-01-01", " 2025-01-05 ", datetime(2025, 2, 1)]
+    assert import_workbook(session, _workbook({"Projects": [PROJECT_HEADER, row]})) == {
+        "Projects": 1
+    }
+    project = session.scalars(select(Project).where(Project.tender_no == "T-300")).one()
+    assert (project.bid_issue_date, project.tender_purchase_date) == (
+        date(2025, 1, 1),
+        date(2025, 1, 5),
+    )
+
+    row = _project_row("T-301", unit_id)
+    row[6] = "01/02/2025"
+    with pytest.raises(WorkbookImportError, match="Projects!2: invalid bid_issue_date"):
+        import_workbook(session, _workbook({"Projects": [PROJECT_HEADER, row]}))
+
+    rows = [PROJECT_HEADER, _project_row("T-302", unit_id), _project_row("T-303", 999)]
+    with pytest.raises(WorkbookImportError, match="Projects!3: unknown businessunit_id 999"):
+        import_workbook(session, _workbook({"Projects": rows}))
+    assert session.scalar(select(func.count()).select_from(Project)) == 2
+
+
+def test_import_large_sheet_in_batches(session, sample_dataset):
+    size = 20_000
+    work_package_id = sample_dataset["work_package"].id
+    rows = [["workpackage_id", "name", "start_date", "end_date"]]
+    rows += [
+        [work_package_id, f"Task {i}", datetime(2025, 1, 1), datetime(2025, 1, 2)]
+        for i in range(size)
+    ]
+    workbook = _workbook({"Tasks": rows})
+
+    started = time.perf_counter()
+    assert import_workbook(session, workbook, batch_size=1000) == {"Tasks": size}
+    elapsed = time.perf_counter() - started
+
+    assert session.scalar(select(func.count()).select_from(Task)) == size
+    assert elapsed < 5.0
@@ -0,0 +1,46 @@
+from sqlalchemy import event
+
+from pmo.api.loaders import BUSINESS_UNIT_DETAIL, PROJECT_COLLECTIONS, PROJECT_DETAIL
+from pmo.models import BusinessUnit, Project
+
+
+def _count_statements(engine, fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_selectin_profile_loads_without_lazy_queries(engine, session, sample_dataset):
+    session.expunge_all()
+
+    def load():
+        units = (
+            session.query(BusinessUnit)
+            .options(*BUSINESS_UNIT_DETAIL.options(BusinessUnit))
+            .all()
+        )
+        for unit in units:
+            for project in unit.projects:
+                for name in PROJECT_COLLECTIONS:
+                    getattr(project, name)
+            unit.businessplans
+            unit.positions
+
+    statements = _count_statements(engine, load)
+    # root + projects + four project collections + plans + positions
+    assert len(statements) == 8
+    assert not any("JOIN" in statement for statement in statements)
+
+
+def test_profile_strategy_is_configurable(sample_dataset):
+    joined = PROJECT_DETAIL.with_strategy("joined")
+    assert joined.paths == PROJECT_DETAIL.paths
+    assert len(joined.options(Project)) == len(PROJECT_DETAIL.paths)
@@ -0,0 +1,104 @@
+import types
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from pmo import migrations
+from pmo.migrations import SchemaVersionError, current_version, ensure_schema, upgrade
+from pmo.models import Base
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _migration(statement):
+    return types.SimpleNamespace(upgrade=lambda connection: connection.execute(text(statement)))
+
+
+def test_fresh_database_is_created_at_head(file_engine):
+    ensure_schema(file_engine)
+    with file_engine.connect() as connection:
+        assert current_version(connection) == migrations.HEAD
+    assert set(Base.metadata.tables) <= set(inspect(file_engine).get_table_names())
+
+    statements = []
+    event.listen(file_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    ensure_schema(file_engine)
+    assert statements == []
+
+
+def test_unversioned_database_needs_explicit_upgrade(file_engine):
+    Base.metadata.create_all(file_engine)
+    with pytest.raises(SchemaVersionError, match="pmo db upgrade"):
+        ensure_schema(file_engine)
+
+    assert upgrade(file_engine) == (None, migrations.HEAD)
+    ensure_schema(file_engine)
+
+
+def test_pending_migrations_run_in_order(file_engine, monkeypatch):
+    ensure_schema(file_engine)
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        migrations.MIGRATIONS
+        + (
+            _migration("CREATE TABLE extra (id INTEGER PRIMARY KEY)"),
+            _migration("CREATE INDEX ix_extra_id ON extra (id)"),
+        ),
+    )
+    head = len(migrations.MIGRATIONS)
+
+    with pytest.raises(SchemaVersionError, match=f"version {head - 2}"):
+        ensure_schema(file_engine)
+    assert upgrade(file_engine, head - 1) == (head - 2, head - 1)
+    assert inspect(file_engine).has_table("extra")
+    assert upgrade(file_engine) == (head - 1, head)
+    assert [ix["name"] for ix in inspect(file_engine).get_indexes("extra")] == ["ix_extra_id"]
+    ensure_schema(file_engine)
+
+    with pytest.raises(SchemaVersionError, match="newer"):
+        upgrade(file_engine, head - 1)
+    with pytest.raises(ValueError):
+        upgrade(file_engine, head + 1)
+
+
+def _indexes(engine):
+    inspector = inspect(engine)
+    return {
+        (table, index["name"], tuple(index["column_names"]))
+        for table in Base.metadata.tables
+        for index in inspector.get_indexes(table)
+    }
+
+
+def test_upgrade_creates_the_model_indexes(file_engine, tmp_path):
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    ensure_schema(fresh)
+    expected = _indexes(fresh)
+    fresh.dispose()
+    assert ("issue", "ix_issue_project_id_status", ("project_id", "status")) in expected
+
+    # a version 1 database: the tables without any of the indexes
+    Base.metadata.create_all(file_engine)
+    with file_engine.begin() as connection:
+        for _, name, _ in expected:
+            connection.execute(text(f"DROP INDEX {name}"))
+    assert _indexes(file_engine) == set()
+
+    assert upgrade(file_engine) == (None, migrations.HEAD)
+    assert _indexes(file_engine) == expected
+
+
+def test_upgrade_adds_a_change_version_per_table(file_engine):
+    Base.metadata.create_all(file_engine)
+    upgrade(file_engine)
+    with file_engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT table_name, version FROM pmo_change_version")
+        ).all()
+    assert dict(rows) == dict.fromkeys(Base.metadata.tables, 1)
@@ -0,0 +1,161 @@
+"""The hot queries must be answered from indexes, not table scans.
+
+Each test runs the real code path against SQLite, captures the statements it
+emits and checks SQLite's ``EXPLAIN QUERY PLAN`` for them.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from pmo.evm import earned_value
+from pmo.migrations import ensure_schema
+from pmo.models import Issue, IssueStatus, Project, WorkPackage
+from pmo.portfolio import portfolio_summary
+from pmo.resources import overallocations
+from pmo.sample_data import create_sample_data
+from pmo.schedule import compute_schedule
+
+
+@pytest.fixture
+def indexed_session():
+    engine = create_engine("sqlite://")
+    ensure_schema(engine)
+    with Session(engine) as session:
+        data = create_sample_data(session)
+        ids = {
+            "project": data["project"].id,
+            "control_account": data["work_package"].controlaccount_id,
+            "position": data["positions"]["pm"].id,
+        }
+        # start from an empty identity map so relationship loads hit the database
+        session.expunge_all()
+        yield session, ids
+    engine.dispose()
+
+
+def _plans(session, run) -> list[str]:
+    """Run ``run()`` and return the query plan lines of every SELECT it issued."""
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements
+
+    connection = session.connection()
+    return [
+        row[3]
+        for statement, parameters in statements
+        for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    ]
+
+
+def _assert_uses(plan: list[str], *indexes: str):
+    for index in indexes:
+        assert any(index in line for line in plan), f"{index} not used:\n" + "\n".join(plan)
+
+
+def _assert_no_scan(plan: list[str], *tables: str):
+    for table in tables:
+        scans = [line for line in plan if line == f"SCAN {table}"]
+        assert not scans, f"full scan of {table}:\n" + "\n".join(plan)
+
+
+def test_issue_lookup_by_project_and_status(indexed_session):
+    session, data = indexed_session
+    project_id = data["project"]
+    query = select(Issue).where(Issue.project_id == project_id, Issue.status == IssueStatus.open)
+
+    plan = _plans(session, lambda: session.scalars(query).all())
+    _assert_uses(plan, "ix_issue_project_id_status")
+    _assert_no_scan(plan, "issue")
+
+
+def test_relationship_loads_use_foreign_key_indexes(indexed_session):
+    session, data = indexed_session
+
+    def load():
+        project = session.get(Project, data["project"])
+        for account in project.controlaccounts:
+            for workpackage in account.workpackages:
+                workpackage.tasks
+        project.issues
+
+    plan = _plans(session, load)
+    _assert_uses(
+        plan,
+        "ix_controlaccount_project_id",
+        "ix_workpackage_controlaccount_id",
+        "ix_task_workpackage_id",
+        "ix_issue_project_id_status",
+    )
+    _assert_no_scan(plan, "controlaccount", "workpackage", "task", "issue")
+
+
+def test_schedule_load_uses_indexes(indexed_session):
+    session, data = indexed_session
+
+    plan = _plans(session, lambda: compute_schedule(session, data["project"]))
+    _assert_uses(
+        plan,
+        "ix_controlaccount_project_id",
+        "ix_workpackage_controlaccount_id",
+        "ix_task_workpackage_id",
+        "ix_dependency_successor_id_predecessor_id",
+    )
+    _assert_no_scan(plan, "task", "dependency")
+
+
+def test_position_overallocations_use_assignment_index(indexed_session):
+    session, data = indexed_session
+    position_id = data["position"]
+
+    plan = _plans(session, lambda: overallocations(session, position_id=position_id))
+    _assert_uses(plan, "ix_resourceassignment_position_id_start_date")
+    _assert_no_scan(plan, "resourceassignment")
+
+
+def test_portfolio_counts_read_composite_indexes(indexed_session):
+    session, _ = indexed_session
+
+    plan = _plans(session, lambda: portfolio_summary(session))
+    _assert_uses(
+        plan,
+        "ix_issue_project_id_status",
+        "ix_changerequest_project_id_status",
+        "ix_projectstatushistory_project_id_effective_date",
+    )
+    _assert_no_scan(plan, "issue", "changerequest", "projectstatushistory")
+
+
+def test_project_earned_value_reads_expenses_by_project_and_date(indexed_session):
+    session, data = indexed_session
+
+    plan = _plans(
+        session,
+        lambda: earned_value(
+            session, level="project", project_id=data["project"], as_of=date(2025, 6, 30)
+        ),
+    )
+    _assert_uses(plan, "ix_expense_project_id_date", "ix_expense_workpackage_id_date")
+    _assert_no_scan(plan, "expense")
+
+
+def test_workpackage_lookup_by_control_account(indexed_session):
+    session, data = indexed_session
+    account_id = data["control_account"]
+    query = select(WorkPackage).where(WorkPackage.controlaccount_id == account_id)
+
+    plan = _plans(session, lambda: session.scalars(query).all())
+    _assert_uses(plan, "ix_workpackage_controlaccount_id")
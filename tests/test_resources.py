@@ -0,0 +1,149 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from pmo.models import ResourceAssignment
+from pmo.resources import Allocation, overallocations, sweep
+
+
+def _allocation(id, percent, start, end, position_id=1):
+    return Allocation(id, position_id, 1, "Engineer", percent, start, end)
+
+
+def test_sweep_finds_maximal_windows():
+    allocations = [
+        _allocation(1, 60.0, date(2025, 1, 1), date(2025, 1, 31)),
+        _allocation(2, 50.0, date(2025, 1, 10), date(2025, 1, 15)),
+        # starts the day after #2 ends, so the window continues unbroken
+        _allocation(3, 70.0, date(2025, 1, 16), date(2025, 1, 20)),
+        # touching #1 only after it ends: never over-allocated
+        _allocation(4, 100.0, date(2025, 2, 1), None),
+    ]
+
+    [(start, end, peak, members)] = sweep(allocations)
+    assert (start, end) == (date(2025, 1, 10), date(2025, 1, 20))
+    assert peak == pytest.approx(130.0)
+    assert [member.id for member in members] == [1, 2, 3]
+
+
+def test_sweep_respects_threshold_and_open_ends():
+    allocations = [
+        _allocation(1, 100 / 3, date(2025, 1, 1), None),
+        _allocation(2, 100 / 3, date(2025, 1, 1), None),
+        _allocation(3, 100 / 3, date(2025, 1, 1), None),
+    ]
+    assert sweep(allocations) == []
+
+    [(start, end, peak, _)] = sweep(allocations, threshold=50.0)
+    assert start == date(2025, 1, 1) and end is None
+    assert peak == pytest.approx(100.0)
+
+
+def test_overallocations_across_projects(session, sample_dataset):
+    project = sample_dataset["project"]
+    positions = sample_dataset["positions"]
+    for name, position, percent, start, end in (
+        ("Design", positions["coo"], 70.0, date(2025, 3, 1), date(2025, 3, 31)),
+        ("Review", positions["coo"], 40.0, date(2025, 3, 20), date(2025, 4, 10)),
+        ("Audit", positions["ceo"], 50.0, date(2025, 3, 1), date(2025, 3, 31)),
+    ):
+        session.add(
+            ResourceAssignment(
+                name=name,
+                project=project,
+                position=position,
+                role=name,
+                allocation_percent=percent,
+                start_date=start,
+                end_date=end,
+            )
+        )
+    session.commit()
+
+    [window] = overallocations(session)
+    assert window.position_id == positions["coo"].id
+    assert (window.start, window.end) == (date(2025, 3, 20), date(2025, 3, 31))
+    assert window.peak_percent == pytest.approx(110.0)
+    assert sorted(assignment.role for assignment in window.assignments) == ["Design", "Review"]
+
+    clipped = overallocations(session, start=date(2025, 3, 25), end=date(2025, 3, 28))
+    assert [(w.start, w.end) for w in clipped] == [(date(2025, 3, 25), date(2025, 3, 28))]
+    assert overallocations(session, end=date(2025, 3, 19)) == []
+    assert overallocations(session, position_id=positions["ceo"].id) == []
+
+
+def test_overallocations_in_a_period_ignore_peaks_outside_it(session, sample_dataset):
+    project = sample_dataset["project"]
+    coo = sample_dataset["positions"]["coo"]
+    for name, percent, start, end in (
+        ("Design", 70.0, date(2025, 3, 1), date(2025, 3, 31)),
+        ("Review", 40.0, date(2025, 3, 20), date(2025, 4, 10)),
+        # the peak of 140% lies before the period and this ends inside it
+        ("Rollout", 30.0, date(2025, 3, 25), date(2025, 4, 2)),
+    ):
+        session.add(
+            ResourceAssignment(
+                name=name,
+                project=project,
+                position=coo,
+                role=name,
+                allocation_percent=percent,
+                start_date=start,
+                end_date=end,
+            )
+        )
+    session.commit()
+
+    [window] = overallocations(session)
+    assert window.peak_percent == pytest.approx(140.0)
+
+    windows = overallocations(session, start=date(2025, 4, 1), end=date(2025, 4, 30))
+    assert windows == []
+
+    [window] = overallocations(session, start=date(2025, 3, 21), end=date(2025, 3, 24))
+    assert (window.start, window.end) == (date(2025, 3, 21), date(2025, 3, 24))
+    assert window.peak_percent == pytest.approx(110.0)
+    assert sorted(a.role for a in window.assignments) == ["Design", "Review"]
+    assert window.assignments[0].start_date == date(2025, 3, 1)
+
+
+def test_overallocations_reject_an_inverted_period(session, sample_dataset):
+    session.add(
+        ResourceAssignment(
+            name="Double booked",
+            project=sample_dataset["project"],
+            position=sample_dataset["positions"]["coo"],
+            role="Lead",
+            allocation_percent=150.0,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+        )
+    )
+    session.commit()
+
+    with pytest.raises(ValueError, match="after end"):
+        overallocations(session, start=date(2025, 6, 1), end=date(2025, 3, 1))
+    [window] = overallocations(session, start=date(2025, 3, 1), end=date(2025, 3, 1))
+    assert (window.start, window.end) == (date(2025, 3, 1), date(2025, 3, 1))
+
+
+def test_sweep_scales_without_day_expansion():
+    size = 200_000
+    origin = date(2020, 1, 1)
+    allocations = [
+        _allocation(
+            i,
+            35.0,
+            origin + timedelta(days=i // 2),
+            origin + timedelta(days=i // 2 + 365 * (i % 3)),
+        )
+        for i in range(size)
+    ]
+
+    started = time.perf_counter()
+    windows = sweep(allocations)
+    elapsed = time.perf_counter() - started
+
+    assert windows
+    assert elapsed < 3.0
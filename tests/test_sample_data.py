@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from pmo.graph import load_unit_graph
+from pmo.migrations import ensure_schema
+from pmo.models import Base, BusinessUnit, Dependency, Project, Task
+from pmo.sample_data import create_synthetic_portfolio
+from pmo.schedule import compute_schedule
+
+
+def _portfolio(seed, **options):
+    engine = create_engine("sqlite://")
+    ensure_schema(engine)
+    session = Session(engine)
+    counts = create_synthetic_portfolio(session, seed=seed, **options)
+    return session, counts
+
+
+def _snapshot(session):
+    return {
+        table.name: session.execute(select(table).order_by(*table.primary_key)).all()
+        for table in Base.metadata.tables.values()
+    }
+
+
+def test_synthetic_portfolio_shape():
+    session, counts = _portfolio(
+        1, units=3, projects=7, control_accounts=2, workpackages=2, tasks_per_wp=4
+    )
+    assert counts["businessunit"] == 3
+    assert counts["project"] == 7
+    assert counts["controlaccount"] == 14
+    assert counts["workpackage"] == 28
+    assert counts["task"] == session.scalar(select(func.count(Task.id))) == 112
+    assert counts["dependency"] == session.scalar(select(func.count(Dependency.id))) == 84
+
+    projects_per_unit = session.execute(
+        select(Project.businessunit_id, func.count()).group_by(Project.businessunit_id)
+    ).all()
+    assert sorted(count for _, count in projects_per_unit) == [2, 2, 3]
+    assert all(session.scalars(select(BusinessUnit.manager_id)))
+
+    schedule = compute_schedule(session, 1)
+    assert len(schedule.tasks) == 16 and schedule.critical_path
+    unit_graph = load_unit_graph(session, 1)
+    assert [section.label for section in unit_graph.sections if section.name] == [
+        "orgchart",
+        "projects",
+        "businessplans",
+    ]
+    session.close()
+
+
+def test_synthetic_portfolio_is_deterministic():
+    options = dict(units=2, projects=5, tasks_per_wp=3)
+    first, _ = _portfolio(42, **options)
+    second, _ = _portfolio(42, **options)
+    other, _ = _portfolio(7, **options)
+
+    assert _snapshot(first) == _snapshot(second)
+    assert _snapshot(first)["project"] != _snapshot(other)["project"]
+
+    # seeding again adds a second portfolio with fresh tender numbers
+    create_synthetic_portfolio(first, seed=42, **options)
+    assert first.scalar(select(func.count(Project.id))) == 10
+
+    with pytest.raises(ValueError):
+        create_synthetic_portfolio(first, units=0)
+    for session in (first, second, other):
+        session.close()
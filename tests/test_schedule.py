@@ -0,0 +1,219 @@
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from pmo import schedule as schedule_module
+from pmo.migrations import ensure_schema
+from pmo.models import Dependency, Task
+from pmo.sample_data import create_sample_data
+from pmo.schedule import ScheduleCycleError, ScheduleNetwork, compute_schedule, schedule_cache
+
+
+START = date(2025, 3, 3)
+
+
+def _task(work_package, name, offset, duration):
+    return Task(
+        name=name,
+        workpackage=work_package,
+        start_date=START + timedelta(days=offset),
+        end_date=START + timedelta(days=offset + duration),
+    )
+
+
+@pytest.fixture
+def network(session, sample_dataset):
+    """A(3) -> B(2) -> D(4); A -> C(1) -> D; E(2) unconnected."""
+
+    work_package = sample_dataset["work_package"]
+    tasks = {
+        "A": _task(work_package, "A", 0, 3),
+        "B": _task(work_package, "B", 0, 2),
+        "C": _task(work_package, "C", 0, 1),
+        "D": _task(work_package, "D", 0, 4),
+        "E": _task(work_package, "E", 1, 2),
+    }
+    session.add_all(tasks.values())
+    session.flush()
+    for predecessor, successor in (("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")):
+        session.add(
+            Dependency(
+                predecessor_id=tasks[predecessor].id, successor_id=tasks[successor].id
+            )
+        )
+    session.commit()
+    return tasks
+
+
+def test_critical_path(session, sample_dataset, network):
+    schedule = compute_schedule(session, sample_dataset["project"].id)
+    by_name = {task.name: task for task in schedule.tasks}
+
+    assert schedule.start == START
+    assert schedule.finish == START + timedelta(days=9)
+    assert by_name["B"].early_start == START + timedelta(days=3)
+    assert by_name["D"].early_start == START + timedelta(days=5)
+    assert by_name["C"].total_float == 1
+    assert by_name["E"].total_float == 6
+    assert by_name["E"].late_finish == schedule.finish
+    assert [name for name, task in by_name.items() if task.critical] == ["A", "B", "D"]
+    assert schedule.critical_path == [network[name].id for name in ("A", "B", "D")]
+
+
+def test_cycle_is_reported(session, sample_dataset, network):
+    session.add(Dependency(predecessor_id=network["D"].id, successor_id=network["A"].id))
+    session.commit()
+    with pytest.raises(ScheduleCycleError) as excinfo:
+        compute_schedule(session, sample_dataset["project"].id)
+    assert set(excinfo.value.task_ids) == {network[name].id for name in "ABCD"}
+
+
+def test_project_without_tasks(session, sample_dataset):
+    schedule = compute_schedule(session, sample_dataset["project"].id)
+    assert schedule.tasks == [] and schedule.finish is None
+
+
+def test_large_network_is_linear():
+    size = 50_000
+    tasks = [(i, f"T{i}", START, START + timedelta(days=1 + i % 5)) for i in range(size)]
+    edges = [(i - 1, i) for i in range(1, size)]
+    edges += [(i - 7, i) for i in range(7, size, 3)]
+    network = ScheduleNetwork(1, tasks, edges)
+
+    started = time.perf_counter()
+    schedule = network.solve()
+    elapsed = time.perf_counter() - started
+
+    assert len(schedule.tasks) == size
+    assert schedule.critical_path[-1] == size - 1
+    assert elapsed < 1.0
+
+
+def _random_network(rng, size):
+    tasks = []
+    for i in range(size):
+        start = START + timedelta(days=rng.randrange(10))
+        tasks.append((i, f"T{i}", start, start + timedelta(days=rng.randrange(6))))
+    edges = {(rng.randrange(j), j) for j in range(1, size) for _ in range(rng.randrange(3))}
+    return tasks, sorted(edges)
+
+
+def test_incremental_updates_match_full_solve():
+    rng = random.Random(7)
+    tasks, edges = _random_network(rng, 60)
+    network = ScheduleNetwork(1, tasks, edges)
+    network.solve()
+    tasks, edges = {task[0]: task for task in tasks}, list(edges)
+
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.4:
+            task_id = rng.randrange(len(tasks))
+            start = START + timedelta(days=rng.randrange(-3, 12))
+            end = start + timedelta(days=rng.randrange(8))
+            tasks[task_id] = (task_id, f"T{task_id}", start, end)
+            network.update_task(task_id, start, end)
+        elif action < 0.7 or not edges:
+            edge = (rng.randrange(len(tasks)), rng.randrange(len(tasks)))
+            try:
+                network.add_dependency(*edge)
+            except ScheduleCycleError:
+                continue
+            edges.append(edge)
+        else:
+            edge = edges.pop(rng.randrange(len(edges)))
+            network.remove_dependency(*edge)
+
+        expected = ScheduleNetwork(1, list(tasks.values()), edges).solve()
+        assert network.result() == expected
+
+
+def test_cache_follows_committed_changes(session, sample_dataset, network, engine):
+    project_id = sample_dataset["project"].id
+    cache = schedule_cache(engine)
+    assert cache.schedule(session, project_id).finish == START + timedelta(days=9)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    network["C"].end_date = START + timedelta(days=6)
+    session.commit()
+    session.add(Dependency(predecessor_id=network["E"].id, successor_id=network["D"].id))
+    session.commit()
+    statements.clear()
+
+    schedule = cache.schedule(session, project_id)
+    assert statements == []
+    assert schedule == compute_schedule(session, project_id)
+    assert schedule.finish == START + timedelta(days=13)
+    assert schedule.critical_path == [network[name].id for name in ("A", "C", "D")]
+
+    session.add(_task(sample_dataset["work_package"], "F", 20, 1))
+    session.commit()
+    assert project_id not in cache
+    assert len(cache.schedule(session, project_id).tasks) == 6
+
+
+def test_cache_notices_commits_from_other_processes(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'schedule.db'}"
+    engine, other_engine = create_engine(url), create_engine(url)
+    for each in (engine, other_engine):
+        ensure_schema(each)
+    session, other = Session(engine), Session(other_engine)
+    data = create_sample_data(session)
+    project_id, work_package = data["project"].id, data["work_package"]
+    first = _task(work_package, "First", 0, 3)
+    second = _task(work_package, "Second", 0, 2)
+    session.add_all([first, second])
+    session.flush()
+    session.add(Dependency(predecessor_id=first.id, successor_id=second.id))
+    session.commit()
+
+    cache = schedule_cache(engine)
+    assert cache.schedule(session, project_id).finish == START + timedelta(days=5)
+
+    # a commit in this process is replayed; reading costs the version lookup only
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    second.end_date = START + timedelta(days=4)
+    session.commit()
+    statements.clear()
+    assert cache.schedule(session, project_id).finish == START + timedelta(days=7)
+    assert len(statements) == 1 and "pmo_change_version" in statements[0]
+    session.commit()
+
+    # another process (here: another engine without this cache) moves a task
+    other.get(Task, first.id).end_date = START + timedelta(days=10)
+    other.commit()
+    assert cache.schedule(session, project_id).finish == START + timedelta(days=14)
+
+    # cold loads run without the cache lock
+    cache.invalidate()
+    session.commit()
+    lock_free = []
+    load = ScheduleNetwork.load
+
+    def probe():
+        acquired = cache._lock.acquire(timeout=0)
+        if acquired:
+            cache._lock.release()
+        lock_free.append(acquired)
+
+    def observed_load(*args):
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return load(*args)
+
+    monkeypatch.setattr(schedule_module.ScheduleNetwork, "load", staticmethod(observed_load))
+    cache.schedule(session, project_id)
+    assert lock_free == [True] and project_id in cache
+
+    session.close()
+    other.close()
+    engine.dispose()
+    other_engine.dispose()
@@ -0,0 +1,47 @@
+from datetime import date
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from pmo.migrations import ensure_schema
+from pmo.models import BusinessUnit, Issue, Project
+from pmo.sample_data import create_sample_data
+from pmo.versions import read_versions
+
+TABLES = ("businessunit", "project", "issue", "changerequest")
+
+
+def _versions(session):
+    return {name: entry.version for name, entry in read_versions(session, TABLES).items()}
+
+
+def test_commits_bump_the_versions_of_the_tables_they_change(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'versions.db'}")
+    ensure_schema(engine)
+    with Session(engine) as session:
+        create_sample_data(session)
+        seeded = _versions(session)
+        assert all(version > 1 for version in seeded.values())
+
+        session.add(
+            Issue(name="Late", project_id=1, severity="low", opened_on=date(2025, 1, 1))
+        )
+        session.commit()
+        assert _versions(session) == {**seeded, "issue": seeded["issue"] + 1}
+
+        # no changes, no bump; unchanged attributes written back do not count
+        project = session.get(Project, 1)
+        project.name = project.name
+        session.commit()
+        assert _versions(session) == {**seeded, "issue": seeded["issue"] + 1}
+
+        session.execute(update(BusinessUnit).values(name="Bulk"))
+        session.execute(update(Project).where(Project.id == 1).values(budget=1.0))
+        session.rollback()
+        session.get(BusinessUnit, 1).name = "Renamed"
+        session.commit()
+        after = _versions(session)
+        assert after["businessunit"] == seeded["businessunit"] + 1
+        assert after["project"] == seeded["project"]
+        assert read_versions(session, ["nope"])["nope"].changed_at is None
+    engine.dispose()